@@ -0,0 +1,44 @@
+# company_fund_data/management/commands/import_prices.py
+
+import csv
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from ...services.price_history import COLUMNS, price_history
+
+class Command(BaseCommand):
+    help = (
+        "Load daily price CSV files (Date, Open, High, Low, Close, Volume "
+        "columns, as downloaded from Yahoo Finance or FMP) into the local "
+        "price history store"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_files', nargs='+', help="CSV files to load")
+        parser.add_argument(
+            '--ticker',
+            help="Ticker for a single file; defaults to each file's name"
+        )
+
+    def handle(self, *args, **options):
+        if options['ticker'] and len(options['csv_files']) > 1:
+            raise CommandError("--ticker can only be used with a single file")
+
+        for csv_file in options['csv_files']:
+            ticker = (options['ticker'] or Path(csv_file).stem).upper()
+            columns = {column: [] for column in COLUMNS}
+            try:
+                with open(csv_file, newline='') as handle:
+                    for row in csv.DictReader(handle):
+                        row = {key.strip().lower(): value for key, value in row.items()}
+                        for column in COLUMNS:
+                            columns[column].append(row.get(column) or 'nan')
+                rows = price_history.write(ticker, *(columns[c] for c in COLUMNS))
+            except OSError as error:
+                raise CommandError(f"Cannot read {csv_file}: {error}")
+            except ValueError as error:
+                raise CommandError(f"{csv_file}: {error}")
+
+            first, last, _ = price_history.date_range(ticker)
+            self.stdout.write(self.style.SUCCESS(
+                f"{ticker}: {rows} days from {first} to {last}"
+            ))
@@ -0,0 +1,33 @@
+# company_fund_data/services/market_data/__init__.py
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .cache import DiskCache
+from .client import MarketDataClient, TokenBucket
+from .providers import FileMarketDataProvider, FMPProvider, MarketDataProvider
+
+__all__ = [
+    'DiskCache', 'FileMarketDataProvider', 'FMPProvider', 'MarketDataClient',
+    'MarketDataProvider', 'TokenBucket', 'get_market_data_client',
+]
+
+def get_market_data_client(**overrides):
+    """
+    Build a MarketDataClient from the MARKET_DATA setting.
+
+    Args:
+        **overrides: Keys of MARKET_DATA to replace, e.g. PROVIDER_OPTIONS
+
+    Returns:
+        MarketDataClient: Client with the configured provider, disk cache
+            and rate limit
+    """
+    config = {**settings.MARKET_DATA, **overrides}
+    provider = import_string(config['PROVIDER'])(**config.get('PROVIDER_OPTIONS', {}))
+    cache = None
+    if config.get('CACHE_DIR'):
+        cache = DiskCache(config['CACHE_DIR'], config.get('CACHE_TTL', 3600))
+    rate_limiter = None
+    if config.get('RATE_LIMIT'):
+        rate_limiter = TokenBucket(config['RATE_LIMIT'], config.get('RATE_BURST'))
+    return MarketDataClient(provider, cache, rate_limiter)
@@ -0,0 +1,80 @@
+# company_fund_data/services/market_data/cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+class DiskCache:
+    """
+    JSON records on disk, one file per key, each with its own expiry.
+
+    Expired entries are ignored and removed when read; evict_expired
+    sweeps the whole directory and is run by MarketDataClient after
+    provider fetches.
+    """
+
+    def __init__(self, root, ttl, clock=time.time):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.clock = clock
+
+    def get(self, key):
+        """
+        Returns:
+            The cached record, or None if missing or expired
+        """
+        path = self._path(key)
+        try:
+            with open(path) as handle:
+                entry = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry['expires'] <= self.clock():
+            self._remove(path)
+            return None
+        return entry['value']
+
+    def set(self, key, value, ttl=None):
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'key': key,
+            'expires': self.clock() + (self.ttl if ttl is None else ttl),
+            'value': value,
+        }
+        descriptor, temporary = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as handle:
+            json.dump(entry, handle)
+        os.replace(temporary, self._path(key))
+
+    def evict_expired(self):
+        """
+        Remove every expired entry.
+
+        Returns:
+            int: Entries removed
+        """
+        removed = 0
+        now = self.clock()
+        for path in self.root.glob('*.json'):
+            try:
+                with open(path) as handle:
+                    expired = json.load(handle)['expires'] <= now
+            except (FileNotFoundError, ValueError, KeyError):
+                expired = True
+            if expired:
+                removed += self._remove(path)
+        return removed
+
+    def _path(self, key):
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.unlink(path)
+            return 1
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,158 @@
+# company_fund_data/services/market_data/client.py
+
+import threading
+import time
+from concurrent.futures import Future
+
+class TokenBucket:
+    """
+    Blocking token-bucket rate limiter.
+
+    Holds up to capacity tokens and refills at rate tokens per second;
+    acquire waits until a token is available.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+
+class MarketDataClient:
+    """
+    Front end to a MarketDataProvider that keeps round trips to a minimum.
+
+    A request is answered from the disk cache where possible. The
+    remaining symbols are claimed by the calling thread, split into
+    batches of the provider's max_batch_size, and fetched one batch per
+    rate-limited call. A symbol another thread is already fetching is not
+    requested again; the caller waits for that thread's result instead.
+
+    A call that went to the provider also sweeps expired entries out of
+    the cache, at most once per cache TTL, so entries for symbols that
+    are never requested again do not pile up.
+    """
+
+    def __init__(self, provider, cache=None, rate_limiter=None):
+        self.provider = provider
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._next_eviction = None
+
+    def quotes(self, symbols):
+        return self.get('quote', symbols)
+
+    def profiles(self, symbols):
+        return self.get('profile', symbols)
+
+    def get(self, kind, symbols):
+        """
+        Fetch one kind of record for many symbols.
+
+        Args:
+            kind (str): A kind the provider supports, e.g. 'quote'
+            symbols (iterable): Ticker symbols, any case, duplicates allowed
+
+        Returns:
+            dict: Upper-case symbol -> record for every symbol the provider
+                knows; unknown symbols are left out
+
+        Raises:
+            Exception: Whatever the provider raised for a batch this call
+                depends on
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        results = {}
+        missing = []
+        for symbol in symbols:
+            record = self.cache.get(self._key(kind, symbol)) if self.cache else None
+            if record is None:
+                missing.append(symbol)
+            else:
+                results[symbol] = record
+
+        claimed, waiting = {}, {}
+        with self._lock:
+            for symbol in missing:
+                key = self._key(kind, symbol)
+                if key in self._in_flight:
+                    waiting[symbol] = self._in_flight[key]
+                else:
+                    claimed[symbol] = self._in_flight[key] = Future()
+
+        batch_size = self.provider.max_batch_size
+        pending = list(claimed)
+        try:
+            for start in range(0, len(pending), batch_size):
+                self._fetch_batch(kind, pending[start:start + batch_size], claimed)
+        except BaseException as error:
+            # Interrupted: do not leave other threads waiting forever.
+            unresolved = [s for s in pending if not claimed[s].done()]
+            for symbol in unresolved:
+                claimed[symbol].set_exception(error)
+            self._release(kind, unresolved)
+            raise
+        if pending:
+            self._evict_expired()
+
+        for symbol, future in {**claimed, **waiting}.items():
+            record = future.result()
+            if record is not None:
+                results[symbol] = record
+        return results
+
+    def _fetch_batch(self, kind, batch, futures):
+        try:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            records = self.provider.fetch(kind, batch)
+        except Exception as error:
+            for symbol in batch:
+                futures[symbol].set_exception(error)
+            self._release(kind, batch)
+            return
+
+        for symbol in batch:
+            record = records.get(symbol)
+            if record is not None and self.cache:
+                self.cache.set(self._key(kind, symbol), record)
+            futures[symbol].set_result(record)
+        self._release(kind, batch)
+
+    def _evict_expired(self):
+        if not self.cache:
+            return
+        with self._lock:
+            now = self.cache.clock()
+            if self._next_eviction is not None and now < self._next_eviction:
+                return
+            self._next_eviction = now + self.cache.ttl
+        self.cache.evict_expired()
+
+    def _release(self, kind, batch):
+        with self._lock:
+            for symbol in batch:
+                self._in_flight.pop(self._key(kind, symbol), None)
+
+    @staticmethod
+    def _key(kind, symbol):
+        return f"{kind}:{symbol}"
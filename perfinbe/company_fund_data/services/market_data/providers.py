@@ -0,0 +1,83 @@
+# company_fund_data/services/market_data/providers.py
+
+import json
+import time
+from urllib.parse import quote, urlencode
+from urllib.request import urlopen
+
+class MarketDataProvider:
+    """
+    Source of market data for many symbols per call.
+
+    Subclasses implement fetch for the kinds they support. Every kind
+    returns a dict of symbol -> JSON-serializable record; symbols the
+    source does not know are left out.
+    """
+
+    kinds = ('quote', 'profile')
+    max_batch_size = 100
+
+    def fetch(self, kind, symbols):
+        """
+        Args:
+            kind (str): One of kinds, e.g. 'quote'
+            symbols (list): Upper-case ticker symbols, at most
+                max_batch_size of them
+
+        Returns:
+            dict: Symbol -> record
+        """
+        raise NotImplementedError
+
+class FileMarketDataProvider(MarketDataProvider):
+    """
+    Offline provider that answers from a JSON file, for tests and local
+    development.
+
+    The file maps each kind to symbol -> record, e.g.
+    {"quote": {"VTI": {"price": 250.1, "timestamp": 1718900000}}}. Every
+    call is recorded in calls so tests can count round trips; delay
+    simulates network latency.
+    """
+
+    def __init__(self, path, delay=0, max_batch_size=100):
+        with open(path) as handle:
+            self.data = json.load(handle)
+        self.delay = delay
+        self.max_batch_size = max_batch_size
+        self.calls = []
+
+    def fetch(self, kind, symbols):
+        self.calls.append((kind, list(symbols)))
+        if self.delay:
+            time.sleep(self.delay)
+        records = self.data.get(kind, {})
+        return {symbol: records[symbol] for symbol in symbols if symbol in records}
+
+class FMPProvider(MarketDataProvider):
+    """
+    Financial Modeling Prep, the source FinanceToolkit uses. The quote and
+    profile endpoints take a comma-separated symbol list, so a whole batch
+    is one HTTP request.
+    """
+
+    base_url = 'https://financialmodelingprep.com/api/v3'
+    max_batch_size = 50
+
+    def __init__(self, api_key, timeout=30):
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def fetch(self, kind, symbols):
+        if kind not in self.kinds:
+            raise ValueError(f"Unsupported market data kind: {kind}")
+        url = (
+            f"{self.base_url}/{kind}/{quote(','.join(symbols), safe=',')}"
+            f"?{urlencode({'apikey': self.api_key})}"
+        )
+        with urlopen(url, timeout=self.timeout) as response:
+            records = json.load(response)
+        if isinstance(records, dict):
+            # FMP reports bad keys and plan limits as a JSON object.
+            raise RuntimeError(records.get('Error Message', str(records)))
+        return {record['symbol']: record for record in records}
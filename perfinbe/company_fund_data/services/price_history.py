@@ -0,0 +1,220 @@
+# company_fund_data/services/price_history.py
+
+import json
+import os
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from urllib.parse import quote
+import numpy as np
+from django.conf import settings
+
+COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+MANIFEST = 'manifest.json'
+
+class PriceHistoryStore:
+    """
+    Daily OHLCV history per ticker, stored as memory-mapped NumPy files.
+
+    Each ticker is one .npy file holding a (6, days) float64 array in the
+    order of COLUMNS, sorted by date. Rows are columns, so reading the
+    closes of a date range touches one contiguous slice of the file; dates
+    are day numbers (datetime64[D] as float), found with a binary search.
+    manifest.json indexes every ticker by its first and last date and row
+    count without opening the price files.
+
+    Files are replaced atomically, so readers holding an older mapping
+    keep a consistent view while a ticker is rewritten.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_mtime = None
+
+    @property
+    def root(self):
+        return Path(self._root or settings.PRICE_HISTORY_DIR)
+
+    def tickers(self):
+        """
+        Returns:
+            list: Tickers with stored history, sorted
+        """
+        return sorted(self._load_manifest())
+
+    def date_range(self, ticker):
+        """
+        Args:
+            ticker (str): Ticker symbol
+
+        Returns:
+            tuple: (first date, last date, row count), or None if the
+                ticker has no history
+        """
+        entry = self._load_manifest().get(ticker.upper())
+        if entry is None:
+            return None
+        return (
+            date.fromisoformat(entry['first']),
+            date.fromisoformat(entry['last']),
+            entry['rows'],
+        )
+
+    def write(self, ticker, dates, open, high, low, close, volume):
+        """
+        Merge daily bars into a ticker's history.
+
+        Bars for dates already stored replace the stored ones.
+
+        Args:
+            ticker (str): Ticker symbol
+            dates (array-like): Trading dates (date objects or ISO strings)
+            open, high, low, close, volume (array-like): Values per date
+
+        Returns:
+            int: Rows stored for the ticker after the merge
+        """
+        ticker = ticker.upper()
+        incoming = np.vstack([
+            np.asarray(dates, dtype='datetime64[D]').astype(np.float64),
+            np.asarray(open, dtype=np.float64),
+            np.asarray(high, dtype=np.float64),
+            np.asarray(low, dtype=np.float64),
+            np.asarray(close, dtype=np.float64),
+            np.asarray(volume, dtype=np.float64),
+        ])
+
+        with self._lock:
+            existing = self._read(ticker)
+            if existing is not None:
+                incoming = np.hstack([np.array(existing), incoming])
+            # Keep the last bar given for each date.
+            reversed_dates = incoming[0, ::-1]
+            _, last = np.unique(reversed_dates, return_index=True)
+            merged = incoming[:, incoming.shape[1] - 1 - last]
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._replace(self._path(ticker), lambda handle: np.save(handle, merged))
+            manifest = dict(self._load_manifest())
+            manifest[ticker] = {
+                'first': str(merged[0, 0].astype('datetime64[D]')),
+                'last': str(merged[0, -1].astype('datetime64[D]')),
+                'rows': merged.shape[1],
+            }
+            self._replace(
+                self.root / MANIFEST,
+                lambda handle: handle.write(json.dumps(manifest, indent=1).encode())
+            )
+            self._manifest = manifest
+            self._manifest_mtime = os.stat(self.root / MANIFEST).st_mtime_ns
+        return merged.shape[1]
+
+    def load(self, ticker, start=None, end=None, columns=COLUMNS):
+        """
+        Read a ticker's bars between two dates, inclusive.
+
+        Args:
+            ticker (str): Ticker symbol
+            start (date, optional): First date, the beginning of history
+                by default
+            end (date, optional): Last date, the end of history by default
+            columns (iterable): Columns to return
+
+        Returns:
+            dict: Column name -> read-only array. 'date' is datetime64[D];
+                the others are float64 views into the mapped file.
+        """
+        data = self._read(ticker.upper())
+        if data is None:
+            return {column: _empty(column) for column in columns}
+        left, right = _bounds(data[0], start, end)
+        return {
+            column: _column(data, column, left, right) for column in columns
+        }
+
+    def load_closes(self, tickers, start, end):
+        """
+        Closing prices of many tickers on a shared date axis.
+
+        Args:
+            tickers (list): Ticker symbols, one matrix column each
+            start (date): First date
+            end (date): Last date
+
+        Returns:
+            tuple: (dates, closes) where dates is the sorted union of
+                trading dates (datetime64[D]) and closes is a
+                (dates, tickers) float64 matrix, NaN where a ticker has no
+                bar for the date
+        """
+        slices = []
+        for ticker in tickers:
+            data = self._read(ticker.upper())
+            if data is None:
+                slices.append((np.empty(0), np.empty(0)))
+                continue
+            left, right = _bounds(data[0], start, end)
+            slices.append((data[0, left:right], data[4, left:right]))
+
+        day_numbers = np.unique(np.concatenate([days for days, _ in slices]))
+        closes = np.full((len(day_numbers), len(tickers)), np.nan)
+        for column, (days, values) in enumerate(slices):
+            closes[np.searchsorted(day_numbers, days), column] = values
+        return day_numbers.astype('datetime64[D]'), closes
+
+    def _path(self, ticker):
+        return self.root / f"{quote(ticker, safe='')}.npy"
+
+    def _read(self, ticker):
+        try:
+            return np.load(self._path(ticker), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+
+    def _load_manifest(self):
+        # Reload when another process has rewritten the manifest.
+        try:
+            mtime = os.stat(self.root / MANIFEST).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if mtime != self._manifest_mtime:
+            with open(self.root / MANIFEST) as handle:
+                self._manifest = json.load(handle)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def _replace(self, path, write):
+        descriptor, temporary = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as handle:
+                write(handle)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+def _bounds(day_numbers, start, end):
+    left = 0 if start is None else np.searchsorted(
+        day_numbers, _day_number(start), side='left'
+    )
+    right = len(day_numbers) if end is None else np.searchsorted(
+        day_numbers, _day_number(end), side='right'
+    )
+    return left, right
+
+def _day_number(day):
+    return np.datetime64(day, 'D').astype(np.float64)
+
+def _column(data, column, left, right):
+    values = data[COLUMNS.index(column), left:right]
+    if column == 'date':
+        return values.astype('datetime64[D]')
+    return values
+
+def _empty(column):
+    return np.empty(0, dtype='datetime64[D]' if column == 'date' else np.float64)
+
+price_history = PriceHistoryStore()
@@ -1,3 +1,237 @@
-from django.test import TestCase
+# company_fund_data/tests.py
 
-# Create your tests here.
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from io import StringIO
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from .services.market_data import (
+    DiskCache, FileMarketDataProvider, MarketDataClient, TokenBucket,
+    get_market_data_client
+)
+from .services.price_history import PriceHistoryStore, price_history
+
+class PriceHistoryStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.store = PriceHistoryStore(self.root)
+
+    def bars(self, start, days, close=100.0):
+        dates = [start + timedelta(days=n) for n in range(days)]
+        closes = close + np.arange(days, dtype=float)
+        return dates, closes, closes + 1, closes - 1, closes, np.full(days, 1000)
+
+    def test_range_reads_and_manifest(self):
+        self.store.write('vti', *self.bars(date(2024, 1, 1), 10))
+
+        bars = self.store.load('VTI', date(2024, 1, 3), date(2024, 1, 5))
+
+        self.assertEqual(
+            list(bars['date']),
+            list(np.arange('2024-01-03', '2024-01-06', dtype='datetime64[D]'))
+        )
+        self.assertEqual(list(bars['close']), [102.0, 103.0, 104.0])
+        self.assertEqual(
+            self.store.date_range('VTI'), (date(2024, 1, 1), date(2024, 1, 10), 10)
+        )
+        self.assertEqual(len(self.store.load('MISSING')['close']), 0)
+
+    def test_merge_replaces_overlapping_dates(self):
+        self.store.write('VTI', *self.bars(date(2024, 1, 1), 10))
+        rows = self.store.write('VTI', *self.bars(date(2024, 1, 8), 5, close=200.0))
+
+        closes = self.store.load('VTI', columns=['close'])['close']
+
+        self.assertEqual(rows, 12)
+        self.assertEqual(list(closes[5:]), [105.0, 106.0, 200.0, 201.0, 202.0, 203.0, 204.0])
+        # A second store sees the update through the manifest on disk.
+        self.assertEqual(PriceHistoryStore(self.root).date_range('VTI')[2], 12)
+
+    def test_load_closes_aligns_tickers(self):
+        self.store.write('AAA', *self.bars(date(2024, 1, 1), 3))
+        self.store.write('BBB', *self.bars(date(2024, 1, 2), 3, close=50.0))
+
+        dates, closes = self.store.load_closes(
+            ['AAA', 'BBB', 'CCC'], date(2024, 1, 1), date(2024, 1, 31)
+        )
+
+        self.assertEqual(len(dates), 4)
+        np.testing.assert_array_equal(closes[:, 0], [100, 101, 102, np.nan])
+        np.testing.assert_array_equal(closes[:, 1], [np.nan, 50, 51, 52])
+        self.assertTrue(np.isnan(closes[:, 2]).all())
+
+    def test_years_of_history_load_quickly(self):
+        tickers = [f'T{n}' for n in range(100)]
+        for ticker in tickers:
+            self.store.write(ticker, *self.bars(date(2005, 1, 1), 20 * 365))
+
+        started = time.perf_counter()
+        dates, closes = self.store.load_closes(
+            tickers, date(2010, 1, 1), date(2020, 1, 1)
+        )
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(closes.shape, (3653, 100))
+        self.assertLess(elapsed, 1.0)
+
+    def test_import_prices_command(self):
+        path = os.path.join(self.root, 'spy.csv')
+        with open(path, 'w') as handle:
+            handle.write(
+                "Date,Open,High,Low,Close,Adj Close,Volume\n"
+                "2024-01-02,470.1,472.0,468.5,471.0,469.9,1000\n"
+                "2024-01-03,471.0,473.5,470.0,472.5,471.4,1200\n"
+            )
+
+        out = StringIO()
+        with override_settings(PRICE_HISTORY_DIR=os.path.join(self.root, 'store')):
+            call_command('import_prices', path, stdout=out)
+            closes = price_history.load('SPY')['close']
+
+        self.assertIn('SPY: 2 days from 2024-01-02 to 2024-01-03', out.getvalue())
+        self.assertEqual(list(closes), [471.0, 472.5])
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class MarketDataClientTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.fixture = os.path.join(self.root, 'market_data.json')
+        with open(self.fixture, 'w') as handle:
+            json.dump({
+                'quote': {
+                    f'T{n}': {'symbol': f'T{n}', 'price': 10.0 + n}
+                    for n in range(500)
+                },
+                'profile': {'VTI': {'sector': 'Broad Market'}},
+            }, handle)
+
+    def make_client(self, delay=0, max_batch_size=100, **kwargs):
+        provider = FileMarketDataProvider(self.fixture, delay, max_batch_size)
+        return MarketDataClient(provider, **kwargs), provider
+
+    def test_symbols_are_batched_and_cached(self):
+        cache = DiskCache(os.path.join(self.root, 'cache'), ttl=60)
+        client, provider = self.make_client(cache=cache)
+        symbols = [f't{n}' for n in range(500)] + ['T0', 'UNKNOWN']
+
+        quotes = client.quotes(symbols)
+
+        self.assertEqual(len(quotes), 500)
+        self.assertEqual(quotes['T7']['price'], 17.0)
+        self.assertEqual(len(provider.calls), 6)
+        self.assertTrue(all(len(batch) <= 100 for _, batch in provider.calls))
+
+        client.quotes(symbols[:500])
+        self.assertEqual(len(provider.calls), 6)
+
+    def test_concurrent_requests_are_coalesced(self):
+        client, provider = self.make_client(delay=0.2)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.quotes(['T1', 'T2'])))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(provider.calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result['T2']['price'] == 12.0 for result in results))
+
+    def test_provider_errors_reach_every_waiter(self):
+        client, provider = self.make_client(delay=0.1)
+        provider.data = None  # fetch now raises AttributeError
+        errors = []
+
+        def request():
+            try:
+                client.quotes(['T1'])
+            except AttributeError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=request) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(client._in_flight, {})
+
+    def test_token_bucket_limits_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+        for _ in range(4):
+            bucket.acquire()
+
+        self.assertEqual(clock.slept, [0.5, 0.5])
+
+    def test_disk_cache_expires_entries(self):
+        clock = FakeClock()
+        cache = DiskCache(os.path.join(self.root, 'cache'), ttl=60, clock=clock)
+        cache.set('quote:VTI', {'price': 1})
+        cache.set('quote:BND', {'price': 2}, ttl=600)
+
+        clock.now += 120
+
+        self.assertIsNone(cache.get('quote:VTI'))
+        self.assertEqual(cache.get('quote:BND'), {'price': 2})
+        cache.set('quote:EMB', {'price': 3}, ttl=1)
+        clock.now += 10
+        self.assertEqual(cache.evict_expired(), 1)
+        self.assertEqual(len(os.listdir(cache.root)), 1)
+
+    def test_client_sweeps_expired_entries_after_fetching(self):
+        clock = FakeClock()
+        cache = DiskCache(os.path.join(self.root, 'cache'), ttl=60, clock=clock)
+        client, provider = self.make_client(cache=cache)
+        client.quotes(['T1', 'T2'])
+
+        clock.now += 30
+        client.quotes(['T3'])
+        self.assertEqual(len(os.listdir(cache.root)), 3)
+
+        clock.now += 40
+        client.quotes(['T3'])
+        self.assertEqual(len(os.listdir(cache.root)), 3)
+
+        client.quotes(['T4'])
+        self.assertEqual(sorted(os.listdir(cache.root)), sorted(
+            cache._path(f'quote:{symbol}').name for symbol in ('T3', 'T4')
+        ))
+
+    def test_client_from_settings(self):
+        market_data = {
+            'PROVIDER': 'company_fund_data.services.market_data.FileMarketDataProvider',
+            'PROVIDER_OPTIONS': {'path': self.fixture},
+            'CACHE_DIR': None,
+            'RATE_LIMIT': 100,
+        }
+        with override_settings(MARKET_DATA=market_data):
+            client = get_market_data_client()
+
+        self.assertEqual(client.profiles(['vti']), {'VTI': {'sector': 'Broad Market'}})
+        self.assertIsNone(client.cache)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -33,6 +34,7 @@ ALLOWED_HOSTS = []
 INSTALLED_APPS = [
     "personal_finance_portfolio.apps.PersonalFinancePortfolioConfig",
     "tax_data_records.apps.TaxDataRecordsConfig",
+    "company_fund_data.apps.CompanyFundDataConfig",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -49,6 +51,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "personal_finance_portfolio.middleware.RequestProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "perfinbe.urls"
@@ -123,3 +126,34 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Daily price history files, see company_fund_data.services.price_history
+
+PRICE_HISTORY_DIR = BASE_DIR / "price_history"
+
+# Annual returns per asset class for historical backtests,
+# see personal_finance_portfolio.services.backtest
+
+ANNUAL_RETURNS_FILE = PRICE_HISTORY_DIR / "annual_returns.npz"
+
+# Market data provider, see company_fund_data.services.market_data
+
+MARKET_DATA = {
+    "PROVIDER": "company_fund_data.services.market_data.FMPProvider",
+    "PROVIDER_OPTIONS": {"api_key": os.environ.get("FMP_API_KEY", "")},
+    "CACHE_DIR": BASE_DIR / "market_data_cache",
+    "CACHE_TTL": 12 * 60 * 60,
+    "RATE_LIMIT": 5,
+    "RATE_BURST": 10,
+}
+
+# Opt-in per-request query and latency profiling (set REQUEST_PROFILING=1),
+# see personal_finance_portfolio.middleware and manage.py slow_endpoints
+
+REQUEST_PROFILING = {
+    "ENABLED": os.environ.get("REQUEST_PROFILING") == "1",
+    "LOG_FILE": BASE_DIR / "logs" / "requests.jsonl",
+    "MAX_BYTES": 10 * 1024 * 1024,
+    "BACKUP_COUNT": 5,
+    "DUPLICATE_THRESHOLD": 2,
+}
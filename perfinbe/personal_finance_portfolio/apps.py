@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PersonalFinancePortfolioConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "personal_finance_portfolio"
+
+    def ready(self):
+        from . import signals  # noqa: F401
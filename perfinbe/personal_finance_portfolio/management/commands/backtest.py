@@ -0,0 +1,78 @@
+# personal_finance_portfolio/management/commands/backtest.py
+
+from django.core.management.base import BaseCommand, CommandError
+from ...services.backtest import (
+    RETURN_UNITS, AnnualReturns, HistoricalBacktester, current_allocation
+)
+
+class Command(BaseCommand):
+    help = (
+        "Replay every historical period against the current allocation and "
+        "report the success rate of each withdrawal rate"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--returns-csv',
+            help="Load annual returns from this CSV (Year plus one column per "
+                 "asset class, optional Inflation) and store them for later runs"
+        )
+        parser.add_argument(
+            '--unit',
+            choices=list(RETURN_UNITS),
+            default='fraction',
+            help="Unit of the --returns-csv values: fraction (0.05) or "
+                 "percent (5.0); default fraction"
+        )
+        parser.add_argument(
+            '--period',
+            type=int,
+            default=30,
+            help="Length of each historical period in years (default 30)"
+        )
+        parser.add_argument(
+            '--rates',
+            type=float,
+            nargs='+',
+            default=[0.03, 0.035, 0.04, 0.045, 0.05, 0.055, 0.06],
+            help="Initial withdrawal rates to test"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['returns_csv']:
+                annual_returns = AnnualReturns.from_csv(
+                    options['returns_csv'], options['unit']
+                )
+            else:
+                annual_returns = AnnualReturns.load()
+        except OSError as error:
+            raise CommandError(f"Cannot read annual returns: {error}")
+        if options['returns_csv']:
+            try:
+                annual_returns.save()
+            except OSError as error:
+                raise CommandError(f"Cannot write annual returns: {error}")
+
+        allocation = current_allocation()
+        if not allocation:
+            raise CommandError(
+                "No holdings are categorized by asset class; "
+                "add InvestmentCategory rows named after AssetClass choices"
+            )
+        try:
+            backtester = HistoricalBacktester(annual_returns, options['period'])
+            results = backtester.sweep([allocation], options['rates'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write("Allocation: " + ", ".join(
+            f"{name} {weight:.0%}" for name, weight in sorted(allocation.items())
+        ))
+        start_years = results['start_years']
+        self.stdout.write(
+            f"{len(start_years)} periods of {options['period']} years starting "
+            f"{start_years[0]}-{start_years[-1]}"
+        )
+        for rate, success in zip(options['rates'], results['success_rates'][0]):
+            self.stdout.write(f"{rate:.2%} withdrawal: {success:.0%} success")
@@ -0,0 +1,92 @@
+# personal_finance_portfolio/management/commands/export_transactions.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from ...models import Portfolio, Transaction
+from ...services.transaction_export import EXPORT_COLUMNS, FORMATS, TransactionExporter
+
+class Command(BaseCommand):
+    help = (
+        "Export transactions as CSV, NDJSON or Parquet with the columns: "
+        + ", ".join(EXPORT_COLUMNS)
+        + ". CSV exports can be read back by import_transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=list(FORMATS),
+            default='csv',
+            help="Output format (default csv; parquet needs pyarrow)"
+        )
+        parser.add_argument(
+            '--output',
+            help="File to write; standard output when omitted (not for parquet)"
+        )
+        parser.add_argument('--portfolio', type=int, help="Only this Portfolio pk")
+        parser.add_argument('--since', help="Earliest transaction_date (ISO datetime)")
+        parser.add_argument('--until', help="Latest transaction_date (ISO datetime)")
+        parser.add_argument(
+            '--type',
+            action='append',
+            dest='types',
+            choices=[key for key, _ in Transaction.TRANSACTION_TYPES],
+            help="Only this transaction type; repeat for several"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help="Rows fetched and written at a time (default 2000)"
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        if options['format'] == 'parquet' and not options['output']:
+            raise CommandError("--output is required for parquet")
+        if options['portfolio'] is not None and not Portfolio.objects.filter(
+            pk=options['portfolio']
+        ).exists():
+            raise CommandError(f"Portfolio {options['portfolio']} does not exist")
+
+        exporter = TransactionExporter(
+            portfolio=options['portfolio'],
+            since=self._datetime(options, 'since'),
+            until=self._datetime(options, 'until'),
+            transaction_types=options['types'],
+            chunk_size=options['chunk_size']
+        )
+        try:
+            chunks = exporter.stream(options['format'])
+        except ImportError as error:
+            raise CommandError(str(error))
+
+        if not options['output']:
+            for data in chunks:
+                self.stdout.write(data.decode(), ending='')
+            return
+
+        written = 0
+        try:
+            with open(options['output'], 'wb') as output:
+                for data in chunks:
+                    output.write(data)
+                    written += len(data)
+        except OSError as error:
+            raise CommandError(f"Cannot write {options['output']}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} bytes of {options['format']} to {options['output']}"
+        ))
+
+    @staticmethod
+    def _datetime(options, name):
+        if not options[name]:
+            return None
+        try:
+            value = parse_datetime(options[name])
+        except ValueError:
+            value = None
+        if value is None:
+            raise CommandError(f"--{name} must be an ISO datetime")
+        return value
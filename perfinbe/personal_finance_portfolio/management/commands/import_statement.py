@@ -0,0 +1,76 @@
+# personal_finance_portfolio/management/commands/import_statement.py
+
+from django.core.management.base import BaseCommand, CommandError
+from ...models import Portfolio
+from ...services.statements import load_statement
+
+class Command(BaseCommand):
+    help = "Stream a broker CSV or OFX/QFX statement into a portfolio's transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help="Path to the statement file")
+        parser.add_argument(
+            '--portfolio',
+            type=int,
+            required=True,
+            help="Primary key of the portfolio the statement belongs to"
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ofx'],
+            help="Statement format (default: from the file suffix)"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help="Rows written per bulk batch (default 5000)"
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=20,
+            help="Skipped or rejected rows to list in the output (default 20)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            portfolio = Portfolio.objects.get(pk=options['portfolio'])
+        except Portfolio.DoesNotExist:
+            raise CommandError(f"Portfolio {options['portfolio']} does not exist")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        try:
+            summary = load_statement(
+                options['statement'],
+                portfolio,
+                file_format=options['format'],
+                chunk_size=options['chunk_size']
+            )
+        except UnicodeDecodeError as error:
+            raise CommandError(
+                f"{options['statement']} is not UTF-8 text: byte {error.start} "
+                f"cannot be decoded ({error.reason})"
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+        problems = (
+            [f"Statement row {row}: {reason}" for row, reason in summary['skipped']] +
+            [f"Parsed row {row}: {reason}" for row, reason in summary['errors']]
+        )
+        for problem in problems[:options['max_errors']]:
+            self.stderr.write(problem)
+        if problems:
+            self.stderr.write(f"{len(problems)} rows skipped or rejected")
+        for (symbol, transaction_type, source), remainder in summary['unbooked_fractions'].items():
+            self.stderr.write(
+                f"{symbol} {transaction_type} ({source}): {remainder} fractional units not booked"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['created']} transactions into {portfolio} in "
+            f"{summary['elapsed_seconds']:.2f}s, "
+            f"{summary['rows_per_second']:.0f} rows/s"
+        ))
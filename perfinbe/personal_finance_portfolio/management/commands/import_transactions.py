@@ -0,0 +1,49 @@
+# personal_finance_portfolio/management/commands/import_transactions.py
+
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from ...services.transaction_import import IMPORT_FIELDS, TransactionImporter
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import transactions from a CSV file with a "
+        "portfolio_investment_id column plus: " + ", ".join(IMPORT_FIELDS)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="Path to the CSV file to import")
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help="Rows validated and written per batch (default 5000)"
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=20,
+            help="Rejected rows to list in the output (default 20)"
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        importer = TransactionImporter(batch_size=options['batch_size'])
+        try:
+            with open(options['csv_file'], newline='') as csv_file:
+                summary = importer.import_rows(csv.DictReader(csv_file))
+        except OSError as error:
+            raise CommandError(f"Cannot read {options['csv_file']}: {error}")
+
+        for row_number, message in summary['errors'][:options['max_errors']]:
+            self.stderr.write(f"Row {row_number}: {message}")
+        if summary['errors']:
+            self.stderr.write(f"{len(summary['errors'])} rows rejected")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['rows']} rows as {summary['created']} transactions "
+            f"({summary['reinvestments']} dividend reinvestments) in "
+            f"{summary['elapsed_seconds']:.2f}s, "
+            f"{summary['rows_per_second']:.0f} rows/s"
+        ))
@@ -0,0 +1,51 @@
+# personal_finance_portfolio/management/commands/reconcile_positions.py
+
+from django.core.management.base import BaseCommand, CommandError
+from ...models import Portfolio, PortfolioInvestment
+from ...services.positions import rebuild_positions, reconcile_positions
+
+class Command(BaseCommand):
+    help = (
+        "Check position snapshots against PortfolioInvestment.quantity, "
+        "optionally rebuilding snapshots from the full transaction history"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--portfolio',
+            type=int,
+            help="Primary key of a single portfolio to check"
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help="Replay every transaction before checking"
+        )
+
+    def handle(self, *args, **options):
+        portfolio = None
+        if options['portfolio'] is not None:
+            try:
+                portfolio = Portfolio.objects.get(pk=options['portfolio'])
+            except Portfolio.DoesNotExist:
+                raise CommandError(f"Portfolio {options['portfolio']} does not exist")
+
+        if options['rebuild']:
+            positions = PortfolioInvestment.objects.all()
+            if portfolio is not None:
+                positions = positions.filter(portfolio=portfolio)
+            for portfolio_investment_id in positions.values_list('pk', flat=True):
+                rebuild_positions(portfolio_investment_id)
+
+        mismatches = reconcile_positions(portfolio)
+        for position, recorded, derived in mismatches:
+            self.stdout.write(
+                f"{position.portfolio.name} {position.investment.ticker_symbol}: "
+                f"recorded {recorded}, transactions give {derived}"
+            )
+        if mismatches:
+            self.stdout.write(self.style.WARNING(
+                f"{len(mismatches)} positions do not match their transactions"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("All positions match their transactions"))
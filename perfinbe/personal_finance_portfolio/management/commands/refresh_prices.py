@@ -0,0 +1,63 @@
+# personal_finance_portfolio/management/commands/refresh_prices.py
+
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from company_fund_data.services.market_data import (
+    FileMarketDataProvider, MarketDataClient, get_market_data_client
+)
+from ...services.price_refresh import PriceRefresher
+
+class Command(BaseCommand):
+    help = (
+        "Fetch current quotes for held investments whose price is stale and "
+        "save them to Investment.price"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--staleness-hours',
+            type=float,
+            default=12,
+            help="Only refresh prices older than this many hours (default 12)"
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help="Provider batches in flight at once (default 4)"
+        )
+        parser.add_argument(
+            '--fixture',
+            help="Answer from a JSON market data file instead of the "
+                 "MARKET_DATA provider, e.g. for local runs"
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        if options['fixture']:
+            try:
+                client = MarketDataClient(FileMarketDataProvider(options['fixture']))
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read {options['fixture']}: {error}")
+        else:
+            client = get_market_data_client()
+
+        refresher = PriceRefresher(
+            client,
+            concurrency=options['concurrency'],
+            staleness=timedelta(hours=options['staleness_hours'])
+        )
+        summary = refresher.refresh()
+
+        for batch, message in summary['errors']:
+            self.stderr.write(f"Batch {batch[0]}..{batch[-1]} failed: {message}")
+        if summary['missing']:
+            self.stderr.write(f"No quote for: {', '.join(summary['missing'])}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {summary['updated']} of {summary['tickers']} stale tickers in "
+            f"{summary['elapsed_seconds']:.2f}s, "
+            f"{summary['tickers_per_second']:.0f} tickers/s"
+        ))
@@ -0,0 +1,73 @@
+# personal_finance_portfolio/management/commands/slow_endpoints.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from ...services.request_profiles import SORT_KEYS, read_profiles, summarize_profiles
+
+class Command(BaseCommand):
+    help = (
+        "Summarize the request profiling log (REQUEST_PROFILING['LOG_FILE'] "
+        "and its rotated files) by endpoint, worst first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help="Log file to read instead of the configured one")
+        parser.add_argument(
+            '--sort',
+            choices=SORT_KEYS,
+            default='p95_ms',
+            help="Ranking, largest first (default p95_ms)"
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help="Endpoints to list (default 10)"
+        )
+        parser.add_argument(
+            '--min-requests',
+            type=int,
+            default=1,
+            help="Skip endpoints with fewer profiled requests (default 1)"
+        )
+        parser.add_argument('--since', help="Only requests from this ISO datetime on")
+
+    def handle(self, *args, **options):
+        config = settings.REQUEST_PROFILING
+        since = None
+        if options['since']:
+            try:
+                since = parse_datetime(options['since'])
+            except ValueError:
+                since = None
+            if since is None:
+                raise CommandError("--since must be an ISO datetime")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        records = read_profiles(
+            options['log'] or config['LOG_FILE'], config.get('BACKUP_COUNT', 0), since
+        )
+        summaries = summarize_profiles(
+            records, options['sort'], options['limit'], options['min_requests']
+        )
+        if not summaries:
+            self.stdout.write("No profiled requests; set REQUEST_PROFILING=1 to record them")
+            return
+
+        self.stdout.write(
+            f"{'Endpoint':<60} {'Reqs':>6} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'Queries':>8} {'Max q':>6} {'DB ms':>9} {'Dup reqs':>8}"
+        )
+        for summary in summaries:
+            endpoint = f"{summary['method']} {summary['endpoint']}"
+            self.stdout.write(
+                f"{endpoint:<60} {summary['requests']:>6} "
+                f"{summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                f"{summary['mean_queries']:>8.1f} {summary['max_queries']:>6} "
+                f"{summary['mean_db_ms']:>9.1f} {summary['duplicate_requests']:>8}"
+            )
+            for sql, count in summary['duplicates']:
+                self.stdout.write(self.style.WARNING(f"    {count}x {sql[:120]}"))
@@ -0,0 +1,177 @@
+# personal_finance_portfolio/middleware.py
+
+import json
+import logging
+import re
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.utils import timezone
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_IN_LISTS = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+# Profile of the request being handled. A context variable rather than a
+# thread local because async views run their queries in another thread.
+_current_profile = ContextVar('request_profile', default=None)
+
+_handlers = {}
+
+def fingerprint(sql):
+    """
+    Normalize a query so repeats that differ only in their parameters
+    compare equal.
+
+    Args:
+        sql (str): Query as passed to the cursor
+
+    Returns:
+        str: The query with literals and placeholders replaced by ? and
+            IN lists collapsed to IN (...)
+    """
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LISTS.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+class RequestProfile:
+    """Queries and timings collected while one request is handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.by_fingerprint = defaultdict(lambda: [0, 0.0])
+
+    def add(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        entry = self.by_fingerprint[fingerprint(sql)]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def record(self, request, response, duplicate_threshold):
+        """
+        Args:
+            request (HttpRequest): Handled request
+            response (HttpResponse): Its response
+            duplicate_threshold (int): Runs of one fingerprint that make
+                it a duplicate
+
+        Returns:
+            dict: JSON-ready log record
+        """
+        match = request.resolver_match
+        duplicates = sorted(
+            (
+                {'fingerprint': sql, 'count': count, 'db_ms': round(seconds * 1000, 3)}
+                for sql, (count, seconds) in self.by_fingerprint.items()
+                if count >= duplicate_threshold
+            ),
+            key=lambda duplicate: -duplicate['count']
+        )
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'streaming': response.streaming,
+            'wall_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'db_ms': round(self.db_seconds * 1000, 3),
+            'queries': self.queries,
+            'duplicates': duplicates,
+        }
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add(sql, time.perf_counter() - start)
+
+def _install_query_recorder(**kwargs):
+    # Connections are per thread. request_started is sent from the thread
+    # that will run the request's queries, async views included.
+    for connection in connections.all():
+        if _record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_record_query)
+
+def _log_handler(config):
+    key = (str(config['LOG_FILE']), config['MAX_BYTES'], config['BACKUP_COUNT'])
+    if key not in _handlers:
+        Path(config['LOG_FILE']).parent.mkdir(parents=True, exist_ok=True)
+        _handlers[key] = RotatingFileHandler(
+            config['LOG_FILE'],
+            maxBytes=config['MAX_BYTES'],
+            backupCount=config['BACKUP_COUNT'],
+            delay=True
+        )
+    return _handlers[key]
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in middleware that logs, per request, the query count, time spent
+    in the database, queries repeated with only their parameters changed
+    (the mark of an N+1 pattern) and wall time.
+
+    Enabled by REQUEST_PROFILING['ENABLED']; otherwise Django drops it at
+    startup. Queries are timed by an execute wrapper on the connections
+    of whichever thread handles the request, which for async views is the
+    thread their ORM calls run in. Queries run while a streaming response
+    is consumed fall outside the request and are not counted.
+
+    Records are JSON lines in the rotating REQUEST_PROFILING['LOG_FILE'];
+    manage.py slow_endpoints summarizes them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = settings.REQUEST_PROFILING
+        if not config.get('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.duplicate_threshold = config.get('DUPLICATE_THRESHOLD', 2)
+        self.handler = _log_handler(config)
+        request_started.connect(_install_query_recorder)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        self._write(profile.record(request, response, self.duplicate_threshold))
+        return response
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        self._write(profile.record(request, response, self.duplicate_threshold))
+        return response
+
+    def _write(self, record):
+        self.handler.handle(logging.makeLogRecord({'msg': json.dumps(record)}))
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "personal_finance_portfolio",
+            "0013_alter_transaction_options_transaction_fees_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="portfolio",
+            name="dividend_reinvestment",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("personal_finance_portfolio", "0014_portfolio_dividend_reinvestment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PositionSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("quantity", models.IntegerField()),
+                ("cost", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("market_value", models.DecimalField(decimal_places=2, max_digits=14)),
+                (
+                    "portfolio_investment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="position_snapshots",
+                        to="personal_finance_portfolio.portfolioinvestment",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("portfolio_investment", "date")},
+            },
+        ),
+    ]
@@ -249,6 +249,7 @@ class Portfolio(models.Model):
         investment_platform (InvestmentPlatform): The investment platform associated with the portfolio.
         type (Type): The type of portfolio.
         detail (Detail): The detail of portfolio.
+        dividend_reinvestment (bool): Whether dividends are reinvested as BUY transactions.
         created_at (datetime): The date and time when the portfolio was created.
     """
 
@@ -256,6 +257,7 @@ class Portfolio(models.Model):
     investment_platform = models.ForeignKey(InvestmentPlatform, on_delete=models.PROTECT)
     brokerage_account_type = models.ForeignKey(BrokerageAccountType, null=True, on_delete=models.SET_NULL)
     category = models.CharField(max_length=20, editable=False, default='brokerage')
+    dividend_reinvestment = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
@@ -286,6 +288,63 @@ class PortfolioInvestment(models.Model):
         return f"{self.portfolio.name} - {self.investment.symbol}"
     
 
+class PositionSnapshot(models.Model):
+    """
+    End-of-day position of a portfolio investment, derived from its transactions.
+
+    One row exists per portfolio investment per date with activity; the
+    position on any other date is the latest snapshot on or before it.
+
+    Attributes:
+        portfolio_investment (PortfolioInvestment): The position this snapshot belongs to.
+        date (date): The day the snapshot closes.
+        quantity (int): Shares held at the end of the day.
+        cost (Decimal): Average cost basis of the shares held, including fees.
+        price (Decimal): Last trade price known on that day.
+        market_value (Decimal): quantity * the day's close from the price
+            history store, or * price when the ticker has no close on or
+            before that day.
+    """
+
+    portfolio_investment = models.ForeignKey(
+        PortfolioInvestment,
+        on_delete=models.CASCADE,
+        related_name='position_snapshots'
+    )
+    date = models.DateField()
+    quantity = models.IntegerField()
+    cost = models.DecimalField(max_digits=14, decimal_places=2)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    market_value = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        unique_together = (('portfolio_investment', 'date'),)
+
+    @classmethod
+    def holdings_as_of(cls, portfolio, as_of):
+        """
+        Positions of a portfolio at the end of a date, in one indexed query.
+
+        Args:
+            portfolio (Portfolio): The portfolio to look up
+            as_of (date): The date to report holdings for
+
+        Returns:
+            QuerySet: The latest snapshot on or before as_of per investment
+        """
+        latest = cls.objects.filter(
+            portfolio_investment=models.OuterRef('portfolio_investment'),
+            date__lte=as_of
+        ).order_by('-date').values('date')[:1]
+        return cls.objects.filter(
+            portfolio_investment__portfolio=portfolio,
+            date=models.Subquery(latest)
+        ).select_related('portfolio_investment__investment')
+
+    def __str__(self):
+        return f"{self.portfolio_investment_id} on {self.date}: {self.quantity}"
+
+
 class Transaction(models.Model):
     """
     Represents a financial transaction related to a portfolio investment.
@@ -408,6 +467,24 @@ class Transaction(models.Model):
         """
         return (self.quantity * self.price) + self.fees
 
+    def build_reinvestment(self):
+        """
+        Build the unsaved BUY transaction that reinvests this dividend.
+
+        Returns:
+            Transaction: The reinvestment, related back to this dividend
+        """
+        return Transaction(
+            portfolio_investment=self.portfolio_investment,
+            transaction_type='BUY',
+            transaction_source='REINVESTMENT',
+            quantity=int(self.total_amount / self.price),
+            price=self.price,
+            transaction_date=self.transaction_date,
+            notes=f"Reinvestment of dividend {self.total_amount}",
+            related_transaction=self
+        )
+
     def save(self, *args, **kwargs):
         """
         Override save to handle special transaction types and create related transactions.
@@ -419,16 +496,7 @@ class Transaction(models.Model):
             self.portfolio_investment.portfolio.dividend_reinvestment):
             
             # Create reinvestment transaction
-            reinvestment = Transaction(
-                portfolio_investment=self.portfolio_investment,
-                transaction_type='BUY',
-                transaction_source='REINVESTMENT',
-                quantity=int(self.total_amount / self.price),
-                price=self.price,
-                transaction_date=self.transaction_date,
-                notes=f"Reinvestment of dividend {self.total_amount}",
-                related_transaction=self
-            )
+            reinvestment = self.build_reinvestment()
             
             super().save(*args, **kwargs)
             reinvestment.save()
@@ -444,4 +512,8 @@ class Transaction(models.Model):
             )
 
 # Signal for tax system integration
-transaction_created = Signal()
\ No newline at end of file
+transaction_created = Signal()
+
+# Sent once per batch by bulk imports, which bypass save() and
+# transaction_created; receivers get the full list of created transactions.
+transactions_created = Signal()
\ No newline at end of file
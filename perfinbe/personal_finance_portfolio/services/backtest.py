@@ -0,0 +1,191 @@
+# personal_finance_portfolio/services/backtest.py
+
+import csv
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from numpy.lib.stride_tricks import sliding_window_view
+from ..models import AssetClass, InvestmentCategory
+
+INFLATION = 'Inflation'
+
+# Unit of the values in a returns CSV -> divisor to a fraction
+RETURN_UNITS = {'fraction': 1, 'percent': 100}
+
+class AnnualReturns:
+    """
+    Calendar-year returns per asset class, stored as one (years, columns)
+    array.
+
+    Columns are AssetClass names plus an optional 'Inflation' column; when
+    present, returns are nominal and withdrawals grow with inflation.
+    """
+
+    def __init__(self, years, columns, returns):
+        self.years = np.asarray(years, dtype=np.int64)
+        self.columns = list(columns)
+        self.returns = np.ascontiguousarray(returns, dtype=np.float64)
+
+    @property
+    def asset_classes(self):
+        return [column for column in self.columns if column != INFLATION]
+
+    @classmethod
+    def from_csv(cls, path, unit='fraction'):
+        """
+        Read a CSV with a Year column and one column per asset class.
+
+        Args:
+            path (str or Path): CSV file
+            unit (str): 'fraction' (0.05 is 5%) or 'percent' (5.0 is 5%)
+
+        Raises:
+            ValueError: Unknown unit
+        """
+        if unit not in RETURN_UNITS:
+            raise ValueError(f"Unknown unit {unit!r}; use one of {', '.join(RETURN_UNITS)}")
+        with open(path, newline='') as handle:
+            reader = csv.DictReader(handle)
+            columns = [c for c in reader.fieldnames if c.strip().lower() != 'year']
+            year_column = next(c for c in reader.fieldnames if c not in columns)
+            rows = sorted(reader, key=lambda row: int(row[year_column]))
+        returns = np.array(
+            [[float(row[column]) for column in columns] for row in rows]
+        ) / RETURN_UNITS[unit]
+        return cls([row[year_column] for row in rows], columns, returns)
+
+    @classmethod
+    def load(cls, path=None):
+        with np.load(path or settings.ANNUAL_RETURNS_FILE) as data:
+            return cls(data['years'], data['columns'].tolist(), data['returns'])
+
+    def save(self, path=None):
+        path = Path(path or settings.ANNUAL_RETURNS_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path, years=self.years, columns=np.array(self.columns), returns=self.returns
+        )
+
+def current_allocation():
+    """
+    Share of current holdings in each asset class.
+
+    Each holding's market value is split across its categories by
+    InvestmentCategory.percentage; categories named after an AssetClass
+    choice count towards that class.
+
+    Returns:
+        dict: AssetClass name -> weight, summing to 1 (empty if nothing is
+            classified)
+    """
+    value = ExpressionWrapper(
+        F('investment__portfolioinvestment__quantity') * F('investment__price')
+        * F('percentage') / 100,
+        output_field=DecimalField()
+    )
+    rows = InvestmentCategory.objects.filter(
+        category__name__in=[name for name, _ in AssetClass.ASSET_CHOICES],
+        investment__price__isnull=False
+    ).values(asset_class=F('category__name')).annotate(value=Sum(value))
+    values = {row['asset_class']: float(row['value'] or 0) for row in rows}
+    total = sum(values.values())
+    return {name: value / total for name, value in values.items() if value} if total else {}
+
+class HistoricalBacktester:
+    """
+    Service class that replays every historical period of a fixed length,
+    firecalc style.
+
+    The rolling periods are sliding_window_views of the stored returns, so
+    no period is copied. A sweep blends each historical year with every
+    allocation in one matrix product, windows the blend the same way, and
+    then runs all periods, allocations and withdrawal rates together, a
+    year at a time.
+    """
+
+    def __init__(self, annual_returns, period=30):
+        if len(annual_returns.years) < period:
+            raise ValueError(
+                f"{len(annual_returns.years)} years of returns cannot fill "
+                f"a {period}-year period"
+            )
+        self.annual_returns = annual_returns
+        self.period = period
+        # (periods, columns, years) view into the returns array
+        self.windows = sliding_window_view(annual_returns.returns, period, axis=0)
+
+    @property
+    def start_years(self):
+        return self.annual_returns.years[:self.windows.shape[0]]
+
+    def allocation_weights(self, allocation):
+        """
+        Args:
+            allocation (dict): Asset class -> weight
+
+        Returns:
+            ndarray: Weights in asset class column order, normalized
+        """
+        unknown = set(allocation) - set(self.annual_returns.asset_classes)
+        if unknown:
+            raise ValueError(f"No return history for: {', '.join(sorted(unknown))}")
+        weights = np.array([
+            allocation.get(name, 0.0) for name in self.annual_returns.asset_classes
+        ], dtype=np.float64)
+        return weights / weights.sum()
+
+    def sweep(self, allocations, withdrawal_rates):
+        """
+        Success rates for every allocation and withdrawal rate combination.
+
+        The first year's withdrawal is the rate times the starting balance;
+        later withdrawals keep the same purchasing power. Withdrawals are
+        taken at the start of each year.
+
+        Args:
+            allocations (iterable): Dicts of asset class -> weight
+            withdrawal_rates (iterable): Initial withdrawal rates, e.g. 0.04
+
+        Returns:
+            dict: success_rates, an (allocations, rates) array of the share
+                of periods that never ran out; ending_balances, an
+                (allocations, rates, periods) array per 1.0 invested in
+                today's dollars (0 where the money ran out); and the period
+                start_years
+        """
+        columns = self.annual_returns.columns
+        weights = np.array([self.allocation_weights(a) for a in allocations])
+        rates = np.asarray(list(withdrawal_rates), dtype=np.float64)
+
+        # Blend each year once per allocation, then window the blend:
+        # (periods, allocations, years) without copying any period.
+        blended = self.annual_returns.returns[:, self._asset_columns] @ weights.T
+        growth = sliding_window_view(blended, self.period, axis=0)
+        if INFLATION in columns:
+            price_level = np.cumprod(1 + self.windows[:, columns.index(INFLATION)], axis=1)
+        else:
+            price_level = np.ones((self.windows.shape[0], self.period))
+        # Withdrawal in year y is indexed to inflation through year y - 1.
+        indexation = np.concatenate(
+            [np.ones((price_level.shape[0], 1)), price_level[:, :-1]], axis=1
+        )
+
+        # (periods, allocations, rates)
+        balance = np.ones((self.windows.shape[0], len(weights), len(rates)))
+        alive = np.ones(balance.shape, dtype=bool)
+        for year in range(self.period):
+            balance -= rates[None, None, :] * indexation[:, year, None, None]
+            alive &= balance >= 0
+            balance = np.where(alive, balance * (1 + growth[:, :, year, None]), 0.0)
+
+        return {
+            'success_rates': alive.mean(axis=0),
+            'ending_balances': np.moveaxis(balance / price_level[:, -1, None, None], 0, -1),
+            'start_years': self.start_years,
+        }
+
+    @property
+    def _asset_columns(self):
+        columns = self.annual_returns.columns
+        return [columns.index(name) for name in self.annual_returns.asset_classes]
@@ -0,0 +1,176 @@
+# personal_finance_portfolio/services/exposure.py
+
+from threading import Lock
+import numpy as np
+from django.db.models import F
+from ..models import (
+    AssetClass, GeographicFocus, InvestmentCategory, PortfolioInvestment,
+    SectorIndustryFocus
+)
+
+UNCLASSIFIED = 'Unclassified'
+
+# Categories named after one of these choices roll up into that dimension.
+DIMENSIONS = {
+    'asset_class': [name for name, _ in AssetClass.ASSET_CHOICES],
+    'geography': [name for name, _ in GeographicFocus.GEOGRAPHICAL_CHOICES],
+    'sector': [name for name, _ in SectorIndustryFocus.SECTOR_INDUSTRY_CHOICES],
+}
+
+class CategoryWeights:
+    """
+    Sparse investments x categories matrix of InvestmentCategory weights,
+    in compressed sparse row form: the categories and weights of the
+    investment in row r are columns[indptr[r]:indptr[r + 1]] and
+    weights[indptr[r]:indptr[r + 1]].
+    """
+
+    def __init__(self, investment_ids, category_names, rows, columns, weights):
+        """
+        Args:
+            investment_ids (array-like): Investment pk of each row, sorted
+            category_names (list): Category name of each column
+            rows (array-like): Row of each non-zero entry
+            columns (array-like): Column of each non-zero entry
+            weights (array-like): Share of the row's value in the column
+        """
+        self.investment_ids = np.asarray(investment_ids, dtype=np.int64)
+        self.category_names = list(category_names)
+        order = np.argsort(rows, kind='stable')
+        self.columns = np.asarray(columns, dtype=np.int64)[order]
+        self.weights = np.asarray(weights, dtype=np.float64)[order]
+        self.indptr = np.concatenate([
+            [0], np.cumsum(np.bincount(
+                np.asarray(rows, dtype=np.int64), minlength=len(self.investment_ids)
+            ))
+        ])
+
+    @classmethod
+    def load(cls):
+        """Build the matrix from every InvestmentCategory row in one query."""
+        rows = list(InvestmentCategory.objects.values_list(
+            'investment_id', 'category__name', 'percentage'
+        ))
+        if not rows:
+            return cls([], [], [], [], [])
+        investments, names, percentages = zip(*rows)
+        investment_ids, row_index = np.unique(investments, return_inverse=True)
+        category_names, column_index = np.unique(names, return_inverse=True)
+        return cls(
+            investment_ids, category_names.tolist(), row_index, column_index,
+            np.array(percentages, dtype=np.float64) / 100
+        )
+
+    def rollup(self, groups, investment_ids, values, group_count):
+        """
+        Weighted sum of values per group and category, i.e. the product of
+        a sparse (groups, investments) value matrix with this matrix.
+
+        Each value is expanded to its investment's non-zero entries and the
+        products are summed with one bincount, so the work is linear in
+        the number of entries touched.
+
+        Args:
+            groups (array-like): Group index of each value, 0 to group_count - 1
+            investment_ids (array-like): Investment pk of each value
+            values (array-like): Values to spread over categories
+            group_count (int): Number of groups
+
+        Returns:
+            ndarray: (group_count, categories) array
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        investment_ids = np.asarray(investment_ids, dtype=np.int64)
+        categories = len(self.category_names)
+        if not len(self.investment_ids) or not len(values):
+            return np.zeros((group_count, categories))
+
+        rows = np.minimum(
+            np.searchsorted(self.investment_ids, investment_ids), len(self.investment_ids) - 1
+        )
+        counts = np.where(
+            self.investment_ids[rows] == investment_ids,
+            self.indptr[rows + 1] - self.indptr[rows], 0
+        )
+        source = np.repeat(np.arange(len(values)), counts)
+        # Position of each expanded entry within its row's slice
+        offsets = np.arange(len(source)) - np.repeat(np.cumsum(counts) - counts, counts)
+        entries = self.indptr[rows][source] + offsets
+        cells = groups[source] * categories + self.columns[entries]
+        return np.bincount(
+            cells, weights=values[source] * self.weights[entries],
+            minlength=group_count * categories
+        ).reshape(group_count, categories)
+
+class ExposureEngine:
+    """
+    Look-through exposure of every portfolio by category, asset class,
+    geography and sector.
+
+    The CategoryWeights matrix is built once and kept until an
+    InvestmentCategory or Category changes (see
+    personal_finance_portfolio.signals). Each call reads holdings with one
+    query and rolls all portfolios up with a single sparse product.
+    """
+
+    def __init__(self):
+        self._weights = None
+        self._lock = Lock()
+
+    @property
+    def weights(self):
+        with self._lock:
+            if self._weights is None:
+                self._weights = CategoryWeights.load()
+            return self._weights
+
+    def exposures(self):
+        """
+        Returns:
+            dict: 'portfolios' (pk -> exposure) and 'household', where an
+                exposure has the total market value, value per category
+                and, per dimension (asset_class, geography, sector), value
+                per choice plus 'Unclassified' for the rest of the total
+        """
+        holdings = list(
+            PortfolioInvestment.objects.filter(
+                investment__price__isnull=False
+            ).annotate(
+                value=F('quantity') * F('investment__price')
+            ).values_list('portfolio_id', 'investment_id', 'value')
+        )
+        if not holdings:
+            return {'portfolios': {}, 'household': self._summarize([], [], 0.0)}
+
+        portfolios, investments, values = zip(*holdings)
+        portfolio_ids, groups = np.unique(portfolios, return_inverse=True)
+        values = np.array(values, dtype=np.float64)
+        weights = self.weights
+        by_category = weights.rollup(groups, investments, values, len(portfolio_ids))
+        totals = np.bincount(groups, weights=values, minlength=len(portfolio_ids))
+
+        names = weights.category_names
+        return {
+            'portfolios': {
+                pk: self._summarize(names, row, total)
+                for pk, row, total in zip(portfolio_ids.tolist(), by_category, totals.tolist())
+            },
+            'household': self._summarize(names, by_category.sum(axis=0), float(totals.sum())),
+        }
+
+    def invalidate(self):
+        with self._lock:
+            self._weights = None
+
+    @staticmethod
+    def _summarize(names, row, total):
+        by_category = {name: float(value) for name, value in zip(names, row) if value}
+        summary = {'total': total, 'category': by_category}
+        for dimension, choices in DIMENSIONS.items():
+            values = {name: by_category[name] for name in choices if name in by_category}
+            values[UNCLASSIFIED] = total - sum(values.values())
+            summary[dimension] = values
+        return summary
+
+exposure_engine = ExposureEngine()
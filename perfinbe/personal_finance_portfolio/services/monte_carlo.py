@@ -0,0 +1,184 @@
+# personal_finance_portfolio/services/monte_carlo.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from django.db.models import F, Sum
+from ..models import PortfolioInvestment
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Withdrawals come from taxable accounts first, then tax-deferred ones.
+WITHDRAWAL_ORDER = ('brokerage', 'retirement')
+
+def starting_balances():
+    """
+    Current market value of all holdings per account category.
+
+    Returns:
+        dict: BrokerageAccountType.category -> quantity * Investment.price
+            summed over every PortfolioInvestment, as float
+    """
+    rows = PortfolioInvestment.objects.filter(
+        investment__price__isnull=False
+    ).values(
+        category=F('portfolio__brokerage_account_type__category')
+    ).annotate(value=Sum(F('quantity') * F('investment__price')))
+    return {row['category']: float(row['value']) for row in rows}
+
+class MonteCarloSimulator:
+    """
+    Service class that simulates retirement spending against random
+    market returns.
+
+    Every path draws one lognormal return per year. All paths are advanced
+    a year at a time with array arithmetic: balances grow, then the year's
+    spending is withdrawn, grossed up for tax, taxable accounts first.
+    Paths are split into batches that run in a process pool.
+
+    Spending and expenses are in today's dollars and grow with inflation;
+    reported balances are deflated back to today's dollars.
+    """
+
+    def __init__(self, balances=None, years=30, annual_spending=0,
+                 expenses=(), mean_return=0.07, volatility=0.15,
+                 inflation=0.025, tax_rates=None):
+        """
+        Args:
+            balances (dict, optional): Account category -> starting value,
+                current holdings by default
+            years (int): Years to simulate
+            annual_spending (float): Yearly spending need
+            expenses (iterable): (first_year, last_year, annual_amount)
+                for costs such as tuition or Medicare premiums, years
+                counted from 0 and inclusive; a negative amount is income
+            mean_return (float): Expected annual nominal return
+            volatility (float): Standard deviation of annual returns
+            inflation (float): Annual inflation
+            tax_rates (dict, optional): Account category -> tax rate on
+                withdrawals; brokerage 0.15 and retirement 0.22 by default
+        """
+        self.balances = starting_balances() if balances is None else dict(balances)
+        self.years = years
+        self.inflation = inflation
+        self.mean_return = mean_return
+        self.volatility = volatility
+        self.tax_rates = {'brokerage': 0.15, 'retirement': 0.22, **(tax_rates or {})}
+
+        spending = np.full(years, float(annual_spending))
+        for first_year, last_year, amount in expenses:
+            spending[first_year:last_year + 1] += amount
+        self.spending = spending
+
+    def run(self, paths=100_000, seed=None, workers=None, batch_size=25_000):
+        """
+        Simulate paths and summarize the outcomes.
+
+        Args:
+            paths (int): Number of return paths
+            seed (int, optional): Seed for reproducible results; each batch
+                gets an independent stream derived from it
+            workers (int, optional): Worker processes, one per CPU by
+                default; 1 runs in this process
+            batch_size (int): Paths per batch
+
+        Returns:
+            dict: success_rate (share of paths that never ran short),
+                success_by_year, ending balance percentiles, yearly balance
+                percentile bands (percentile -> list per year) and
+                median_depletion_year of the failed paths (None if none
+                failed)
+        """
+        sizes = [batch_size] * (paths // batch_size)
+        if paths % batch_size:
+            sizes.append(paths % batch_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = [(self._parameters(), size, child) for size, child in zip(sizes, seeds)]
+
+        workers = workers or min(len(jobs), os.cpu_count() or 1)
+        if workers == 1:
+            results = [simulate_batch(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(simulate_batch, *zip(*jobs)))
+
+        totals = np.concatenate([total for total, _ in results])
+        depleted = np.concatenate([year for _, year in results])
+        failed = depleted[depleted >= 0]
+        bands = np.percentile(totals, PERCENTILES, axis=0)
+        return {
+            'paths': paths,
+            'success_rate': float(np.mean(depleted < 0)),
+            'success_by_year': [
+                float(np.mean((depleted < 0) | (depleted > year)))
+                for year in range(self.years)
+            ],
+            'ending_balance': dict(zip(PERCENTILES, bands[:, -1].tolist())),
+            'balance_bands': {
+                percentile: band.tolist() for percentile, band in zip(PERCENTILES, bands)
+            },
+            'median_depletion_year': int(np.median(failed)) if len(failed) else None,
+        }
+
+    def _parameters(self):
+        categories = [c for c in WITHDRAWAL_ORDER if c in self.balances]
+        categories += [c for c in self.balances if c not in categories]
+        return {
+            'years': self.years,
+            'mean_return': self.mean_return,
+            'volatility': self.volatility,
+            'inflation': self.inflation,
+            'spending': self.spending,
+            'balances': np.array([self.balances[c] for c in categories], dtype=float),
+            'tax_rates': np.array(
+                [self.tax_rates.get(c, 0.0) for c in categories], dtype=float
+            ),
+        }
+
+def simulate_batch(parameters, paths, seed):
+    """
+    Simulate one batch of paths. Module level so worker processes can
+    import it.
+
+    Args:
+        parameters (dict): From MonteCarloSimulator._parameters
+        paths (int): Paths in this batch
+        seed (SeedSequence): Random stream for the batch
+
+    Returns:
+        tuple: (totals, depletion_year) where totals is a (paths, years + 1)
+            array of combined balances in today's dollars, starting with
+            the initial balance, and depletion_year is the first year each
+            path could not cover its spending, -1 if it never ran short
+    """
+    years = parameters['years']
+    rng = np.random.default_rng(seed)
+    # Lognormal parameters matching the requested mean and volatility.
+    variance = np.log1p((parameters['volatility'] / (1 + parameters['mean_return'])) ** 2)
+    growth = rng.lognormal(
+        np.log1p(parameters['mean_return']) - variance / 2, np.sqrt(variance),
+        size=(paths, years)
+    )
+    price_level = (1 + parameters['inflation']) ** np.arange(1, years + 1)
+    keep = 1 - parameters['tax_rates']
+
+    balances = np.tile(parameters['balances'], (paths, 1))
+    totals = np.empty((paths, years + 1))
+    totals[:, 0] = balances.sum(axis=1)
+    depletion_year = np.full(paths, -1)
+    for year in range(years):
+        balances *= growth[:, year, None]
+        need = np.full(paths, parameters['spending'][year] * price_level[year])
+        if need[0] < 0:
+            # Net income for the year is added to the first account.
+            balances[:, 0] -= need
+            need[:] = 0
+        for account in range(balances.shape[1]):
+            # Withdraw enough to cover the need after tax, or empty the account.
+            gross = np.minimum(balances[:, account], need / keep[account])
+            balances[:, account] -= gross
+            need -= gross * keep[account]
+        short = (need > 1e-6) & (depletion_year < 0)
+        depletion_year[short] = year
+        totals[:, year + 1] = balances.sum(axis=1) / price_level[year]
+    return totals, depletion_year
@@ -0,0 +1,334 @@
+# personal_finance_portfolio/services/performance.py
+
+from datetime import date
+import numpy as np
+from django.db.models import F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from company_fund_data.services.price_history import price_history
+from ..models import PositionSnapshot, Transaction
+
+# Trailing windows in years; None means since inception.
+WINDOWS = {
+    '1y': 1,
+    '3y': 3,
+    '5y': 5,
+    'inception': None,
+}
+
+DAYS_PER_YEAR = 365.0
+
+def calculate_performance(portfolios, as_of=None, windows=WINDOWS):
+    """
+    Time- and money-weighted returns for many portfolios in one batch.
+
+    Daily market values come from PositionSnapshots marked to market with
+    the price history (see load_daily_series) and external cash flows from
+    Transactions, each loaded with a single query for the whole batch.
+    Both are laid out as (portfolio, day) arrays so every window of every
+    portfolio is computed in the same vectorized passes.
+
+    Args:
+        portfolios (iterable): Portfolio instances or primary keys
+        as_of (date, optional): Last day of every window, today by default
+        windows (dict): Window name -> length in years, None for since
+            inception
+
+    Returns:
+        dict: Portfolio pk -> window name -> {'twr': float, 'mwr': float}.
+            Windows of a year or more are annualized; a window longer than
+            the portfolio's history, or a return that cannot be solved,
+            is None.
+    """
+    as_of = as_of or timezone.localdate()
+    portfolio_ids = [getattr(p, 'pk', p) for p in portfolios]
+    series = load_daily_series(portfolio_ids, as_of)
+    if series is None:
+        return {
+            pk: {name: {'twr': None, 'mwr': None} for name in windows}
+            for pk in portfolio_ids
+        }
+    values, flows, first_day = series
+
+    end = values.shape[1] - 1
+    inception = _inception_index(values, flows)
+    names = list(windows)
+    starts = np.empty((len(portfolio_ids), len(names)), dtype=np.int64)
+    for column, name in enumerate(names):
+        years = windows[name]
+        if years is None:
+            starts[:, column] = inception
+        else:
+            start_day = _years_before(as_of, years).toordinal() - first_day
+            available = (inception >= 0) & (start_day >= inception)
+            starts[:, column] = np.where(available, start_day, -1)
+
+    rows = np.repeat(np.arange(len(portfolio_ids)), len(names))
+    starts = starts.ravel()
+    twr = time_weighted_returns(values, flows, rows, starts, end)
+    mwr = money_weighted_returns(values, flows, rows, starts, end)
+
+    years = (end - starts) / DAYS_PER_YEAR
+    annualize = years >= 1
+    with np.errstate(invalid='ignore'):
+        twr = np.where(annualize, (1 + twr) ** (1 / np.maximum(years, 1)) - 1, twr)
+
+    results = {}
+    for index, (row, name) in enumerate(zip(rows, names * len(portfolio_ids))):
+        results.setdefault(portfolio_ids[row], {})[name] = {
+            'twr': _as_float(twr[index]),
+            'mwr': _as_float(mwr[index]),
+        }
+    return results
+
+def load_daily_series(portfolio_ids, as_of):
+    """
+    Daily market values and external cash flows of a batch of portfolios.
+
+    Column 0 is the day before the earliest activity in the batch, so every
+    portfolio starts from a zero value. Each position's quantity is carried
+    forward from its PositionSnapshots and marked every day at the latest
+    price known by then: the stored close from the price history, the
+    Investment.price from the day it was last updated, or failing both the
+    last trade price.
+
+    Args:
+        portfolio_ids (list): Portfolio primary keys, one row each
+        as_of (date): Last day of the series
+
+    Returns:
+        tuple: (values, flows, first_day) where values and flows are
+            (portfolios, days) float arrays and first_day is the ordinal of
+            column 0, or None if the batch has no activity
+    """
+    row_of = {pk: row for row, pk in enumerate(portfolio_ids)}
+    snapshots = list(PositionSnapshot.objects.filter(
+        portfolio_investment__portfolio_id__in=portfolio_ids,
+        date__lte=as_of
+    ).order_by('portfolio_investment', 'date').values_list(
+        'portfolio_investment__portfolio_id', 'portfolio_investment_id',
+        'date', 'quantity', 'price',
+        'portfolio_investment__investment__ticker_symbol',
+        'portfolio_investment__investment__price',
+        'portfolio_investment__investment__last_updated'
+    ))
+    transactions = list(Transaction.objects.filter(
+        portfolio_investment__portfolio_id__in=portfolio_ids
+    ).annotate(
+        day=TruncDate('transaction_date'),
+        portfolio_id=F('portfolio_investment__portfolio_id')
+    ).filter(day__lte=as_of).values_list(
+        'portfolio_id', 'day', 'transaction_type', 'transaction_source',
+        'quantity', 'price', 'fees'
+    ))
+    if not snapshots and not transactions:
+        return None
+
+    first_day = min(
+        [row[2] for row in snapshots] + [row[1] for row in transactions]
+    ).toordinal() - 1
+    days = as_of.toordinal() - first_day + 1
+    values = np.zeros((len(portfolio_ids), days))
+    flows = np.zeros((len(portfolio_ids), days))
+
+    if snapshots:
+        values = _marked_values(snapshots, row_of, first_day, as_of, values)
+
+    if transactions:
+        rows, dates, types, sources, quantities, prices, fees = zip(*transactions)
+        amounts = np.array(quantities, dtype=float) * np.array(prices, dtype=float)
+        np.add.at(
+            flows,
+            ([row_of[row] for row in rows],
+             [day.toordinal() - first_day for day in dates]),
+            _external_flows(
+                np.array(types), np.array(sources), amounts,
+                np.array(fees, dtype=float)
+            )
+        )
+    return values, flows, first_day
+
+def _marked_values(snapshots, row_of, first_day, as_of, values):
+    """
+    Sum each portfolio's positions marked to market, day by day.
+
+    Quantities and prices are laid out as (positions, days) arrays with
+    the known observations scattered in and carried forward, so every
+    position is valued in a few vectorized passes.
+    """
+    (rows, positions, dates, quantities, trade_prices,
+     tickers, prices, updated) = zip(*snapshots)
+    positions = np.array(positions)
+    columns = np.array([day.toordinal() - first_day for day in dates])
+    new_position = np.r_[True, positions[1:] != positions[:-1]]
+    position_row = np.cumsum(new_position) - 1
+    shape = (int(position_row[-1]) + 1, values.shape[1])
+
+    # Each snapshot replaces the previous quantity of its position, so
+    # scattering the changes and summing along days forward-fills them.
+    quantities = np.array(quantities, dtype=float)
+    changes = np.diff(quantities, prepend=0.0)
+    changes[new_position] = quantities[new_position]
+    held = np.zeros(shape)
+    np.add.at(held, (position_row, columns), changes)
+    held = np.cumsum(held, axis=1)
+
+    # Later assignments win on the same day: trade price, then
+    # Investment.price, then the close.
+    observed = np.full(shape, np.nan)
+    observed[position_row, columns] = np.array(trade_prices, dtype=float)
+    first = np.flatnonzero(new_position)
+    for row, index in enumerate(first):
+        if prices[index] is None:
+            continue
+        day = timezone.localdate(updated[index]).toordinal() - first_day
+        if day <= shape[1] - 1:
+            observed[row, max(day, 0)] = float(prices[index])
+    close_days, closes = price_history.load_closes(
+        [tickers[index] for index in first], date.fromordinal(first_day), as_of
+    )
+    close_columns = (
+        close_days - np.datetime64(date.fromordinal(first_day), 'D')
+    ).astype(np.int64)
+    observed[:, close_columns] = np.where(
+        np.isnan(closes.T), observed[:, close_columns], closes.T
+    )
+
+    latest = np.where(np.isnan(observed), 0, np.arange(shape[1]))
+    latest = np.maximum.accumulate(latest, axis=1)
+    marks = np.take_along_axis(observed, latest, axis=1)
+    position_values = np.where(held != 0, held * np.nan_to_num(marks), 0.0)
+    np.add.at(values, [row_of[rows[index]] for index in first], position_values)
+    return values
+
+def _external_flows(types, sources, amounts, fees):
+    """
+    Money the investor put into (+) or took out of (-) each position.
+
+    Dividends are paid out and their reinvestment BUY pays them back in, so
+    a reinvested dividend nets to zero while a cash dividend counts as a
+    withdrawal. Fees paid outside the position count as contributions that
+    buy nothing, which lowers the return.
+    """
+    transfer_out = (types == 'TRANSFER') & (sources == 'TRANSFER_OUT')
+    return np.select(
+        [
+            types == 'BUY',
+            types == 'SELL',
+            transfer_out,
+            types == 'TRANSFER',
+            types == 'DIVIDEND',
+            types == 'FEE',
+        ],
+        [
+            amounts + fees,
+            -(amounts - fees),
+            -amounts,
+            amounts,
+            -amounts,
+            amounts,
+        ],
+        default=0.0
+    )
+
+def time_weighted_returns(values, flows, rows, starts, end):
+    """
+    Cumulative time-weighted return of each (row, start) window.
+
+    Flows are taken at the end of their day, so the growth on day t is
+    (values[t] - flows[t]) / values[t - 1]; days that start from a zero
+    value contribute no growth. The running product of daily growth is
+    taken once per portfolio and each window is the ratio of two entries.
+
+    Args:
+        values (ndarray): (portfolios, days) end-of-day market values
+        flows (ndarray): (portfolios, days) external cash flows
+        rows (ndarray): Portfolio row of each window
+        starts (ndarray): Day index each window starts from, -1 if the
+            window is not available
+        end (int): Day index every window ends on
+
+    Returns:
+        ndarray: One return per window, NaN where unavailable
+    """
+    previous = values[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(
+            previous > 0, (values[:, 1:] - flows[:, 1:]) / previous, 1.0
+        )
+    wealth = np.concatenate(
+        [np.ones((values.shape[0], 1)), np.cumprod(growth, axis=1)], axis=1
+    )
+    valid = starts >= 0
+    safe_starts = np.where(valid, starts, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = wealth[rows, end] / wealth[rows, safe_starts] - 1
+    return np.where(valid, returns, np.nan)
+
+def money_weighted_returns(values, flows, rows, starts, end,
+                           iterations=100, tolerance=1e-10):
+    """
+    Annual money-weighted return (XIRR) of each (row, start) window.
+
+    Each window is treated as buying the portfolio at its starting value,
+    paying in every external flow after the start, and selling it at its
+    ending value. Newton's method solves all windows together; windows
+    that do not converge are NaN.
+
+    Args:
+        values (ndarray): (portfolios, days) end-of-day market values
+        flows (ndarray): (portfolios, days) external cash flows
+        rows (ndarray): Portfolio row of each window
+        starts (ndarray): Day index each window starts from, -1 if the
+            window is not available
+        end (int): Day index every window ends on
+        iterations (int): Newton iteration limit
+        tolerance (float): Step size treated as converged
+
+    Returns:
+        ndarray: One annual rate per window, NaN where unavailable
+    """
+    valid = starts >= 0
+    safe_starts = np.where(valid, starts, 0)
+    days = np.arange(values.shape[1])
+    in_window = (days > safe_starts[:, None]) & (days <= end)
+    cash = np.where(in_window, -flows[rows], 0.0)
+    cash[np.arange(len(rows)), safe_starts] -= values[rows, safe_starts]
+    cash[:, end] += values[rows, end]
+
+    # Only days with a cash flow somewhere in the batch matter.
+    active = np.flatnonzero(np.any(cash != 0, axis=0))
+    cash = cash[:, active]
+    years = np.maximum(active - safe_starts[:, None], 0) / DAYS_PER_YEAR
+
+    rate = np.full(len(rows), 0.1)
+    converged = np.zeros(len(rows), dtype=bool)
+    with np.errstate(all='ignore'):
+        for _ in range(iterations):
+            discount = (1 + rate[:, None]) ** -years
+            npv = (cash * discount).sum(axis=1)
+            slope = (-years * cash * discount).sum(axis=1) / (1 + rate)
+            step = np.where(slope != 0, npv / slope, np.nan)
+            rate = np.maximum(rate - step, -0.9999)
+            converged = np.abs(step) < tolerance
+            if np.all(converged | ~np.isfinite(step)):
+                break
+
+    has_gain_and_loss = (cash > 0).any(axis=1) & (cash < 0).any(axis=1)
+    return np.where(valid & converged & has_gain_and_loss, rate, np.nan)
+
+def _inception_index(values, flows):
+    """Day before each portfolio's first value or flow, as a column index."""
+    active = (values != 0) | (flows != 0)
+    first = np.argmax(active, axis=1)
+    return np.where(active.any(axis=1), first - 1, -1)
+
+def _years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 29 February in a non-leap target year
+        return day.replace(year=day.year - years, day=28)
+
+def _as_float(value):
+    return None if np.isnan(value) else float(value)
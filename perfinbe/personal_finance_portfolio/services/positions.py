@@ -0,0 +1,173 @@
+# personal_finance_portfolio/services/positions.py
+
+from datetime import datetime, time
+from decimal import Decimal
+import numpy as np
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from company_fund_data.services.price_history import price_history
+from ..models import PortfolioInvestment, PositionSnapshot, Transaction
+
+CENT = Decimal('0.01')
+
+def update_positions(transactions):
+    """
+    Bring PositionSnapshots up to date for newly created transactions.
+
+    Only the tail of each affected position is rebuilt: starting from the
+    snapshot before the earliest new transaction's date, the transactions
+    from that date on are replayed. Other positions are not touched.
+
+    Runs synchronously in Transaction.save through the transaction_created
+    receiver. Per affected position the cost is a handful of queries plus
+    one row per transaction from the start date on, so appending today's
+    trades replays a single day, while a trade backdated by years replays
+    (and rewrites the snapshots of) every later transaction of that
+    position.
+
+    Args:
+        transactions (iterable): Transactions that were just created
+    """
+    earliest = {}
+    for new_transaction in transactions:
+        day = timezone.localdate(new_transaction.transaction_date)
+        key = new_transaction.portfolio_investment_id
+        if key not in earliest or day < earliest[key]:
+            earliest[key] = day
+
+    for portfolio_investment_id, start in earliest.items():
+        rebuild_positions(portfolio_investment_id, start)
+
+def rebuild_positions(portfolio_investment_id, start=None):
+    """
+    Replay a position's transactions from start (or from the first
+    transaction) and replace its snapshots from that date on.
+
+    Args:
+        portfolio_investment_id (int): PortfolioInvestment primary key
+        start (date, optional): First date to rebuild
+    """
+    previous = None
+    history = Transaction.objects.filter(
+        portfolio_investment_id=portfolio_investment_id
+    ).order_by('transaction_date', 'pk')
+    if start is not None:
+        previous = PositionSnapshot.objects.filter(
+            portfolio_investment_id=portfolio_investment_id,
+            date__lt=start
+        ).order_by('-date').first()
+        history = history.filter(
+            transaction_date__gte=timezone.make_aware(datetime.combine(start, time.min))
+        )
+
+    ticker = PortfolioInvestment.objects.filter(
+        pk=portfolio_investment_id
+    ).values_list('investment__ticker_symbol', flat=True).first()
+    position = _Position(previous, _Closes(ticker))
+    snapshots = {}
+    for past_transaction in history.only(
+        'transaction_type', 'transaction_source', 'quantity',
+        'price', 'fees', 'transaction_date'
+    ):
+        day = timezone.localdate(past_transaction.transaction_date)
+        position.apply(past_transaction)
+        snapshots[day] = position.snapshot(portfolio_investment_id, day)
+
+    with transaction.atomic():
+        stale = PositionSnapshot.objects.filter(
+            portfolio_investment_id=portfolio_investment_id
+        )
+        if start is not None:
+            stale = stale.filter(date__gte=start)
+        stale.delete()
+        PositionSnapshot.objects.bulk_create(snapshots.values())
+
+class _Closes:
+    """Stored daily closes of one ticker, looked up by day."""
+
+    def __init__(self, ticker):
+        bars = price_history.load(ticker, columns=('date', 'close'))
+        self.days = bars['date']
+        self.closes = bars['close']
+
+    def on(self, day):
+        """
+        Returns:
+            Decimal: Close on day, or on the latest trading day before it;
+                None when there is none
+        """
+        index = np.searchsorted(self.days, np.datetime64(day, 'D'), side='right') - 1
+        if index < 0 or np.isnan(self.closes[index]):
+            return None
+        return Decimal(str(self.closes[index]))
+
+class _Position:
+    """Running quantity, average cost and last price of one position."""
+
+    def __init__(self, snapshot=None, closes=None):
+        self.closes = closes
+        self.quantity = snapshot.quantity if snapshot else 0
+        self.cost = snapshot.cost if snapshot else Decimal('0')
+        self.price = snapshot.price if snapshot else Decimal('0')
+
+    def apply(self, past_transaction):
+        quantity = past_transaction.quantity
+        transaction_type = past_transaction.transaction_type
+        if transaction_type == 'BUY' or (
+                transaction_type == 'TRANSFER' and
+                past_transaction.transaction_source != 'TRANSFER_OUT'):
+            self.quantity += quantity
+            self.cost += quantity * past_transaction.price + past_transaction.fees
+            self.price = past_transaction.price
+        elif transaction_type in ('SELL', 'TRANSFER'):
+            if self.quantity > 0:
+                self.cost -= self.cost * min(quantity, self.quantity) / self.quantity
+            self.quantity -= quantity
+            self.price = past_transaction.price
+        elif transaction_type == 'SPLIT':
+            # quantity is the number of shares added by the split
+            if self.quantity > 0:
+                self.price = self.price * self.quantity / (self.quantity + quantity)
+            self.quantity += quantity
+        if self.quantity <= 0:
+            self.cost = Decimal('0')
+
+    def snapshot(self, portfolio_investment_id, day):
+        price = self.price.quantize(CENT)
+        close = self.closes.on(day) if self.closes else None
+        mark = price if close is None else close
+        return PositionSnapshot(
+            portfolio_investment_id=portfolio_investment_id,
+            date=day,
+            quantity=self.quantity,
+            cost=self.cost.quantize(CENT),
+            price=price,
+            market_value=(self.quantity * mark).quantize(CENT)
+        )
+
+def reconcile_positions(portfolio=None):
+    """
+    Compare each position's latest snapshot with PortfolioInvestment.quantity.
+
+    Args:
+        portfolio (Portfolio, optional): Limit the check to one portfolio
+
+    Returns:
+        list: (PortfolioInvestment, recorded quantity, snapshot quantity)
+            for every position that disagrees
+    """
+    latest = PositionSnapshot.objects.filter(
+        portfolio_investment=OuterRef('pk')
+    ).order_by('-date').values('quantity')[:1]
+    positions = PortfolioInvestment.objects.select_related(
+        'portfolio', 'investment'
+    ).annotate(snapshot_quantity=Subquery(latest))
+    if portfolio is not None:
+        positions = positions.filter(portfolio=portfolio)
+
+    return [
+        (position, position.quantity, position.snapshot_quantity or 0)
+        for position in positions
+        if position.quantity != (position.snapshot_quantity or 0)
+    ]
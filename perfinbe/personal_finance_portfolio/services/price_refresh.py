@@ -0,0 +1,129 @@
+# personal_finance_portfolio/services/price_refresh.py
+
+import asyncio
+import time
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from django.db.models import Q
+from django.utils import timezone
+from company_fund_data.services.market_data import get_market_data_client
+from ..models import Investment
+
+class PriceRefresher:
+    """
+    Service class that refreshes Investment.price for held tickers.
+
+    Quotes are requested through a MarketDataClient in batches of the
+    provider's size. Batches run as asyncio tasks in worker threads, at
+    most concurrency at a time; the client still applies its own rate
+    limit, cache and request coalescing. Prices and last_updated are
+    written back with a single bulk_update.
+    """
+
+    def __init__(self, client=None, concurrency=4, staleness=timedelta(hours=12)):
+        self.client = client or get_market_data_client()
+        self.concurrency = concurrency
+        self.staleness = staleness
+
+    def stale_investments(self, now=None):
+        """
+        Args:
+            now (datetime, optional): Reference time, now by default
+
+        Returns:
+            QuerySet: Investments held in any portfolio whose price is
+                missing or older than the staleness
+        """
+        now = now or timezone.now()
+        return Investment.objects.filter(
+            Q(price__isnull=True) | Q(last_updated__lt=now - self.staleness),
+            portfolioinvestment__isnull=False
+        ).distinct()
+
+    def refresh(self, now=None):
+        """
+        Fetch quotes for every stale investment and save the new prices.
+
+        Args:
+            now (datetime, optional): Reference time and the last_updated
+                value written, now by default
+
+        Returns:
+            dict: Counts of stale tickers, updated investments, tickers the
+                provider had no usable quote for, failed batches with their
+                errors, elapsed seconds and tickers per second
+        """
+        started = time.perf_counter()
+        now = now or timezone.now()
+        investments = list(self.stale_investments(now))
+        tickers = sorted({investment.ticker_symbol.upper() for investment in investments})
+
+        quotes, errors = asyncio.run(self.fetch_quotes(tickers))
+
+        updated = []
+        missing = []
+        for investment in investments:
+            ticker = investment.ticker_symbol.upper()
+            price = self._quote_price(quotes.get(ticker))
+            if price is None:
+                missing.append(ticker)
+                continue
+            investment.price = price
+            investment.last_updated = now
+            updated.append(investment)
+        Investment.objects.bulk_update(updated, ['price', 'last_updated'])
+
+        failed = {ticker for batch, _ in errors for ticker in batch}
+        elapsed = time.perf_counter() - started
+        return {
+            'tickers': len(tickers),
+            'updated': len(updated),
+            'missing': sorted(set(missing) - failed),
+            'errors': errors,
+            'elapsed_seconds': elapsed,
+            'tickers_per_second': len(tickers) / elapsed if elapsed else 0,
+        }
+
+    async def fetch_quotes(self, tickers):
+        """
+        Fetch quotes for many tickers with bounded concurrency.
+
+        Args:
+            tickers (list): Upper-case ticker symbols
+
+        Returns:
+            tuple: (quotes, errors) where quotes maps ticker -> quote record
+                and errors lists (batch tickers, message) for failed batches
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batch_size = self.client.provider.max_batch_size
+        batches = [
+            tickers[start:start + batch_size]
+            for start in range(0, len(tickers), batch_size)
+        ]
+
+        async def fetch(batch):
+            async with semaphore:
+                return await asyncio.to_thread(self.client.quotes, batch)
+
+        results = await asyncio.gather(
+            *(fetch(batch) for batch in batches), return_exceptions=True
+        )
+        quotes = {}
+        errors = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                errors.append((batch, str(result)))
+            else:
+                quotes.update(result)
+        return quotes, errors
+
+    @staticmethod
+    def _quote_price(quote):
+        if not quote or quote.get('price') is None:
+            return None
+        try:
+            price = Decimal(str(quote['price'])).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            return None
+        return price if price > 0 else None
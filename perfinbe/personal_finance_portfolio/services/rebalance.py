@@ -0,0 +1,204 @@
+# personal_finance_portfolio/services/rebalance.py
+
+import numpy as np
+from django.utils import timezone
+from ..models import AssetClass, PortfolioInvestment, Transaction
+from .exposure import UNCLASSIFIED, exposure_engine
+
+ASSET_CLASSES = [name for name, _ in AssetClass.ASSET_CHOICES]
+
+# Trades are chosen retirement accounts first; taxable accounts only
+# cover whatever the retirement accounts cannot.
+TIERS = ('retirement', 'brokerage')
+
+def solve_trades(exposure, gap, portfolios, floor, free, penalty=1e6, max_iterations=50):
+    """
+    Smallest trades, in the least-squares sense, that close an exposure gap
+    without moving money between portfolios.
+
+    Minimizes penalty * |exposure @ t - gap|^2 + |t|^2 subject to the
+    trades in each portfolio summing to zero and t >= floor. The equality
+    constrained problem is solved through its KKT system; trades that
+    oversell are pinned at their floor and the rest re-solved until none
+    do.
+
+    Args:
+        exposure (ndarray): (classes, candidates) share of each candidate
+            in each class
+        gap (ndarray): Value to add to each class
+        portfolios (ndarray): Portfolio index of each candidate
+        floor (ndarray): Most negative trade allowed per candidate (minus
+            its current value)
+        free (ndarray): Boolean mask of candidates that may trade
+        penalty (float): Weight of the gap against turnover
+        max_iterations (int): Most active-set passes
+
+    Returns:
+        ndarray: Trade value per candidate, zero where not free
+    """
+    trades = np.zeros(exposure.shape[1])
+    pinned = ~free
+    for _ in range(max_iterations):
+        active = np.flatnonzero(~pinned)
+        if not len(active):
+            break
+        fixed = np.flatnonzero(pinned)
+        residual = gap - exposure[:, fixed] @ trades[fixed]
+        groups, group_index = np.unique(portfolios[active], return_inverse=True)
+        # Pinned trades have to be funded inside their own portfolio.
+        budget = np.zeros(len(groups))
+        inside = np.isin(portfolios[fixed], groups)
+        np.add.at(
+            budget, np.searchsorted(groups, portfolios[fixed][inside]), -trades[fixed][inside]
+        )
+
+        A = exposure[:, active]
+        size = len(active)
+        kkt = np.zeros((size + len(groups), size + len(groups)))
+        kkt[:size, :size] = 2 * (penalty * A.T @ A + np.eye(size))
+        kkt[size + group_index, np.arange(size)] = 1
+        kkt[np.arange(size), size + group_index] = 1
+        rhs = np.concatenate([2 * penalty * A.T @ residual, budget])
+        solution = np.linalg.solve(kkt, rhs)[:size]
+
+        oversold = solution < floor[active] - 1e-6
+        trades[active] = solution
+        if not oversold.any():
+            break
+        pinned[active[oversold]] = True
+        trades[active[oversold]] = floor[active[oversold]]
+    return trades
+
+class Rebalancer:
+    """
+    Service class that proposes trades moving the household to target
+    asset class weights.
+
+    Candidates are every current holding plus, in each portfolio, the
+    household's most representative investment for each asset class, so
+    a class can be bought in an account that does not hold it yet. Asset
+    class shares come from the exposure engine's CategoryWeights; the
+    unclassified part of each holding is left where it is. Trades never
+    move cash between portfolios and are solved a tier at a time with
+    solve_trades: retirement accounts first, where selling realizes no
+    gains, then taxable accounts for the remaining gap.
+    """
+
+    def __init__(self, targets):
+        """
+        Args:
+            targets (dict): AssetClass name -> target weight of the
+                classified household value; normalized
+        """
+        unknown = set(targets) - set(ASSET_CLASSES)
+        if unknown:
+            raise ValueError(f"Unknown asset classes: {', '.join(sorted(unknown))}")
+        total = sum(targets.values())
+        self.targets = np.array([targets.get(name, 0.0) / total for name in ASSET_CLASSES])
+
+    def plan(self, now=None):
+        """
+        Args:
+            now (datetime, optional): Date for the draft transactions
+
+        Returns:
+            dict: trades (unsaved Transaction drafts; new positions get an
+                unsaved PortfolioInvestment), current, target and proposed
+                asset class values, and turnover per account category
+        """
+        now = now or timezone.now()
+        holdings = list(
+            PortfolioInvestment.objects.filter(
+                investment__price__isnull=False, investment__price__gt=0
+            ).select_related('portfolio', 'investment').order_by('pk')
+        )
+        candidates = self._candidates(holdings)
+        if not candidates:
+            return {'trades': [], 'current': {}, 'target': {}, 'proposed': {}, 'turnover': {}}
+
+        investment_ids = np.array([c.investment_id for c in candidates])
+        prices = np.array([float(c.investment.price) for c in candidates])
+        values = np.array([c.quantity for c in candidates]) * prices
+        portfolios = np.array([c.portfolio_id for c in candidates])
+        categories = np.array([c.portfolio.category for c in candidates])
+
+        exposure = self._exposure(investment_ids)
+        current = exposure @ values
+        classified = current[:-1].sum()
+        gap = np.append(self.targets * classified - current[:-1], 0.0)
+
+        trades = np.zeros(len(candidates))
+        for tier in TIERS:
+            trades += solve_trades(
+                exposure, gap - exposure @ trades, portfolios, -values, categories == tier
+            )
+
+        shares = np.rint(trades / prices).astype(np.int64)
+        shares = np.maximum(shares, -np.array([c.quantity for c in candidates]))
+        drafts = [
+            Transaction(
+                portfolio_investment=candidate,
+                transaction_type='BUY' if quantity > 0 else 'SELL',
+                quantity=abs(quantity),
+                price=candidate.investment.price,
+                transaction_date=now,
+                notes='Rebalance'
+            )
+            for candidate, quantity in zip(candidates, shares.tolist()) if quantity
+        ]
+        proposed = exposure @ (values + shares * prices)
+        labels = ASSET_CLASSES + [UNCLASSIFIED]
+        return {
+            'trades': drafts,
+            'current': dict(zip(labels, current.tolist())),
+            'target': dict(zip(ASSET_CLASSES, (self.targets * classified).tolist())),
+            'proposed': dict(zip(labels, proposed.tolist())),
+            'turnover': {
+                tier: float(np.abs(shares * prices)[categories == tier].sum())
+                for tier in TIERS
+            },
+        }
+
+    def _exposure(self, investment_ids):
+        """(asset classes + unclassified, candidates) share matrix."""
+        weights = exposure_engine.weights
+        shares = weights.rollup(
+            np.arange(len(investment_ids)), investment_ids,
+            np.ones(len(investment_ids)), len(investment_ids)
+        )
+        columns = {name: index for index, name in enumerate(weights.category_names)}
+        exposure = np.zeros((len(ASSET_CLASSES) + 1, len(investment_ids)))
+        for row, name in enumerate(ASSET_CLASSES):
+            if name in columns:
+                exposure[row] = shares[:, columns[name]]
+        exposure[-1] = np.clip(1 - exposure[:-1].sum(axis=0), 0, None)
+        return exposure
+
+    def _candidates(self, holdings):
+        """
+        Current holdings plus, per portfolio, an unsaved zero-quantity
+        position in the household's purest holding of each asset class
+        the portfolio lacks.
+        """
+        if not holdings:
+            return []
+        investments = {holding.investment_id: holding.investment for holding in holdings}
+        investment_ids = np.array(sorted(investments))
+        exposure = self._exposure(investment_ids)
+        proxies = {
+            ASSET_CLASSES[row]: investments[investment_ids[np.argmax(exposure[row])]]
+            for row in range(len(ASSET_CLASSES)) if exposure[row].max() > 0
+        }
+
+        candidates = list(holdings)
+        held = {(holding.portfolio_id, holding.investment_id) for holding in holdings}
+        portfolios = {holding.portfolio_id: holding.portfolio for holding in holdings}
+        for portfolio_id, portfolio in portfolios.items():
+            for investment in proxies.values():
+                if (portfolio_id, investment.pk) in held:
+                    continue
+                held.add((portfolio_id, investment.pk))
+                candidates.append(PortfolioInvestment(
+                    portfolio=portfolio, investment=investment, quantity=0
+                ))
+        return candidates
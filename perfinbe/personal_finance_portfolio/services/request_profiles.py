@@ -0,0 +1,92 @@
+# personal_finance_portfolio/services/request_profiles.py
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from django.utils.dateparse import parse_datetime
+import numpy as np
+
+# Sort keys for summarize_profiles, all largest first
+SORT_KEYS = ('p95_ms', 'total_ms', 'mean_queries', 'mean_db_ms')
+
+def read_profiles(log_file, backup_count=0, since=None):
+    """
+    Yield the records written by RequestProfilingMiddleware, oldest first.
+
+    Args:
+        log_file (str or Path): Current log file
+        backup_count (int): Rotated files (log_file.1 ...) to read too
+        since (datetime, optional): Skip records timestamped before this;
+            timezone aware
+
+    Returns:
+        iterator: Record dicts; lines that do not parse (a write cut
+            short by a crash) are skipped
+    """
+    paths = [Path(f"{log_file}.{index}") for index in range(backup_count, 0, -1)]
+    paths.append(Path(log_file))
+    for path in paths:
+        if not path.exists():
+            continue
+        with open(path) as lines:
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since is not None and parse_datetime(record['timestamp']) < since:
+                    continue
+                yield record
+
+def summarize_profiles(records, sort='p95_ms', limit=10, min_requests=1):
+    """
+    Group profiled requests by endpoint and rank the endpoints.
+
+    Args:
+        records (iterable): Records from read_profiles
+        sort (str): One of SORT_KEYS
+        limit (int, optional): Most endpoints to return
+        min_requests (int): Ignore endpoints seen fewer times
+
+    Returns:
+        list: Per endpoint (method and URL route, or path when it did not
+            resolve) a dict of requests, p50_ms, p95_ms, max_ms and
+            total_ms of wall time, mean_queries, max_queries, mean_db_ms,
+            duplicate_requests (requests with repeated queries) and
+            duplicates, the most repeated query fingerprints with the
+            highest count seen in one request, worst endpoint first
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key {sort!r}; use one of {', '.join(SORT_KEYS)}")
+
+    endpoints = defaultdict(list)
+    for record in records:
+        endpoints[(record['method'], record['route'] or record['path'])].append(record)
+
+    summaries = []
+    for (method, endpoint), group in endpoints.items():
+        if len(group) < min_requests:
+            continue
+        wall = np.array([record['wall_ms'] for record in group])
+        queries = np.array([record['queries'] for record in group])
+        duplicates = {}
+        for record in group:
+            for duplicate in record['duplicates']:
+                sql = duplicate['fingerprint']
+                duplicates[sql] = max(duplicates.get(sql, 0), duplicate['count'])
+        summaries.append({
+            'method': method,
+            'endpoint': endpoint,
+            'requests': len(group),
+            'p50_ms': float(np.percentile(wall, 50)),
+            'p95_ms': float(np.percentile(wall, 95)),
+            'max_ms': float(wall.max()),
+            'total_ms': float(wall.sum()),
+            'mean_queries': float(queries.mean()),
+            'max_queries': int(queries.max()),
+            'mean_db_ms': float(np.mean([record['db_ms'] for record in group])),
+            'duplicate_requests': sum(1 for record in group if record['duplicates']),
+            'duplicates': sorted(duplicates.items(), key=lambda item: -item[1])[:3],
+        })
+    summaries.sort(key=lambda summary: -summary[sort])
+    return summaries[:limit] if limit else summaries
@@ -0,0 +1,88 @@
+# personal_finance_portfolio/services/statements/__init__.py
+
+import codecs
+from pathlib import Path
+from ..transaction_import import TransactionImporter
+from .base import CSVStatementParser, StatementParser, StatementRowError
+from .ofx import OFXStatementParser
+from .platforms import CSV_PARSERS
+
+OFX_SUFFIXES = ('.ofx', '.qfx')
+
+def get_parser(portfolio, file_format='csv'):
+    """
+    Pick the statement parser for a portfolio's platform.
+
+    Args:
+        portfolio (Portfolio): Portfolio the statement belongs to
+        file_format (str): 'csv' or 'ofx'
+
+    Returns:
+        StatementParser: Parser bound to the portfolio
+
+    Raises:
+        ValueError: If the format or platform is not supported
+    """
+    if file_format == 'ofx':
+        return OFXStatementParser(portfolio)
+    if file_format != 'csv':
+        raise ValueError(f"Unsupported statement format '{file_format}'")
+    parser_class = CSV_PARSERS.get(portfolio.investment_platform_id)
+    if parser_class is None:
+        raise ValueError(
+            f"No CSV statement parser for {portfolio.investment_platform_id}"
+        )
+    return parser_class(portfolio)
+
+def load_statement(path, portfolio, file_format=None, chunk_size=5000):
+    """
+    Stream a statement file into the portfolio's transactions.
+
+    The parser is a generator and TransactionImporter consumes it in
+    chunk_size batches, so memory stays flat for multi-GB exports.
+
+    Args:
+        path (str or Path): Statement file
+        portfolio (Portfolio): Portfolio to import into
+        file_format (str, optional): 'csv' or 'ofx'; inferred from the suffix
+        chunk_size (int): Rows written per bulk batch
+
+    Returns:
+        dict: TransactionImporter summary plus 'skipped' statement rows
+            and 'unbooked_fractions', (symbol, transaction_type,
+            transaction_source) -> fractional units still carried at the
+            end of the statement
+
+    Raises:
+        UnicodeDecodeError: If the file is not UTF-8
+    """
+    path = Path(path)
+    if file_format is None:
+        file_format = 'ofx' if path.suffix.lower() in OFX_SUFFIXES else 'csv'
+    parser = get_parser(portfolio, file_format)
+    importer = TransactionImporter(batch_size=chunk_size, reinvest_dividends=False)
+
+    check_encoding(path)
+    with open(path, newline='', encoding='utf-8-sig') as statement:
+        summary = importer.import_rows(parser.parse(statement))
+    summary['skipped'] = parser.skipped
+    summary['unbooked_fractions'] = {
+        key: remainder for key, remainder in parser.fractions.items() if remainder
+    }
+    return summary
+
+def check_encoding(path, encoding='utf-8-sig', block_size=1 << 20):
+    """
+    Decode a file strictly, a block at a time, before anything is imported.
+
+    Importing writes in batches as the file is read, so a bad byte found
+    midway would leave a partial import behind.
+
+    Raises:
+        UnicodeDecodeError: At the first byte that does not decode
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+    with open(path, 'rb') as statement:
+        while block := statement.read(block_size):
+            decoder.decode(block)
+    decoder.decode(b'', final=True)
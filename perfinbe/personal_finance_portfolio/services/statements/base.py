@@ -0,0 +1,236 @@
+# personal_finance_portfolio/services/statements/base.py
+
+import csv
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from django.utils import timezone
+from ...models import PortfolioInvestment
+
+# Transaction types that statements report as a cash amount only.
+CASH_TRANSACTION_TYPES = ('DIVIDEND', 'FEE')
+
+class StatementRowError(ValueError):
+    """Raised for a statement row that cannot be mapped to a Transaction."""
+
+class StatementParser:
+    """
+    Base class for broker statement parsers.
+
+    Subclasses implement records(), a generator yielding one normalized
+    dict per statement row; parse() maps those to rows for
+    TransactionImporter. Both are lazy, so a statement is never held in
+    memory. Rows that cannot be mapped are recorded in self.skipped as
+    (position, reason) pairs instead of stopping the import.
+
+    Transaction quantities are whole units. A fractional quantity is
+    rounded and the remainder carried into the next fractional row of the
+    same symbol, type and source, so the booked total never drifts more
+    than half a unit from the statement; each such row notes its statement
+    quantity, and self.fractions holds what is still carried at the end.
+
+    Normalized records carry: symbol, transaction_type, transaction_source,
+    quantity, price, fees, amount, transaction_date, settlement_date, notes.
+    Quantity, price, fees and amount are Decimals or None.
+    """
+
+    platform = None
+
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+        self.skipped = []
+        self.fractions = {}
+        self._holdings = dict(
+            PortfolioInvestment.objects.filter(portfolio=portfolio).values_list(
+                'investment__ticker_symbol', 'pk'
+            )
+        )
+
+    def records(self, statement):
+        """
+        Yield (position, record) pairs from an open statement file. Yield a
+        StatementRowError in place of the record to skip one row.
+        """
+        raise NotImplementedError
+
+    def parse(self, statement):
+        """
+        Stream TransactionImporter rows from an open statement file.
+
+        Args:
+            statement (file): Text file opened by the caller
+
+        Yields:
+            dict: Row keyed by portfolio_investment_id and Transaction fields
+        """
+        for position, record in self.records(statement):
+            try:
+                if isinstance(record, StatementRowError):
+                    raise record
+                yield self._to_import_row(record)
+            except StatementRowError as error:
+                self.skipped.append((position, str(error)))
+
+    def _to_import_row(self, record):
+        portfolio_investment_id = self._holdings.get(record['symbol'])
+        if portfolio_investment_id is None:
+            raise StatementRowError(
+                f"{record['symbol'] or 'Row'} is not held in {self.portfolio}"
+            )
+
+        quantity = record.get('quantity')
+        price = record.get('price')
+        amount = record.get('amount')
+        notes = record.get('notes') or ''
+        if (amount and record['transaction_type'] in CASH_TRANSACTION_TYPES and
+                (not quantity or quantity != quantity.to_integral_value())):
+            # Booked as one unit priced at the cash amount.
+            quantity, price = Decimal('1'), abs(amount)
+        if quantity is None:
+            raise StatementRowError("Missing quantity")
+        quantity = abs(quantity)
+        if price is None:
+            if not amount or not quantity:
+                raise StatementRowError("Missing price")
+            price = (abs(amount) / quantity).quantize(Decimal('0.01'))
+        booked = quantity
+        if quantity != quantity.to_integral_value():
+            booked, carried = self._whole_units(record, quantity)
+            notes = f"{notes} [statement quantity {quantity}, {carried} carried]".lstrip()
+
+        return {
+            'portfolio_investment_id': portfolio_investment_id,
+            'transaction_type': record['transaction_type'],
+            'transaction_source': record.get('transaction_source') or 'PURCHASE',
+            'quantity': int(booked),
+            'price': abs(price),
+            'fees': abs(record.get('fees') or Decimal('0')),
+            'transaction_date': record['transaction_date'],
+            'settlement_date': record.get('settlement_date'),
+            'notes': notes,
+        }
+
+    def _whole_units(self, record, quantity):
+        """
+        Round a fractional quantity together with the remainder carried
+        from earlier rows of the same symbol, type and source.
+
+        Returns:
+            tuple: Whole units to book and the remainder now carried
+        """
+        key = (
+            record['symbol'], record['transaction_type'],
+            record.get('transaction_source') or 'PURCHASE'
+        )
+        total = quantity + self.fractions.get(key, Decimal('0'))
+        booked = total.to_integral_value(rounding=ROUND_HALF_EVEN)
+        self.fractions[key] = total - booked
+        return booked, self.fractions[key]
+
+class CSVStatementParser(StatementParser):
+    """
+    Declarative parser for a broker's CSV activity download.
+
+    Subclasses set columns (record key -> CSV header, or a list of headers
+    to sum for fees), actions (ordered (keyword, transaction_type,
+    transaction_source) triples matched case-insensitively against the
+    action column) and date_formats. Lines before the header row, such as
+    account titles, and trailing disclaimers are skipped.
+    """
+
+    columns = {}
+    actions = []
+    date_formats = ['%m/%d/%Y']
+    symbol = None
+
+    def records(self, statement):
+        header_start = self.columns['transaction_date']
+        lines = iter(statement)
+        for position, line in enumerate(lines, start=1):
+            if line.lstrip().lstrip('"').startswith(header_start):
+                break
+        else:
+            return
+
+        reader = csv.DictReader(
+            _with_first(line, lines), skipinitialspace=True
+        )
+        for row in reader:
+            position += 1
+            if not self._value(row, 'action'):
+                continue  # blank line or footer text
+            try:
+                yield position, self._record(row)
+            except StatementRowError as error:
+                yield position, error
+
+    def _record(self, row):
+        action = self._value(row, 'action')
+        for keyword, transaction_type, transaction_source in self.actions:
+            if keyword.lower() in action.lower():
+                break
+        else:
+            raise StatementRowError(f"Unsupported action '{action}'")
+
+        return {
+            'symbol': self.symbol or self._value(row, 'symbol').upper(),
+            'transaction_type': transaction_type,
+            'transaction_source': transaction_source,
+            'quantity': self._decimal(row, 'quantity'),
+            'price': self._decimal(row, 'price'),
+            'fees': self._decimal(row, 'fees'),
+            'amount': self._decimal(row, 'amount'),
+            'transaction_date': self._date(row, 'transaction_date'),
+            'settlement_date': (
+                self._date(row, 'settlement_date')
+                if self._value(row, 'settlement_date') else None
+            ),
+            'notes': self._value(row, 'notes'),
+        }
+
+    def _value(self, row, key):
+        column = self.columns.get(key)
+        if column is None or isinstance(column, list):
+            return ''
+        return (row.get(column) or '').strip()
+
+    def _decimal(self, row, key):
+        column = self.columns.get(key)
+        if column is None:
+            return None
+        values = [
+            parse_money(row.get(name)) for name in
+            (column if isinstance(column, list) else [column])
+        ]
+        values = [value for value in values if value is not None]
+        return sum(values) if values else None
+
+    def _date(self, row, key):
+        # Some brokers append "as of <date>"; the first token is the trade date.
+        value = self._value(row, key).split(' ')[0]
+        for date_format in self.date_formats:
+            try:
+                return timezone.make_aware(datetime.strptime(value, date_format))
+            except ValueError:
+                continue
+        raise StatementRowError(f"Unrecognized date '{value}'")
+
+def parse_money(value):
+    """
+    Parse a broker-formatted number such as "$1,234.56", "(12.50)" or "--".
+
+    Returns:
+        Decimal or None: None for blank or placeholder values
+    """
+    value = (value or '').strip().replace('$', '').replace(',', '')
+    if value in ('', '-', '--', 'N/A'):
+        return None
+    negative = value.startswith('(') and value.endswith(')')
+    try:
+        number = Decimal(value.strip('()'))
+    except InvalidOperation:
+        raise StatementRowError(f"Unrecognized number '{value}'")
+    return -number if negative else number
+
+def _with_first(first, rest):
+    yield first
+    yield from rest
@@ -0,0 +1,161 @@
+# personal_finance_portfolio/services/statements/ofx.py
+
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from .base import StatementParser, StatementRowError, parse_money
+
+TAG_PATTERN = re.compile(r'<(/?)([A-Za-z0-9_.]+)>([^<]*)')
+READ_SIZE = 64 * 1024
+
+# Investment transaction aggregates -> (transaction_type, transaction_source)
+TRANSACTION_RECORDS = {
+    'BUYSTOCK': ('BUY', 'PURCHASE'),
+    'BUYMF': ('BUY', 'PURCHASE'),
+    'BUYOTHER': ('BUY', 'PURCHASE'),
+    'SELLSTOCK': ('SELL', 'PURCHASE'),
+    'SELLMF': ('SELL', 'PURCHASE'),
+    'SELLOTHER': ('SELL', 'PURCHASE'),
+    'REINVEST': ('BUY', 'REINVESTMENT'),
+    'INCOME': ('DIVIDEND', 'PURCHASE'),
+    'SPLIT': ('SPLIT', 'CORPORATE_ACTION'),
+    'TRANSFER': ('TRANSFER', 'TRANSFER_IN'),
+}
+SECURITY_RECORD = 'SECINFO'
+
+class OFXStatementParser(StatementParser):
+    """
+    Streaming parser for OFX/QFX investment statements, SGML (OFX 1.x,
+    unclosed leaf elements) or XML (OFX 2.x).
+
+    The file is tokenized in fixed-size reads and only the aggregate being
+    built is kept in memory. Brokers list securities in SECLIST after the
+    transactions, so a first pass collects the CUSIP -> ticker map and a
+    second pass yields transactions; the file must be seekable.
+    """
+
+    def records(self, statement):
+        tickers = {}
+        for name, record in _ofx_records(statement, {SECURITY_RECORD}):
+            secid = record.get('SECID', {})
+            ticker = _find(record, 'TICKER')
+            if ticker:
+                tickers[secid.get('UNIQUEID')] = ticker.upper()
+
+        statement.seek(0)
+        position = 0
+        for name, record in _ofx_records(statement, set(TRANSACTION_RECORDS)):
+            position += 1
+            try:
+                yield position, self._record(name, record, tickers)
+            except StatementRowError as error:
+                yield position, error
+
+    def _record(self, name, record, tickers):
+        transaction_type, transaction_source = TRANSACTION_RECORDS[name]
+        unique_id = _find(record, 'UNIQUEID')
+        quantity = parse_money(_find(record, 'UNITS'))
+        price = parse_money(_find(record, 'UNITPRICE'))
+
+        if name == 'SPLIT':
+            new_units = parse_money(_find(record, 'NEWUNITS')) or 0
+            old_units = parse_money(_find(record, 'OLDUNITS')) or 0
+            quantity, price = new_units - old_units, price or 0
+        elif name == 'TRANSFER' and _find(record, 'TFERACTION') == 'OUT':
+            transaction_source = 'TRANSFER_OUT'
+
+        fees = [
+            parse_money(_find(record, tag)) for tag in ('COMMISSION', 'FEES')
+        ]
+        trade_date = _find(record, 'DTTRADE')
+        if not trade_date:
+            raise StatementRowError("Missing DTTRADE")
+        settle_date = _find(record, 'DTSETTLE')
+
+        return {
+            'symbol': tickers.get(unique_id, (unique_id or '').upper()),
+            'transaction_type': transaction_type,
+            'transaction_source': transaction_source,
+            'quantity': quantity,
+            'price': price,
+            'fees': sum(fee for fee in fees if fee is not None),
+            'amount': parse_money(_find(record, 'TOTAL')),
+            'transaction_date': parse_ofx_datetime(trade_date),
+            'settlement_date': parse_ofx_datetime(settle_date) if settle_date else None,
+            'notes': _find(record, 'MEMO') or '',
+        }
+
+def parse_ofx_datetime(value):
+    """
+    Parse an OFX date: YYYYMMDD[HHMMSS[.XXX]][[offset:TZ]].
+
+    Returns:
+        datetime: Timezone-aware; UTC when no offset is given
+    """
+    match = re.match(r'(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::\w+)?\])?', value)
+    if not match:
+        raise StatementRowError(f"Unrecognized OFX date '{value}'")
+    date_part, time_part, offset = match.groups()
+    parsed = datetime.strptime(date_part + (time_part or '000000'), '%Y%m%d%H%M%S')
+    tzinfo = (
+        dt_timezone(timedelta(hours=float(offset))) if offset else dt_timezone.utc
+    )
+    return timezone.localtime(parsed.replace(tzinfo=tzinfo))
+
+def _ofx_tokens(statement):
+    """Yield (closing, tag, text) tokens, reading the file in fixed-size chunks."""
+    buffer = ''
+    while True:
+        chunk = statement.read(READ_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        # Keep the last, possibly incomplete, tag for the next read.
+        cut = buffer.rfind('<')
+        if cut <= 0:
+            continue
+        complete, buffer = buffer[:cut], buffer[cut:]
+        for match in TAG_PATTERN.finditer(complete):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+    for match in TAG_PATTERN.finditer(buffer):
+        yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+
+def _ofx_records(statement, wanted):
+    """
+    Yield (tag, dict) for each closed aggregate whose tag is in wanted.
+
+    Yielded aggregates are not attached to their parents, so the tree
+    built above them stays small however long the statement is.
+    """
+    stack = []
+    for closing, tag, text in _ofx_tokens(statement):
+        if not closing:
+            if text:
+                # Leaf element; in SGML it is never closed.
+                if stack:
+                    stack[-1][1][tag] = text
+            else:
+                stack.append((tag, {}))
+            continue
+
+        if not any(name == tag for name, _ in stack):
+            continue  # closing tag of an XML leaf element
+        while stack:
+            name, aggregate = stack.pop()
+            if name == tag:
+                break
+        if tag in wanted:
+            yield tag, aggregate
+        elif stack:
+            stack[-1][1][tag] = aggregate
+
+def _find(aggregate, tag):
+    """Depth-first lookup of a leaf value within an aggregate."""
+    if tag in aggregate and not isinstance(aggregate[tag], dict):
+        return aggregate[tag]
+    for value in aggregate.values():
+        if isinstance(value, dict):
+            found = _find(value, tag)
+            if found is not None:
+                return found
+    return None
@@ -0,0 +1,165 @@
+# personal_finance_portfolio/services/statements/platforms.py
+
+from decimal import Decimal
+from ...models import InvestmentPlatform
+from .base import CASH_TRANSACTION_TYPES, CSVStatementParser
+
+# Keyword tables shared by brokerages; more specific keywords come first.
+BROKERAGE_ACTIONS = [
+    ('REINVEST', 'BUY', 'REINVESTMENT'),
+    ('DIVIDEND', 'DIVIDEND', 'PURCHASE'),
+    ('SPLIT', 'SPLIT', 'CORPORATE_ACTION'),
+    ('TRANSFER IN', 'TRANSFER', 'TRANSFER_IN'),
+    ('TRANSFER OUT', 'TRANSFER', 'TRANSFER_OUT'),
+    ('BOUGHT', 'BUY', 'PURCHASE'),
+    ('BUY', 'BUY', 'PURCHASE'),
+    ('SOLD', 'SELL', 'PURCHASE'),
+    ('SELL', 'SELL', 'PURCHASE'),
+    ('FEE', 'FEE', 'ADJUSTMENT'),
+]
+
+RETIREMENT_PLAN_ACTIONS = [
+    ('DIVIDEND', 'BUY', 'REINVESTMENT'),
+    ('CONTRIBUTION', 'BUY', 'PURCHASE'),
+    ('PURCHASE', 'BUY', 'PURCHASE'),
+    ('TRANSFER IN', 'TRANSFER', 'TRANSFER_IN'),
+    ('TRANSFER OUT', 'TRANSFER', 'TRANSFER_OUT'),
+    ('WITHDRAWAL', 'SELL', 'PURCHASE'),
+    ('DISTRIBUTION', 'SELL', 'PURCHASE'),
+    ('FEE', 'FEE', 'ADJUSTMENT'),
+]
+
+class FidelityParser(CSVStatementParser):
+    platform = InvestmentPlatform.FIDELITY
+    columns = {
+        'transaction_date': 'Run Date',
+        'action': 'Action',
+        'symbol': 'Symbol',
+        'notes': 'Description',
+        'quantity': 'Quantity',
+        'price': 'Price ($)',
+        'fees': ['Commission ($)', 'Fees ($)'],
+        'amount': 'Amount ($)',
+        'settlement_date': 'Settlement Date',
+    }
+    actions = [
+        ('REINVESTMENT', 'BUY', 'REINVESTMENT'),
+        ('DIVIDEND RECEIVED', 'DIVIDEND', 'PURCHASE'),
+        ('YOU BOUGHT', 'BUY', 'PURCHASE'),
+        ('YOU SOLD', 'SELL', 'PURCHASE'),
+        ('DISTRIBUTION', 'SPLIT', 'CORPORATE_ACTION'),
+        ('TRANSFERRED FROM', 'TRANSFER', 'TRANSFER_IN'),
+        ('TRANSFERRED TO', 'TRANSFER', 'TRANSFER_OUT'),
+        ('FEE', 'FEE', 'ADJUSTMENT'),
+    ]
+
+class SchwabParser(CSVStatementParser):
+    platform = InvestmentPlatform.SCHWAB
+    columns = {
+        'transaction_date': 'Date',
+        'action': 'Action',
+        'symbol': 'Symbol',
+        'notes': 'Description',
+        'quantity': 'Quantity',
+        'price': 'Price',
+        'fees': 'Fees & Comm',
+        'amount': 'Amount',
+    }
+    actions = [
+        ('REINVEST SHARES', 'BUY', 'REINVESTMENT'),
+        ('JOURNALED SHARES', 'TRANSFER', 'TRANSFER_IN'),
+    ] + BROKERAGE_ACTIONS
+
+class EtradeParser(CSVStatementParser):
+    platform = InvestmentPlatform.ETRADE
+    columns = {
+        'transaction_date': 'TransactionDate',
+        'action': 'TransactionType',
+        'symbol': 'Symbol',
+        'notes': 'Description',
+        'quantity': 'Quantity',
+        'price': 'Price',
+        'fees': 'Commission',
+        'amount': 'Amount',
+    }
+    date_formats = ['%m/%d/%y', '%m/%d/%Y']
+    actions = BROKERAGE_ACTIONS
+
+class WellsFargoParser(CSVStatementParser):
+    platform = InvestmentPlatform.WELLS_FARGO
+    columns = {
+        'transaction_date': 'Trade Date',
+        'action': 'Activity',
+        'symbol': 'Symbol',
+        'notes': 'Description',
+        'quantity': 'Quantity',
+        'price': 'Price',
+        'fees': 'Commission',
+        'amount': 'Amount',
+        'settlement_date': 'Settlement Date',
+    }
+    actions = BROKERAGE_ACTIONS
+
+class PrincipalParser(CSVStatementParser):
+    platform = InvestmentPlatform.PRINCIPAL
+    columns = {
+        'transaction_date': 'Date',
+        'action': 'Transaction Type',
+        'symbol': 'Ticker',
+        'notes': 'Investment Option',
+        'quantity': 'Units',
+        'price': 'Unit Price',
+        'amount': 'Amount',
+    }
+    actions = RETIREMENT_PLAN_ACTIONS
+
+class NationwideParser(CSVStatementParser):
+    platform = InvestmentPlatform.NATIONWIDE
+    columns = {
+        'transaction_date': 'Date',
+        'action': 'Activity',
+        'symbol': 'Fund Symbol',
+        'notes': 'Fund Name',
+        'quantity': 'Units',
+        'price': 'Unit Value',
+        'amount': 'Amount',
+    }
+    actions = RETIREMENT_PLAN_ACTIONS
+
+class ProsperParser(CSVStatementParser):
+    """
+    Prosper notes have no ticker; activity is booked against a single
+    PROSPER investment at a unit price of $1, so note purchases and
+    principal payments become quantities and interest is booked as cash.
+    """
+
+    platform = InvestmentPlatform.PROSPER
+    symbol = 'PROSPER'
+    columns = {
+        'transaction_date': 'Date',
+        'action': 'Type',
+        'notes': 'Loan Number',
+        'quantity': 'Amount',
+        'amount': 'Amount',
+    }
+    actions = [
+        ('INTEREST', 'DIVIDEND', 'PURCHASE'),
+        ('INVESTMENT', 'BUY', 'PURCHASE'),
+        ('PRINCIPAL', 'SELL', 'PURCHASE'),
+        ('FEE', 'FEE', 'ADJUSTMENT'),
+    ]
+
+    def _record(self, row):
+        record = super()._record(row)
+        if record['transaction_type'] in CASH_TRANSACTION_TYPES:
+            record['quantity'] = None
+        else:
+            record['price'] = Decimal('1')
+        return record
+
+CSV_PARSERS = {
+    parser.platform: parser for parser in (
+        FidelityParser, SchwabParser, EtradeParser, WellsFargoParser,
+        PrincipalParser, NationwideParser, ProsperParser,
+    )
+}
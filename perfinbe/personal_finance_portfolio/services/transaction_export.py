@@ -0,0 +1,178 @@
+# personal_finance_portfolio/services/transaction_export.py
+
+import csv
+import io
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from ..models import Transaction
+from .transaction_import import IMPORT_FIELDS
+
+# Column name -> Transaction lookup. portfolio_investment_id plus the
+# IMPORT_FIELDS columns can be fed back to import_transactions.
+EXPORT_COLUMNS = {
+    'reference_id': 'reference_id',
+    'portfolio': 'portfolio_investment__portfolio__name',
+    'ticker': 'portfolio_investment__investment__ticker_symbol',
+    'portfolio_investment_id': 'portfolio_investment_id',
+    **{field: field for field in IMPORT_FIELDS},
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+class _Chunks(io.RawIOBase):
+    """Write-only file that hands back whatever was written since last asked."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+class TransactionExporter:
+    """
+    Service class that streams Transaction history as CSV, NDJSON or
+    Parquet.
+
+    Rows are read with values_list over only the exported columns through
+    QuerySet.iterator(chunk_size=...), which uses a server-side cursor
+    where the database has one, and each chunk is encoded and handed on
+    before the next is read. Memory therefore stays at one chunk however
+    long the history is. Parquet needs the optional pyarrow package and
+    writes one row group per chunk.
+    """
+
+    def __init__(self, portfolio=None, since=None, until=None,
+                 transaction_types=None, chunk_size=2000):
+        """
+        Args:
+            portfolio (int, optional): Portfolio pk to export
+            since (datetime, optional): Earliest transaction_date, inclusive
+            until (datetime, optional): Latest transaction_date, inclusive
+            transaction_types (iterable, optional): TRANSACTION_TYPES keys
+            chunk_size (int): Rows fetched and encoded at a time
+        """
+        self.portfolio = portfolio
+        self.since = since
+        self.until = until
+        self.transaction_types = list(transaction_types or [])
+        self.chunk_size = chunk_size
+
+    def queryset(self):
+        transactions = Transaction.objects.all()
+        if self.portfolio is not None:
+            transactions = transactions.filter(portfolio_investment__portfolio_id=self.portfolio)
+        if self.since is not None:
+            transactions = transactions.filter(transaction_date__gte=self.since)
+        if self.until is not None:
+            transactions = transactions.filter(transaction_date__lte=self.until)
+        if self.transaction_types:
+            transactions = transactions.filter(transaction_type__in=self.transaction_types)
+        return transactions.order_by('transaction_date', 'pk').values_list(
+            *EXPORT_COLUMNS.values()
+        )
+
+    def chunks(self):
+        """Yield lists of up to chunk_size row tuples in EXPORT_COLUMNS order."""
+        chunk = []
+        for row in self.queryset().iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def stream(self, export_format):
+        """
+        Args:
+            export_format (str): A FORMATS key
+
+        Returns:
+            iterator: Encoded bytes, one piece per chunk of rows
+
+        Raises:
+            ValueError: Unknown format
+            ImportError: Parquet requested without pyarrow installed
+        """
+        if export_format == 'csv':
+            return self._csv()
+        if export_format == 'ndjson':
+            return self._ndjson()
+        if export_format == 'parquet':
+            return self._parquet(_import_pyarrow())
+        raise ValueError(f"Unknown export format {export_format!r}; use one of {', '.join(FORMATS)}")
+
+    def _csv(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in self.chunks():
+            writer.writerows(chunk)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Header of an empty export
+            yield buffer.getvalue().encode()
+
+    def _ndjson(self):
+        columns = list(EXPORT_COLUMNS)
+        for chunk in self.chunks():
+            yield ''.join(
+                json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+                for row in chunk
+            ).encode()
+
+    def _parquet(self, pyarrow):
+        pa, pq = pyarrow
+        schema = pa.schema([
+            ('reference_id', pa.string()),
+            ('portfolio', pa.string()),
+            ('ticker', pa.string()),
+            ('portfolio_investment_id', pa.int64()),
+            ('transaction_type', pa.string()),
+            ('transaction_source', pa.string()),
+            ('quantity', pa.int64()),
+            ('price', pa.decimal128(10, 2)),
+            ('transaction_date', pa.timestamp('us', tz='UTC')),
+            ('settlement_date', pa.timestamp('us', tz='UTC')),
+            ('fees', pa.decimal128(10, 2)),
+            ('notes', pa.string()),
+        ])
+        sink = _Chunks()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for chunk in self.chunks():
+                columns = list(zip(*chunk))
+                columns[0] = [str(reference_id) for reference_id in columns[0]]
+                writer.write_table(pa.table(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                yield sink.take()
+        yield sink.take()
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet export needs the pyarrow package")
+    return pyarrow, pyarrow.parquet
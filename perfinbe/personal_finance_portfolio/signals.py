@@ -0,0 +1,24 @@
+# personal_finance_portfolio/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import (
+    Category, InvestmentCategory, transaction_created, transactions_created
+)
+from .services.exposure import exposure_engine
+from .services.positions import update_positions
+
+@receiver(transaction_created)
+def update_position_for_transaction(sender, transaction, **kwargs):
+    update_positions([transaction])
+
+@receiver(transactions_created)
+def update_positions_for_batch(sender, transactions, **kwargs):
+    update_positions(transactions)
+
+@receiver(post_save, sender=InvestmentCategory)
+@receiver(post_delete, sender=InvestmentCategory)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_weights(sender, **kwargs):
+    exposure_engine.invalidate()
@@ -1,3 +1,1224 @@
-from django.test import TestCase
+# personal_finance_portfolio/tests.py
 
-# Create your tests here.
+import csv
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+import numpy as np
+from company_fund_data.services.market_data import (
+    FileMarketDataProvider, MarketDataClient
+)
+from company_fund_data.services.price_history import price_history
+from .middleware import fingerprint
+from .models import (
+    BrokerageAccountType, Category, Investment, InvestmentCategory,
+    InvestmentPlatform, Portfolio, PortfolioInvestment, PositionSnapshot,
+    Transaction, transaction_created, transactions_created
+)
+from .services.backtest import AnnualReturns, HistoricalBacktester, current_allocation
+from .services.exposure import CategoryWeights, exposure_engine
+from .services.monte_carlo import MonteCarloSimulator, starting_balances
+from .services.performance import calculate_performance
+from .services.positions import reconcile_positions
+from .services.price_refresh import PriceRefresher
+from .services.rebalance import Rebalancer
+from .services.request_profiles import read_profiles, summarize_profiles
+from .services.statements import get_parser, load_statement
+from .services.transaction_export import EXPORT_COLUMNS, TransactionExporter
+from .services.transaction_import import IMPORT_FIELDS, TransactionImporter
+
+class TransactionImporterTests(TestCase):
+    def setUp(self):
+        self.platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.account_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.portfolio = Portfolio.objects.create(
+            name='Test Portfolio',
+            investment_platform=self.platform,
+            brokerage_account_type=self.account_type,
+            dividend_reinvestment=True
+        )
+        self.investment = Investment.objects.create(
+            ticker_symbol='VTI',
+            name='Vanguard Total Stock Market',
+            price=Decimal('250.00')
+        )
+        self.portfolio_investment = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=self.investment,
+            quantity=0
+        )
+
+    def row(self, **overrides):
+        row = {
+            'portfolio_investment_id': str(self.portfolio_investment.pk),
+            'transaction_type': 'BUY',
+            'quantity': '10',
+            'price': '250.00',
+            'transaction_date': '2024-03-01 10:00:00',
+        }
+        row.update(overrides)
+        return row
+
+    def test_bulk_import_batches_and_reinvests(self):
+        batches = []
+        single_rows = []
+        def on_batch(sender, transactions, **kwargs):
+            batches.append(len(transactions))
+        def on_row(sender, transaction, **kwargs):
+            single_rows.append(transaction)
+        transactions_created.connect(on_batch)
+        transaction_created.connect(on_row)
+        self.addCleanup(transactions_created.disconnect, on_batch)
+        self.addCleanup(transaction_created.disconnect, on_row)
+
+        rows = [self.row() for _ in range(4)]
+        rows.append(self.row(
+            transaction_type='DIVIDEND', quantity='4', price='25.00', fees='0'
+        ))
+        summary = TransactionImporter(batch_size=3).import_rows(iter(rows))
+
+        self.assertEqual(summary['rows'], 5)
+        self.assertEqual(summary['created'], 6)
+        self.assertEqual(summary['reinvestments'], 1)
+        self.assertEqual(summary['errors'], [])
+        self.assertEqual(batches, [3, 3])
+        self.assertEqual(single_rows, [])
+
+        reinvestment = Transaction.objects.get(transaction_source='REINVESTMENT')
+        self.assertEqual(reinvestment.quantity, 4)
+        self.assertEqual(reinvestment.related_transaction.transaction_type, 'DIVIDEND')
+        self.assertIsNotNone(reinvestment.transaction_date.tzinfo)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        rows = [
+            self.row(),
+            self.row(portfolio_investment_id='999'),
+            self.row(transaction_type='GIFT'),
+            self.row(price='abc'),
+            self.row(transaction_date=''),
+        ]
+        summary = TransactionImporter().import_rows(rows)
+
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual([row for row, _ in summary['errors']], [2, 3, 4, 5])
+
+    def test_import_transactions_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='') as csv_file:
+            writer = csv.DictWriter(
+                csv_file, fieldnames=['portfolio_investment_id'] + IMPORT_FIELDS
+            )
+            writer.writeheader()
+            writer.writerow(self.row(fees='1.50', notes='Imported'))
+            csv_file.flush()
+
+            out = StringIO()
+            call_command('import_transactions', csv_file.name, stdout=out)
+
+        self.assertIn('Imported 1 rows as 1 transactions', out.getvalue())
+        self.assertEqual(
+            Transaction.objects.get().fees, Decimal('1.50')
+        )
+
+FIDELITY_CSV = '''
+
+Brokerage
+
+Run Date,Action,Symbol,Description,Type,Quantity,Price ($),Commission ($),Fees ($),Accrued Interest ($),Amount ($),Settlement Date
+03/01/2024,YOU BOUGHT VANGUARD TOTAL STOCK MARKET (VTI) (Cash),VTI,VANGUARD TOTAL STOCK MARKET,Cash,10,250.00,,0.05,,-2500.05,03/04/2024
+03/15/2024,DIVIDEND RECEIVED VANGUARD TOTAL STOCK MARKET (VTI) (Cash),VTI,VANGUARD TOTAL STOCK MARKET,Cash,,,,,,8.75,
+03/15/2024,REINVESTMENT VANGUARD TOTAL STOCK MARKET (VTI) (Cash),VTI,VANGUARD TOTAL STOCK MARKET,Cash,0.035,250.00,,,,-8.75,
+04/02/2024,YOU SOLD AAPL (Cash),AAPL,APPLE INC,Cash,-5,170.00,,,,850.00,04/04/2024
+04/03/2024,"YOU SOLD VANGUARD TOTAL STOCK MARKET (VTI) (Cash)",VTI,VANGUARD TOTAL STOCK MARKET,Cash,-4,"1,260.00",,,,"5,040.00",04/05/2024
+
+
+"The data and information in this spreadsheet is provided to you solely for your use"
+'''
+
+OFX_STATEMENT = '''OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+
+<OFX>
+<INVSTMTMSGSRSV1><INVSTMTTRNRS><INVSTMTRS>
+<INVTRANLIST>
+<DTSTART>20240101
+<BUYSTOCK><INVBUY><INVTRAN><FITID>1<DTTRADE>20240301120000[-5:EST]<DTSETTLE>20240304<MEMO>Buy VTI</INVTRAN>
+<SECID><UNIQUEID>922908769<UNIQUEIDTYPE>CUSIP</SECID>
+<UNITS>12<UNITPRICE>250.00<COMMISSION>1.00<FEES>0.50<TOTAL>-3001.50</INVBUY><BUYTYPE>BUY</BUYSTOCK>
+<SELLSTOCK><INVSELL><INVTRAN><FITID>2<DTTRADE>20240401</INVTRAN>
+<SECID><UNIQUEID>922908769<UNIQUEIDTYPE>CUSIP</SECID>
+<UNITS>-2<UNITPRICE>260.00<TOTAL>520.00</INVSELL><SELLTYPE>SELL</SELLSTOCK>
+<INCOME><INVTRAN><FITID>3<DTTRADE>20240415</INVTRAN>
+<SECID><UNIQUEID>922908769<UNIQUEIDTYPE>CUSIP</SECID>
+<INCOMETYPE>DIV<TOTAL>9.10</INCOME>
+</INVTRANLIST>
+</INVSTMTRS></INVSTMTTRNRS></INVSTMTMSGSRSV1>
+<SECLISTMSGSRSV1><SECLIST>
+<STOCKINFO><SECINFO><SECID><UNIQUEID>922908769<UNIQUEIDTYPE>CUSIP</SECID><SECNAME>Vanguard Total Stock Market<TICKER>VTI</SECINFO></STOCKINFO>
+</SECLIST></SECLISTMSGSRSV1>
+</OFX>
+'''
+
+FIDELITY_HEADER = (
+    'Run Date,Action,Symbol,Description,Type,Quantity,Price ($),Commission ($),'
+    'Fees ($),Accrued Interest ($),Amount ($),Settlement Date\n'
+)
+
+class StatementImportTests(TestCase):
+    def setUp(self):
+        self.platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.account_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.portfolio = Portfolio.objects.create(
+            name='Brokerage',
+            investment_platform=self.platform,
+            brokerage_account_type=self.account_type,
+            dividend_reinvestment=True
+        )
+        self.portfolio_investment = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=Investment.objects.create(
+                ticker_symbol='VTI',
+                name='Vanguard Total Stock Market',
+                price=Decimal('250.00')
+            ),
+            quantity=0
+        )
+
+    def write_statement(self, content, suffix):
+        statement = tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, newline='', delete=False
+        )
+        statement.write(content)
+        statement.close()
+        self.addCleanup(os.remove, statement.name)
+        return statement.name
+
+    def test_fidelity_csv_streams_in_chunks(self):
+        path = self.write_statement(FIDELITY_CSV, '.csv')
+        batches = []
+        def on_batch(sender, transactions, **kwargs):
+            batches.append(len(transactions))
+        transactions_created.connect(on_batch)
+        self.addCleanup(transactions_created.disconnect, on_batch)
+
+        summary = load_statement(path, self.portfolio, chunk_size=2)
+
+        self.assertEqual(summary['created'], 4)
+        self.assertEqual(batches, [2, 2])
+        self.assertEqual(
+            [reason for _, reason in summary['skipped']],
+            ['AAPL is not held in Brokerage']
+        )
+        buy, dividend, reinvestment, sale = Transaction.objects.order_by(
+            'transaction_date', 'pk'
+        )
+        self.assertEqual(
+            (buy.transaction_type, buy.quantity, buy.price, buy.fees),
+            ('BUY', 10, Decimal('250.00'), Decimal('0.05'))
+        )
+        self.assertIsNotNone(buy.settlement_date)
+        self.assertEqual(
+            (dividend.transaction_type, dividend.quantity, dividend.price),
+            ('DIVIDEND', 1, Decimal('8.75'))
+        )
+        self.assertEqual(
+            (reinvestment.transaction_source, reinvestment.quantity), ('REINVESTMENT', 0)
+        )
+        self.assertIn('statement quantity 0.035, 0.035 carried', reinvestment.notes)
+        self.assertEqual(
+            summary['unbooked_fractions'], {('VTI', 'BUY', 'REINVESTMENT'): Decimal('0.035')}
+        )
+        self.assertEqual((sale.transaction_type, sale.quantity), ('SELL', 4))
+        self.assertEqual(sale.price, Decimal('1260.00'))
+
+    def test_fractional_shares_are_carried(self):
+        path = self.write_statement(FIDELITY_HEADER + ''.join(
+            f"04/{day:02d}/2024,REINVESTMENT VANGUARD TOTAL STOCK MARKET (VTI) (Cash),"
+            f"VTI,VANGUARD TOTAL STOCK MARKET,Cash,{units},250.00,,,,-{amount},\n"
+            for day, units, amount in [(1, '0.4', '100.00'), (2, '0.4', '100.00'),
+                                       (3, '2.4', '600.00'), (4, '0.3', '75.00')]
+        ), '.csv')
+        out, err = StringIO(), StringIO()
+
+        call_command(
+            'import_statement', path, portfolio=self.portfolio.pk, stdout=out, stderr=err
+        )
+
+        reinvestments = Transaction.objects.order_by('transaction_date')
+        self.assertEqual([row.quantity for row in reinvestments], [0, 1, 2, 0])
+        self.assertEqual(reinvestments[2].price, Decimal('250.00'))
+        self.assertIn('statement quantity 2.4, 0.2 carried', reinvestments[2].notes)
+        self.assertIn('VTI BUY (REINVESTMENT): 0.5 fractional units not booked', err.getvalue())
+
+    def test_statement_must_be_utf8(self):
+        statement = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        statement.write(FIDELITY_CSV.replace('BOUGHT', 'BOUGHT \xe9').encode('latin-1'))
+        statement.close()
+        self.addCleanup(os.remove, statement.name)
+
+        with self.assertRaisesMessage(CommandError, f'{statement.name} is not UTF-8'):
+            call_command('import_statement', statement.name, portfolio=self.portfolio.pk)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_ofx_statement_maps_cusips_to_tickers(self):
+        path = self.write_statement(OFX_STATEMENT, '.qfx')
+        out, err = StringIO(), StringIO()
+
+        call_command(
+            'import_statement', path, portfolio=self.portfolio.pk,
+            stdout=out, stderr=err
+        )
+
+        self.assertIn('Imported 3 transactions into Brokerage', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
+        buy, sale, dividend = Transaction.objects.order_by('transaction_date')
+        self.assertEqual(
+            (buy.transaction_type, buy.quantity, buy.price, buy.fees),
+            ('BUY', 12, Decimal('250.00'), Decimal('1.50'))
+        )
+        self.assertEqual(buy.notes, 'Buy VTI')
+        self.assertEqual(buy.transaction_date.hour, 17)
+        self.assertEqual((sale.transaction_type, sale.quantity), ('SELL', 2))
+        self.assertEqual(
+            (dividend.transaction_type, dividend.price), ('DIVIDEND', Decimal('9.10'))
+        )
+
+    def test_every_platform_has_a_parser(self):
+        for name, _ in InvestmentPlatform.PLATFORM_CHOICES:
+            with self.subTest(platform=name):
+                self.portfolio.investment_platform_id = name
+                self.assertEqual(get_parser(self.portfolio).platform, name)
+
+class PositionSnapshotTests(TestCase):
+    def setUp(self):
+        self.portfolio = Portfolio.objects.create(
+            name='Test Portfolio',
+            investment_platform=InvestmentPlatform.objects.create(name='Fidelity'),
+            brokerage_account_type=BrokerageAccountType.objects.create(name='Taxable')
+        )
+        self.portfolio_investment = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=Investment.objects.create(
+                ticker_symbol='VTI',
+                name='Vanguard Total Stock Market',
+                price=Decimal('250.00')
+            ),
+            quantity=0
+        )
+
+    def trade(self, transaction_type, quantity, price, day):
+        return Transaction.objects.create(
+            portfolio_investment=self.portfolio_investment,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            price=Decimal(price),
+            transaction_date=timezone.make_aware(datetime(2024, 3, day, 12))
+        )
+
+    def snapshots(self):
+        return list(PositionSnapshot.objects.order_by('date').values_list(
+            'date', 'quantity', 'cost', 'market_value'
+        ))
+
+    def test_transactions_update_snapshots_incrementally(self):
+        self.trade('BUY', 10, '100.00', 1)
+        self.trade('BUY', 10, '120.00', 5)
+        self.trade('SELL', 5, '130.00', 10)
+
+        self.assertEqual(self.snapshots(), [
+            (date(2024, 3, 1), 10, Decimal('1000.00'), Decimal('1000.00')),
+            (date(2024, 3, 5), 20, Decimal('2200.00'), Decimal('2400.00')),
+            (date(2024, 3, 10), 15, Decimal('1650.00'), Decimal('1950.00')),
+        ])
+
+    def test_backdated_trade_corrects_later_snapshots(self):
+        self.trade('BUY', 10, '100.00', 1)
+        self.trade('BUY', 10, '120.00', 10)
+        self.trade('SELL', 4, '110.00', 5)
+
+        self.assertEqual(
+            [quantity for _, quantity, _, _ in self.snapshots()], [10, 6, 16]
+        )
+
+    def test_market_value_uses_price_history_closes(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(PRICE_HISTORY_DIR=root):
+            price_history.write(
+                'VTI', ['2024-03-01', '2024-03-04'], [0, 0], [0, 0], [0, 0],
+                [105.0, 110.0], [0, 0]
+            )
+            self.trade('BUY', 10, '100.00', 1)
+            self.trade('BUY', 10, '120.00', 5)
+
+        self.assertEqual(self.snapshots(), [
+            (date(2024, 3, 1), 10, Decimal('1000.00'), Decimal('1050.00')),
+            (date(2024, 3, 5), 20, Decimal('2200.00'), Decimal('2200.00')),
+        ])
+
+    def test_trade_rebuilds_only_its_position_from_its_date(self):
+        other = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=Investment.objects.create(ticker_symbol='BND', name='Bonds'),
+            quantity=0
+        )
+        Transaction.objects.create(
+            portfolio_investment=other,
+            transaction_type='BUY',
+            quantity=5,
+            price=Decimal('70.00'),
+            transaction_date=timezone.make_aware(datetime(2024, 3, 20, 12))
+        )
+        self.trade('BUY', 10, '100.00', 1)
+        self.trade('BUY', 10, '120.00', 10)
+        kept = set(PositionSnapshot.objects.exclude(
+            portfolio_investment=self.portfolio_investment, date__gte=date(2024, 3, 10)
+        ).values_list('pk', flat=True))
+
+        self.trade('SELL', 4, '110.00', 10)
+
+        self.assertLessEqual(
+            kept, set(PositionSnapshot.objects.values_list('pk', flat=True))
+        )
+        self.assertEqual(
+            [quantity for _, quantity, _, _ in self.snapshots()], [10, 16, 5]
+        )
+
+    def test_holdings_as_of_uses_latest_snapshot(self):
+        self.trade('BUY', 10, '100.00', 1)
+        self.trade('BUY', 5, '120.00', 10)
+
+        holdings = PositionSnapshot.holdings_as_of(self.portfolio, date(2024, 3, 7))
+
+        self.assertEqual([h.quantity for h in holdings], [10])
+        self.assertFalse(
+            PositionSnapshot.holdings_as_of(self.portfolio, date(2024, 2, 1)).exists()
+        )
+
+    def test_reconcile_reports_mismatched_positions(self):
+        self.trade('BUY', 10, '100.00', 1)
+
+        self.assertEqual(
+            reconcile_positions(self.portfolio),
+            [(self.portfolio_investment, 0, 10)]
+        )
+        self.portfolio_investment.quantity = 10
+        self.portfolio_investment.save()
+        out = StringIO()
+        call_command('reconcile_positions', rebuild=True, stdout=out)
+        self.assertIn('All positions match', out.getvalue())
+
+class PerformanceTests(TestCase):
+    def setUp(self):
+        self.platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.account_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.start = date(2023, 1, 2)
+
+    def position(self, name):
+        portfolio = Portfolio.objects.create(
+            name=name,
+            investment_platform=self.platform,
+            brokerage_account_type=self.account_type
+        )
+        return PortfolioInvestment.objects.create(
+            portfolio=portfolio,
+            investment=Investment.objects.create(
+                ticker_symbol=name[:5], name=name, price=Decimal('100.00')
+            ),
+            quantity=0
+        )
+
+    def trade(self, position, transaction_type, quantity, price, offset_days):
+        day = self.start + timedelta(days=offset_days)
+        Transaction.objects.create(
+            portfolio_investment=position,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            price=Decimal(price),
+            transaction_date=timezone.make_aware(
+                datetime(day.year, day.month, day.day, 12)
+            )
+        )
+
+    def test_single_contribution_growth(self):
+        position = self.position('Growth')
+        self.trade(position, 'BUY', 10, '100.00', 0)
+        end = self.start + timedelta(days=365)
+
+        with tempfile.TemporaryDirectory() as root, override_settings(PRICE_HISTORY_DIR=root):
+            price_history.write(
+                position.investment.ticker_symbol, [self.start, end], [0, 0], [0, 0], [0, 0],
+                [100.0, 110.0], [0, 0]
+            )
+            results = calculate_performance(
+                [position.portfolio], as_of=end
+            )[position.portfolio.pk]
+
+        self.assertAlmostEqual(results['1y']['twr'], 0.10)
+        self.assertAlmostEqual(results['1y']['mwr'], 0.10)
+        self.assertAlmostEqual(results['inception']['twr'], 0.10, places=2)
+        self.assertEqual(results['3y'], {'twr': None, 'mwr': None})
+
+    def test_marks_to_investment_price_without_history(self):
+        position = self.position('Quote')
+        self.trade(position, 'BUY', 10, '100.00', 0)
+        end = self.start + timedelta(days=365)
+        Investment.objects.filter(pk=position.investment_id).update(
+            price=Decimal('120.00'),
+            last_updated=timezone.make_aware(datetime(end.year, end.month, end.day, 16))
+        )
+
+        results = calculate_performance([position.portfolio], as_of=end)
+
+        self.assertAlmostEqual(results[position.portfolio.pk]['1y']['twr'], 0.20)
+        # Not known yet the day before
+        results = calculate_performance(
+            [position.portfolio], as_of=end - timedelta(days=1)
+        )
+        self.assertAlmostEqual(results[position.portfolio.pk]['inception']['twr'], 0.0)
+
+    def test_twr_ignores_flow_timing_but_mwr_does_not(self):
+        position = self.position('Timing')
+        self.trade(position, 'BUY', 10, '100.00', 0)
+        self.trade(position, 'BUY', 90, '50.00', 180)
+        self.trade(position, 'SELL', 1, '100.00', 365)
+
+        results = calculate_performance(
+            [position.portfolio], as_of=self.start + timedelta(days=365)
+        )[position.portfolio.pk]['1y']
+
+        # 100 -> 50 -> 100 per share: flat time-weighted, but most of
+        # the money went in at the low.
+        self.assertAlmostEqual(results['twr'], 0.0)
+        self.assertGreater(results['mwr'], 0.5)
+
+    def test_batch_uses_fixed_queries(self):
+        positions = [self.position(f'Portfolio {n}') for n in range(20)]
+        for n, position in enumerate(positions):
+            self.trade(position, 'BUY', 10, '100.00', 0)
+            self.trade(position, 'BUY', 1, f'{100 + n}.00', 200)
+        portfolios = [position.portfolio for position in positions]
+
+        with CaptureQueriesContext(connection) as queries:
+            results = calculate_performance(
+                portfolios, as_of=self.start + timedelta(days=200)
+            )
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(len(results), 20)
+        self.assertAlmostEqual(results[portfolios[5].pk]['inception']['twr'], 0.05)
+        self.assertIsNone(results[portfolios[5].pk]['1y']['twr'])
+
+class PriceRefreshTests(TestCase):
+    def setUp(self):
+        portfolio = Portfolio.objects.create(
+            name='Test Portfolio',
+            investment_platform=InvestmentPlatform.objects.create(name='Fidelity'),
+            brokerage_account_type=BrokerageAccountType.objects.create(name='Taxable')
+        )
+        self.now = timezone.now()
+        self.investments = {}
+        for ticker in ['VTI', 'BND', 'EMB', 'GLD', 'NOQUOTE', 'FRESH', 'UNHELD']:
+            investment = Investment.objects.create(
+                ticker_symbol=ticker, name=ticker, price=Decimal('1.00')
+            )
+            self.investments[ticker] = investment
+            if ticker != 'UNHELD':
+                PortfolioInvestment.objects.create(
+                    portfolio=portfolio, investment=investment, quantity=1
+                )
+        Investment.objects.exclude(ticker_symbol='FRESH').update(
+            last_updated=self.now - timedelta(days=2)
+        )
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.fixture = os.path.join(directory.name, 'quotes.json')
+        with open(self.fixture, 'w') as handle:
+            json.dump({'quote': {
+                ticker: {'symbol': ticker, 'price': price}
+                for ticker, price in [
+                    ('VTI', 250.123), ('BND', 72.5), ('EMB', 88), ('GLD', 190.4),
+                    ('FRESH', 9.99), ('UNHELD', 9.99),
+                ]
+            }}, handle)
+
+    def test_refresh_updates_only_stale_held_tickers(self):
+        provider = FileMarketDataProvider(self.fixture, max_batch_size=2)
+        refresher = PriceRefresher(MarketDataClient(provider), concurrency=2)
+
+        summary = refresher.refresh(now=self.now)
+
+        self.assertEqual(summary['tickers'], 5)
+        self.assertEqual(summary['updated'], 4)
+        self.assertEqual(summary['missing'], ['NOQUOTE'])
+        self.assertEqual(len(provider.calls), 3)
+        prices = dict(Investment.objects.values_list('ticker_symbol', 'price'))
+        self.assertEqual(prices['VTI'], Decimal('250.12'))
+        self.assertEqual(prices['FRESH'], Decimal('1.00'))
+        self.assertEqual(prices['UNHELD'], Decimal('1.00'))
+        self.assertFalse(refresher.stale_investments(self.now).exclude(
+            ticker_symbol='NOQUOTE'
+        ).exists())
+
+    def test_refresh_prices_command(self):
+        out, err = StringIO(), StringIO()
+
+        call_command('refresh_prices', fixture=self.fixture, stdout=out, stderr=err)
+
+        self.assertIn('Updated 4 of 5 stale tickers', out.getvalue())
+        self.assertIn('No quote for: NOQUOTE', err.getvalue())
+
+class MonteCarloTests(TestCase):
+    def deterministic(self, balances, spending, years, **kwargs):
+        return MonteCarloSimulator(
+            balances, years=years, annual_spending=spending,
+            mean_return=0, volatility=0, inflation=0, **kwargs
+        )
+
+    def test_starting_balances_by_account_category(self):
+        platform = InvestmentPlatform.objects.create(name='Fidelity')
+        investment = Investment.objects.create(
+            ticker_symbol='VTI', name='VTI', price=Decimal('200.00')
+        )
+        for name, quantity in [('401K', 10), ('Roth IRA', 5), ('Taxable', 3)]:
+            PortfolioInvestment.objects.create(
+                portfolio=Portfolio.objects.create(
+                    name=name,
+                    investment_platform=platform,
+                    brokerage_account_type=BrokerageAccountType.objects.create(name=name)
+                ),
+                investment=investment,
+                quantity=quantity
+            )
+
+        self.assertEqual(
+            starting_balances(), {'retirement': 3000.0, 'brokerage': 600.0}
+        )
+
+    def test_depletion_without_growth(self):
+        results = self.deterministic(
+            {'brokerage': 100}, 10, 15, tax_rates={'brokerage': 0}
+        ).run(paths=50, seed=1, workers=1)
+
+        self.assertEqual(results['success_rate'], 0.0)
+        self.assertEqual(results['median_depletion_year'], 10)
+        self.assertEqual(results['success_by_year'][9], 1.0)
+        self.assertEqual(results['success_by_year'][10], 0.0)
+
+    def test_withdrawals_are_grossed_up_taxable_first(self):
+        simulator = self.deterministic(
+            {'retirement': 100, 'brokerage': 50}, 40, 2,
+            expenses=[(1, 1, -40)],
+            tax_rates={'brokerage': 0.2, 'retirement': 0.5}
+        )
+        results = simulator.run(paths=10, seed=1, workers=1)
+
+        # Year 0 takes 50 from brokerage to net 40; year 1 is covered by
+        # income, leaving the retirement account untouched.
+        self.assertEqual(results['balance_bands'][50], [150.0, 100.0, 100.0])
+        self.assertEqual(results['success_rate'], 1.0)
+
+    def test_process_pool_matches_single_process(self):
+        simulator = MonteCarloSimulator(
+            {'brokerage': 400_000, 'retirement': 600_000},
+            annual_spending=40_000, expenses=[(2, 5, 20_000)]
+        )
+
+        single = simulator.run(paths=20_000, seed=7, workers=1, batch_size=5_000)
+        pooled = simulator.run(paths=20_000, seed=7, workers=2, batch_size=5_000)
+
+        self.assertEqual(single, pooled)
+        self.assertGreater(single['success_rate'], 0)
+        self.assertLess(single['success_rate'], 1)
+
+class HistoricalBacktestTests(TestCase):
+    def flat_returns(self, years, inflation=None):
+        columns = ['Domestic Equity', 'Government Bonds']
+        returns = np.zeros((years, 2))
+        if inflation is not None:
+            columns.append('Inflation')
+            returns = np.column_stack([returns, np.full(years, inflation)])
+        return AnnualReturns(range(1926, 1926 + years), columns, returns)
+
+    def test_periods_are_views_of_the_stored_returns(self):
+        annual_returns = self.flat_returns(50)
+        backtester = HistoricalBacktester(annual_returns, period=30)
+
+        self.assertEqual(backtester.windows.shape, (21, 2, 30))
+        self.assertTrue(np.shares_memory(backtester.windows, annual_returns.returns))
+        self.assertEqual(list(backtester.start_years[[0, -1]]), [1926, 1946])
+
+    def test_withdrawals_without_growth(self):
+        backtester = HistoricalBacktester(self.flat_returns(40), period=30)
+
+        results = backtester.sweep([{'Domestic Equity': 1}], [0.03, 0.04])
+
+        self.assertEqual(results['success_rates'].tolist(), [[1.0, 0.0]])
+        np.testing.assert_allclose(results['ending_balances'][0, 0], 0.1)
+        self.assertEqual(results['ending_balances'][0, 1].max(), 0.0)
+
+    def test_withdrawals_keep_purchasing_power(self):
+        backtester = HistoricalBacktester(self.flat_returns(3, inflation=0.1), period=3)
+
+        results = backtester.sweep([{'Government Bonds': 1}], [0.1])
+
+        # 1 - 0.1 - 0.11 - 0.121, in first-year dollars
+        np.testing.assert_allclose(
+            results['ending_balances'][0, 0], [0.669 / 1.331]
+        )
+
+    def test_grid_search_over_thousands_of_combinations(self):
+        rng = np.random.default_rng(0)
+        annual_returns = AnnualReturns(
+            range(1926, 2024),
+            ['Domestic Equity', 'Government Bonds', 'Inflation'],
+            np.column_stack([
+                rng.normal(0.10, 0.18, 98), rng.normal(0.05, 0.06, 98),
+                rng.normal(0.03, 0.02, 98),
+            ])
+        )
+        allocations = [
+            {'Domestic Equity': stocks / 100, 'Government Bonds': 1 - stocks / 100}
+            for stocks in range(0, 101)
+        ]
+        rates = np.arange(0.02, 0.08, 0.001)
+
+        started = time.perf_counter()
+        results = HistoricalBacktester(annual_returns).sweep(allocations, rates)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results['success_rates'].shape, (101, len(rates)))
+        self.assertTrue(np.all(np.diff(results['success_rates'], axis=1) <= 0))
+        self.assertLess(elapsed, 5)
+
+    def categorize_holding(self):
+        investment = Investment.objects.create(
+            ticker_symbol='VBAL', name='Balanced', price=Decimal('10.00')
+        )
+        PortfolioInvestment.objects.create(
+            portfolio=Portfolio.objects.create(
+                name='Taxable',
+                investment_platform=InvestmentPlatform.objects.create(name='Fidelity'),
+                brokerage_account_type=BrokerageAccountType.objects.create(name='Taxable')
+            ),
+            investment=investment,
+            quantity=100
+        )
+        for name, percentage in [
+                ('Domestic Equity', 60), ('Government Bonds', 40), ('Technology', 25)]:
+            InvestmentCategory.objects.create(
+                investment=investment,
+                category=Category.objects.create(name=name),
+                percentage=Decimal(percentage)
+            )
+
+    def test_current_allocation_uses_asset_class_categories(self):
+        self.categorize_holding()
+
+        self.assertEqual(
+            current_allocation(), {'Domestic Equity': 0.6, 'Government Bonds': 0.4}
+        )
+
+    def test_backtest_command_with_returns_csv(self):
+        self.categorize_holding()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'returns.csv')
+        with open(path, 'w') as handle:
+            handle.write("Year,Domestic Equity,Government Bonds\n")
+            for year in range(1990, 2000):
+                handle.write(f"{year},5.0,2.0\n")
+
+        out = StringIO()
+        stored = os.path.join(directory.name, 'missing', 'returns.npz')
+        with override_settings(ANNUAL_RETURNS_FILE=stored):
+            call_command(
+                'backtest', returns_csv=path, unit='percent', period=5,
+                rates=[0.04], stdout=out
+            )
+            call_command('backtest', period=5, rates=[0.5], stdout=out)
+
+        np.testing.assert_allclose(AnnualReturns.load(stored).returns[0], [0.05, 0.02])
+        self.assertIn('6 periods of 5 years starting 1990-1995', out.getvalue())
+        self.assertIn('4.00% withdrawal: 100% success', out.getvalue())
+        self.assertIn('50.00% withdrawal: 0% success', out.getvalue())
+
+    def test_returns_csv_unit_is_explicit(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'returns.csv')
+        with open(path, 'w') as handle:
+            handle.write("Year,Government Bonds\n2000,0.5\n2001,0.8\n")
+
+        np.testing.assert_allclose(
+            AnnualReturns.from_csv(path, unit='percent').returns[:, 0], [0.005, 0.008]
+        )
+        np.testing.assert_allclose(AnnualReturns.from_csv(path).returns[:, 0], [0.5, 0.8])
+        with self.assertRaises(ValueError):
+            AnnualReturns.from_csv(path, unit='basis points')
+
+class ExposureTests(TestCase):
+    def setUp(self):
+        platform = InvestmentPlatform.objects.create(name='Vanguard')
+        self.taxable = Portfolio.objects.create(
+            name='Taxable', investment_platform=platform,
+            brokerage_account_type=BrokerageAccountType.objects.create(name='Taxable')
+        )
+        self.ira = Portfolio.objects.create(
+            name='IRA', investment_platform=platform,
+            brokerage_account_type=BrokerageAccountType.objects.create(name='Roth IRA')
+        )
+        self.vti = self.investment('VTI', '200.00', {
+            'Domestic Equity': 100, 'US': 100, 'Technology': 30
+        })
+        self.vxus = self.investment('VXUS', '50.00', {
+            'International Equity': 100, 'Europe': 40
+        })
+        bnd = self.investment('BND', '70.00', {})
+        for portfolio, investment, quantity in [
+            (self.taxable, self.vti, 10), (self.taxable, self.vxus, 20),
+            (self.ira, self.vxus, 10), (self.ira, bnd, 10),
+        ]:
+            PortfolioInvestment.objects.create(
+                portfolio=portfolio, investment=investment, quantity=quantity
+            )
+        exposure_engine.invalidate()
+
+    def investment(self, ticker, price, weights):
+        investment = Investment.objects.create(
+            ticker_symbol=ticker, name=ticker, price=Decimal(price)
+        )
+        for name, percentage in weights.items():
+            category, _ = Category.objects.get_or_create(name=name)
+            InvestmentCategory.objects.create(
+                investment=investment, category=category, percentage=percentage
+            )
+        return investment
+
+    def test_exposure_by_dimension(self):
+        exposures = exposure_engine.exposures()
+
+        taxable = exposures['portfolios'][self.taxable.pk]
+        self.assertEqual(taxable['total'], 3000)
+        self.assertEqual(taxable['asset_class'], {
+            'Domestic Equity': 2000, 'International Equity': 1000, 'Unclassified': 0
+        })
+        self.assertEqual(taxable['geography'], {'Europe': 400, 'US': 2000, 'Unclassified': 600})
+        self.assertEqual(taxable['sector'], {'Technology': 600, 'Unclassified': 2400})
+
+        household = exposures['household']
+        self.assertEqual(household['total'], 4200)
+        self.assertEqual(household['asset_class']['International Equity'], 1500)
+        self.assertEqual(household['asset_class']['Unclassified'], 700)
+
+    def test_weights_cached_until_categories_change(self):
+        exposure_engine.exposures()
+        with self.assertNumQueries(1):
+            exposure_engine.exposures()
+
+        InvestmentCategory.objects.filter(
+            investment=self.vti, category__name='Technology'
+        ).update(percentage=50)
+        # A queryset update sends no signal; saving a row does.
+        InvestmentCategory.objects.get(
+            investment=self.vti, category__name='Technology'
+        ).save()
+
+        exposures = exposure_engine.exposures()
+        self.assertEqual(exposures['portfolios'][self.taxable.pk]['sector']['Technology'], 1000)
+
+    def test_rollup_matches_dense_product(self):
+        rng = np.random.default_rng(0)
+        dense = rng.uniform(0, 1, (300, 40)) * (rng.uniform(0, 1, (300, 40)) < 0.1)
+        rows, columns = np.nonzero(dense)
+        investment_ids = np.arange(300) * 3 + 1
+        weights = CategoryWeights(
+            investment_ids, [str(c) for c in range(40)], rows, columns, dense[rows, columns]
+        )
+        groups = rng.integers(0, 5, 2000)
+        holdings = rng.integers(0, 300, 2000)
+        values = rng.uniform(0, 1000, 2000)
+
+        holdings_matrix = np.zeros((5, 300))
+        np.add.at(holdings_matrix, (groups, holdings), values)
+        np.testing.assert_allclose(
+            weights.rollup(groups, investment_ids[holdings], values, 5),
+            holdings_matrix @ dense
+        )
+
+class RebalanceTests(TestCase):
+    def setUp(self):
+        self.platform = InvestmentPlatform.objects.create(name='Vanguard')
+        self.taxable_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.ira_type = BrokerageAccountType.objects.create(name='Traditional IRA')
+        self.taxable = self.portfolio('Taxable', self.taxable_type)
+        self.ira = self.portfolio('IRA', self.ira_type)
+        self.vti = self.investment('VTI', {'Domestic Equity': 100})
+        self.bnd = self.investment('BND', {'Government Bonds': 100})
+        exposure_engine.invalidate()
+
+    def portfolio(self, name, account_type):
+        return Portfolio.objects.create(
+            name=name, investment_platform=self.platform, brokerage_account_type=account_type
+        )
+
+    def investment(self, ticker, weights, price='100.00'):
+        investment = Investment.objects.create(
+            ticker_symbol=ticker, name=ticker, price=Decimal(price)
+        )
+        InvestmentCategory.objects.bulk_create([
+            InvestmentCategory(
+                investment=investment,
+                category=Category.objects.get_or_create(name=name)[0],
+                percentage=percentage
+            )
+            for name, percentage in weights.items()
+        ])
+        return investment
+
+    def hold(self, portfolio, investment, quantity):
+        PortfolioInvestment.objects.create(
+            portfolio=portfolio, investment=investment, quantity=quantity
+        )
+
+    def trades(self, plan):
+        return sorted(
+            (t.portfolio_investment.portfolio.name, t.portfolio_investment.investment.ticker_symbol,
+             t.transaction_type, t.quantity)
+            for t in plan['trades']
+        )
+
+    def test_trades_inside_retirement_accounts_first(self):
+        self.hold(self.taxable, self.vti, 100)
+        self.hold(self.ira, self.vti, 50)
+        self.hold(self.ira, self.bnd, 50)
+
+        plan = Rebalancer({'Domestic Equity': 60, 'Government Bonds': 40}).plan()
+
+        self.assertEqual(self.trades(plan), [
+            ('IRA', 'BND', 'BUY', 30), ('IRA', 'VTI', 'SELL', 30)
+        ])
+        self.assertEqual(plan['turnover']['brokerage'], 0)
+        self.assertAlmostEqual(plan['proposed']['Government Bonds'], 8_000)
+        self.assertIsNone(plan['trades'][0].pk)
+
+    def test_taxable_accounts_cover_the_rest(self):
+        self.hold(self.taxable, self.vti, 100)
+        self.hold(self.taxable, self.bnd, 5)
+        self.hold(self.ira, self.vti, 10)
+
+        plan = Rebalancer({'Domestic Equity': 1, 'Government Bonds': 1}).plan()
+
+        trades = self.trades(plan)
+        # The IRA swaps everything into a new BND position.
+        self.assertIn(('IRA', 'BND', 'BUY', 10), trades)
+        self.assertIn(('IRA', 'VTI', 'SELL', 10), trades)
+        self.assertAlmostEqual(plan['proposed']['Government Bonds'], 5_750, delta=100)
+        self.assertLessEqual(
+            abs(plan['turnover']['brokerage'] - 2 * 4_250), 200
+        )
+
+    def test_household_of_500_holdings(self):
+        rng = np.random.default_rng(0)
+        classes = ['Domestic Equity', 'International Equity', 'Government Bonds', 'Corporate Bonds']
+        investments = [
+            self.investment(f'F{index}', dict(zip(classes, weights)), f'{price:.2f}')
+            for index, (weights, price) in enumerate(zip(
+                [rng.multinomial(100, rng.dirichlet([0.3] * 4)).tolist() for _ in range(250)],
+                rng.uniform(20, 500, 250)
+            ))
+        ]
+        portfolios = [
+            self.portfolio(f'P{index}', self.ira_type if index % 2 else self.taxable_type)
+            for index in range(10)
+        ]
+        PortfolioInvestment.objects.bulk_create([
+            PortfolioInvestment(portfolio=portfolio, investment=investment, quantity=quantity)
+            for portfolio, investment, quantity in zip(
+                [p for p in portfolios for _ in range(50)], investments * 2,
+                rng.integers(10, 500, 500).tolist()
+            )
+        ])
+        targets = dict(zip(classes, [0.45, 0.15, 0.25, 0.15]))
+
+        started = time.perf_counter()
+        plan = Rebalancer(targets).plan()
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1)
+        total = sum(plan['current'].values())
+        for name, weight in targets.items():
+            self.assertAlmostEqual(plan['proposed'][name] / total, weight, delta=0.01)
+
+class ApiTests(TestCase):
+    def setUp(self):
+        platform = InvestmentPlatform.objects.create(name='Fidelity')
+        account_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.portfolios = [
+            Portfolio.objects.create(
+                name=f'Portfolio {index}', investment_platform=platform,
+                brokerage_account_type=account_type
+            )
+            for index in range(5)
+        ]
+        self.holding = PortfolioInvestment.objects.create(
+            portfolio=self.portfolios[0],
+            investment=Investment.objects.create(
+                ticker_symbol='VTI', name='Total Market', price=Decimal('200.00')
+            ),
+            quantity=30
+        )
+        for day in range(3):
+            Transaction.objects.create(
+                portfolio_investment=self.holding,
+                transaction_type='BUY',
+                quantity=10,
+                price=Decimal('200.00'),
+                transaction_date=timezone.make_aware(datetime(2024, 1, day + 1))
+            )
+        self.holding.refresh_from_db()
+        self.user = User.objects.create_user('owner')
+        self.async_client.force_login(self.user)
+
+    async def test_requires_login(self):
+        await self.async_client.alogout()
+
+        response = await self.async_client.get(reverse('portfolio_api:portfolio-list'))
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_portfolio_keyset_pagination(self):
+        url = reverse('portfolio_api:portfolio-list')
+        names = []
+        while url:
+            response = await self.async_client.get(url, {'limit': 2} if '?' not in url else None)
+            page = response.json()
+            names += [portfolio['name'] for portfolio in page['results']]
+            url = page['next']
+
+        self.assertEqual(names, [f'Portfolio {index}' for index in range(5)])
+        first = (await self.async_client.get(reverse('portfolio_api:portfolio-list'))).json()
+        self.assertEqual(first['results'][0]['market_value'], '6000.00')
+        self.assertEqual(first['results'][0]['holdings'], 1)
+
+        response = await self.async_client.get(
+            reverse('portfolio_api:portfolio-list'), {'limit': 'all'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_holdings_revalidate_with_etag(self):
+        url = reverse('portfolio_api:holding-list', args=[self.portfolios[0].pk])
+
+        response = await self.async_client.get(url)
+        self.assertEqual(response.json()['results'][0]['quantity'], 30)
+        self.assertIn('Last-Modified', response.headers)
+
+        cached = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(cached.status_code, 304)
+
+        await PortfolioInvestment.objects.filter(pk=self.holding.pk).aupdate(quantity=40)
+        changed = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['results'][0]['quantity'], 40)
+
+        missing = await self.async_client.get(
+            reverse('portfolio_api:holding-list', args=[999])
+        )
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_transactions_are_streamed(self):
+        url = reverse('portfolio_api:transaction-list', args=[self.portfolios[0].pk])
+
+        response = await self.async_client.get(url, {'since': '2024-01-02T00:00:00+00:00'})
+
+        self.assertTrue(response.streaming)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        rows = json.loads(body)
+        self.assertEqual([row['transaction_date'][:10] for row in rows], ['2024-01-02', '2024-01-03'])
+        self.assertEqual(rows[0]['ticker'], 'VTI')
+
+    async def test_transaction_export(self):
+        url = reverse('portfolio_api:transaction-export')
+
+        response = await self.async_client.get(url, {
+            'portfolio': self.portfolios[0].pk, 'until': '2024-01-02T00:00:00+00:00'
+        })
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('transactions.csv', response['Content-Disposition'])
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        rows = list(csv.DictReader(StringIO(body.decode())))
+        self.assertEqual([row['transaction_date'][:10] for row in rows], ['2024-01-01', '2024-01-02'])
+        self.assertEqual(rows[0]['ticker'], 'VTI')
+
+        response = await self.async_client.get(url, {'format': 'ndjson', 'type': 'SELL'})
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'')
+
+        response = await self.async_client.get(url, {'format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+class TransactionExportTests(TestCase):
+    def setUp(self):
+        portfolio = Portfolio.objects.create(
+            name='Brokerage',
+            investment_platform=InvestmentPlatform.objects.create(name='Vanguard'),
+            brokerage_account_type=BrokerageAccountType.objects.create(name='Taxable')
+        )
+        self.holding = PortfolioInvestment.objects.create(
+            portfolio=portfolio,
+            investment=Investment.objects.create(ticker_symbol='BND', name='Total Bond'),
+            quantity=0
+        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                portfolio_investment=self.holding,
+                transaction_type='SELL' if index % 4 == 3 else 'BUY',
+                quantity=index + 1,
+                price=Decimal('72.15'),
+                fees=Decimal('0.50'),
+                transaction_date=timezone.make_aware(datetime(2024, 1, 1)) + timedelta(days=index),
+                notes=f'Trade, "{index}"'
+            )
+            for index in range(25)
+        ])
+
+    def test_chunks_are_read_lazily(self):
+        exporter = TransactionExporter(transaction_types=['BUY'], chunk_size=4)
+
+        lines = [json.loads(line) for data in exporter.stream('ndjson')
+                 for line in data.decode().splitlines()]
+
+        self.assertEqual(len(lines), 19)
+        self.assertEqual(list(lines[0]), list(EXPORT_COLUMNS))
+        self.assertEqual(lines[0]['price'], '72.15')
+        self.assertEqual(len(list(exporter.chunks())), 5)
+        with self.assertRaises(ValueError):
+            exporter.stream('xml')
+
+    def test_csv_round_trips_through_import(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'transactions.csv')
+            call_command(
+                'export_transactions', '--output', path, '--chunk-size', '7',
+                '--since', '2024-01-05T00:00:00+00:00', stdout=StringIO()
+            )
+            call_command('import_transactions', path, stdout=StringIO(), stderr=StringIO())
+
+        exported = Transaction.objects.filter(
+            transaction_date__gte=timezone.make_aware(datetime(2024, 1, 5))
+        )
+        self.assertEqual(exported.count(), 42)
+        self.assertEqual(
+            exported.filter(notes='Trade, "4"', quantity=5, fees=Decimal('0.50')).count(), 2
+        )
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow is not installed")
+    def test_parquet_row_groups(self):
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'transactions.parquet')
+            call_command(
+                'export_transactions', '--format', 'parquet', '--output', path,
+                '--chunk-size', '10', stdout=StringIO()
+            )
+            parquet = pq.ParquetFile(path)
+            self.assertEqual(parquet.metadata.num_rows, 25)
+            self.assertEqual(parquet.num_row_groups, 3)
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.log_file = os.path.join(self.directory.name, 'requests.jsonl')
+        profiling = override_settings(REQUEST_PROFILING={
+            'ENABLED': True,
+            'LOG_FILE': self.log_file,
+            'MAX_BYTES': 1024 * 1024,
+            'BACKUP_COUNT': 2,
+            'DUPLICATE_THRESHOLD': 3,
+        })
+        profiling.enable()
+        self.addCleanup(profiling.disable)
+
+        self.category = Category.objects.create(name='Equity')
+        for index in range(4):
+            InvestmentCategory.objects.create(
+                investment=Investment.objects.create(ticker_symbol=f'T{index}', name=f'Fund {index}'),
+                category=self.category,
+                percentage=100
+            )
+        self.user = User.objects.create_superuser('admin', password='secret')
+
+    def records(self):
+        with open(self.log_file) as lines:
+            return [json.loads(line) for line in lines]
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT "x" FROM "t" WHERE "id" = %s AND "k" IN (%s, %s)\n LIMIT 21'),
+            'SELECT "x" FROM "t" WHERE "id" = ? AND "k" IN (...) LIMIT ?'
+        )
+        self.assertEqual(fingerprint("WHERE name = 'O''Brien'"), 'WHERE name = ?')
+
+    def test_admin_n_plus_one_is_flagged(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse('admin:personal_finance_portfolio_investmentcategory_changelist')
+        )
+
+        self.assertEqual(response.status_code, 200)
+        record = self.records()[-1]
+        self.assertEqual(record['route'], 'admin/personal_finance_portfolio/investmentcategory/')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 8)
+        self.assertGreater(record['wall_ms'], record['db_ms'])
+        counts = [duplicate['count'] for duplicate in record['duplicates']]
+        self.assertEqual(counts[:2], [4, 4])
+
+    async def test_async_views_are_profiled(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('portfolio_api:portfolio-list'))
+
+        self.assertEqual(response.status_code, 200)
+        record = self.records()[-1]
+        self.assertEqual(record['view'], 'portfolio_api:portfolio-list')
+        self.assertGreaterEqual(record['queries'], 2)
+
+    def test_slow_endpoints_summary(self):
+        self.client.force_login(self.user)
+        changelist = reverse('admin:personal_finance_portfolio_investmentcategory_changelist')
+        for _ in range(3):
+            self.client.get(changelist)
+        self.client.get(reverse('admin:index'))
+
+        summaries = summarize_profiles(read_profiles(self.log_file), sort='mean_queries')
+        self.assertEqual(summaries[0]['endpoint'], 'admin/personal_finance_portfolio/investmentcategory/')
+        self.assertEqual(summaries[0]['requests'], 3)
+        self.assertEqual(summaries[0]['duplicate_requests'], 3)
+
+        out = StringIO()
+        call_command('slow_endpoints', '--min-requests', '2', stdout=out)
+        self.assertIn('GET admin/personal_finance_portfolio/investmentcategory/', out.getvalue())
+        self.assertIn('4x SELECT', out.getvalue())
+        self.assertNotIn('GET admin/ ', out.getvalue())
+
+    @override_settings(REQUEST_PROFILING={'ENABLED': False})
+    def test_disabled_by_default(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('admin:index'))
+
+        self.assertFalse(os.path.exists(self.log_file))
@@ -0,0 +1,17 @@
+# personal_finance_portfolio/urls.py
+
+from django.urls import path
+from . import views
+
+app_name = 'portfolio_api'
+
+urlpatterns = [
+    path('transactions/export/', views.transaction_export, name='transaction-export'),
+    path('portfolios/', views.portfolio_list, name='portfolio-list'),
+    path('portfolios/<int:portfolio_id>/holdings/', views.holding_list, name='holding-list'),
+    path(
+        'portfolios/<int:portfolio_id>/transactions/',
+        views.transaction_list,
+        name='transaction-list'
+    ),
+]
@@ -1,10 +1,249 @@
-from django.shortcuts import render
-
-# Create your views here.
 # personal_finance_portfolio/views.py
 
-from .models import Portfolio, Investment, PortfolioInvestment, Transaction
+import hashlib
+import json
+from decimal import Decimal
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+from .models import Portfolio, PortfolioInvestment, Transaction
+from .services.transaction_export import FORMATS, TransactionExporter
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+TRANSACTION_CHUNK_SIZE = 2000
+
+class BadRequest(ValueError):
+    """Invalid query parameter, answered with a 400 JSON error."""
+
+def api_view(view):
+    """
+    Wrap an async JSON view: GET only, session authentication required,
+    BadRequest turned into a 400 response.
+    """
+    @require_GET
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        try:
+            return await view(request, *args, **kwargs)
+        except BadRequest as error:
+            return JsonResponse({'error': str(error)}, status=400)
+    return wrapper
+
+def _int_param(request, name, default, maximum=None):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if value < 0:
+        raise BadRequest(f"{name} must not be negative")
+    return min(value, maximum) if maximum else value
+
+def _datetime_param(request, name):
+    if name not in request.GET:
+        return None
+    try:
+        value = parse_datetime(request.GET[name])
+    except ValueError:
+        value = None
+    if value is None:
+        raise BadRequest(f"{name} must be an ISO datetime")
+    return value
+
+async def keyset_page(request, queryset, serialize):
+    """
+    One page of a queryset ordered by pk, starting after the pk in the
+    'after' parameter. Unlike OFFSET, the cost of a page does not grow
+    with how far into the results it is.
+
+    Args:
+        request (HttpRequest): Request carrying 'after' and 'limit'
+        queryset (QuerySet): Rows to page through
+        serialize (callable): Row -> JSON-ready dict
+
+    Returns:
+        dict: results and next, the URL of the following page or None
+    """
+    after = _int_param(request, 'after', 0)
+    limit = _int_param(request, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE) or DEFAULT_PAGE_SIZE
+    rows = [row async for row in queryset.filter(pk__gt=after).order_by('pk')[:limit + 1]]
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        params = request.GET.copy()
+        params['after'] = rows[-1].pk
+        params['limit'] = limit
+        next_url = f"{request.path}?{params.urlencode()}"
+    return {'results': [serialize(row) for row in rows], 'next': next_url}
+
+def _cents(value):
+    # SQLite computes decimal arithmetic in floats; round back to cents.
+    return None if value is None else Decimal(value).quantize(Decimal('0.01'))
+
+def _market_value():
+    return ExpressionWrapper(
+        F('quantity') * F('investment__price'),
+        output_field=DecimalField(max_digits=20, decimal_places=2)
+    )
+
+def _serialize_portfolio(portfolio):
+    return {
+        'id': portfolio.pk,
+        'name': portfolio.name,
+        'platform': portfolio.investment_platform_id,
+        'account_type': portfolio.brokerage_account_type_id,
+        'category': portfolio.category,
+        'dividend_reinvestment': portfolio.dividend_reinvestment,
+        'created_at': portfolio.created_at,
+        'holdings': portfolio.holdings,
+        'market_value': _cents(portfolio.market_value),
+    }
+
+def _serialize_holding(holding):
+    investment = holding.investment
+    return {
+        'id': holding.pk,
+        'investment_id': investment.pk,
+        'ticker': investment.ticker_symbol,
+        'name': investment.name,
+        'quantity': holding.quantity,
+        'price': investment.price,
+        'market_value': _cents(holding.market_value),
+        'last_updated': investment.last_updated,
+    }
+
+@api_view
+async def portfolio_list(request):
+    """Portfolios with holding counts and market values, keyset paginated."""
+    portfolios = Portfolio.objects.annotate(
+        holdings=Count('portfolioinvestment'),
+        market_value=Sum(
+            F('portfolioinvestment__quantity') * F('portfolioinvestment__investment__price'),
+            output_field=DecimalField(max_digits=20, decimal_places=2)
+        )
+    )
+    return JsonResponse(await keyset_page(request, portfolios, _serialize_portfolio))
+
+@api_view
+async def holding_list(request, portfolio_id):
+    """
+    A portfolio's holdings, keyset paginated.
+
+    Responses carry an ETag over the holdings' state and a Last-Modified
+    from the newest Investment.last_updated, both read with one aggregate
+    query, so a revalidating client gets a 304 before any page is loaded.
+    """
+    holdings = PortfolioInvestment.objects.filter(portfolio_id=portfolio_id)
+    state = await holdings.aaggregate(
+        count=Count('pk'),
+        last_pk=Max('pk'),
+        quantity=Sum('quantity'),
+        last_updated=Max('investment__last_updated')
+    )
+    if not state['count'] and not await Portfolio.objects.filter(pk=portfolio_id).aexists():
+        return JsonResponse({'error': 'Portfolio not found'}, status=404)
+
+    version = json.dumps([state, request.GET.urlencode()], cls=DjangoJSONEncoder)
+    etag = f'"{hashlib.md5(version.encode()).hexdigest()}"'
+    last_modified = state['last_updated'] and int(state['last_updated'].timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = JsonResponse(await keyset_page(
+            request,
+            holdings.select_related('investment').annotate(market_value=_market_value()),
+            _serialize_holding
+        ))
+    response.headers['ETag'] = etag
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
+@api_view
+async def transaction_list(request, portfolio_id):
+    """
+    Every transaction of a portfolio, oldest first, streamed as a JSON
+    array from a chunked server-side iterator.
+
+    Optional since and until parameters (ISO datetimes) bound
+    transaction_date.
+    """
+    if not await Portfolio.objects.filter(pk=portfolio_id).aexists():
+        return JsonResponse({'error': 'Portfolio not found'}, status=404)
+    transactions = Transaction.objects.filter(
+        portfolio_investment__portfolio_id=portfolio_id
+    )
+    for name, lookup in (('since', 'transaction_date__gte'), ('until', 'transaction_date__lte')):
+        value = _datetime_param(request, name)
+        if value is not None:
+            transactions = transactions.filter(**{lookup: value})
+    rows = transactions.order_by('transaction_date', 'pk').values(
+        'id', 'reference_id', 'transaction_type', 'transaction_source',
+        'quantity', 'price', 'fees', 'transaction_date', 'settlement_date',
+        'notes', ticker=F('portfolio_investment__investment__ticker_symbol')
+    )
+
+    async def stream():
+        yield '['
+        separator = ''
+        async for row in rows.aiterator(chunk_size=TRANSACTION_CHUNK_SIZE):
+            yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+            separator = ','
+        yield ']'
+
+    return StreamingHttpResponse(stream(), content_type='application/json')
+
+async def _aiterate(chunks):
+    # Each step runs in the thread that owns the database connection, so
+    # the server-side cursor stays open between chunks and only one chunk
+    # is held at a time.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+@api_view
+async def transaction_export(request):
+    """
+    Download transactions as CSV (default), NDJSON or Parquet, streamed
+    by TransactionExporter.
+
+    Optional parameters: format, portfolio (pk), since and until (ISO
+    datetimes bounding transaction_date) and type, repeatable.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in FORMATS:
+        raise BadRequest(f"format must be one of {', '.join(FORMATS)}")
+    transaction_types = request.GET.getlist('type')
+    unknown = set(transaction_types) - {key for key, _ in Transaction.TRANSACTION_TYPES}
+    if unknown:
+        raise BadRequest(f"Unknown transaction types: {', '.join(sorted(unknown))}")
+    portfolio = _int_param(request, 'portfolio', None)
+    if portfolio is not None and not await Portfolio.objects.filter(pk=portfolio).aexists():
+        return JsonResponse({'error': 'Portfolio not found'}, status=404)
 
-def portfolio_list(request):
-    portfolios = Portfolio.objects.all()
-    return render(request, 'portfolio_list.html', {'portfolios': portfolios})
+    exporter = TransactionExporter(
+        portfolio=portfolio,
+        since=_datetime_param(request, 'since'),
+        until=_datetime_param(request, 'until'),
+        transaction_types=transaction_types,
+        chunk_size=TRANSACTION_CHUNK_SIZE
+    )
+    try:
+        chunks = exporter.stream(export_format)
+    except ImportError as error:
+        return JsonResponse({'error': str(error)}, status=501)
+    content_type, extension = FORMATS[export_format]
+    response = StreamingHttpResponse(_aiterate(chunks), content_type=content_type)
+    response.headers['Content-Disposition'] = f'attachment; filename="transactions.{extension}"'
+    return response
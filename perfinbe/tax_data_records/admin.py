@@ -1,6 +1,8 @@
 # tax_data_records/admin.py
 
 from django.contrib import admin
+from django.db.models import Count
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils.html import format_html
 from .models import (
@@ -9,7 +11,9 @@ from .models import (
     TaxLotDisposition,
     WashSale,
     TaxableEvent,
-    Form1099B
+    Form1099B,
+    TaxBracketTable,
+    TaxBracket
 )
 
 @admin.register(TaxableAccount)
@@ -18,6 +22,9 @@ class TaxableAccountAdmin(admin.ModelAdmin):
     list_filter = ('cost_basis_method', 'wash_sale_tracking')
     search_fields = ('portfolio__name',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('portfolio')
+
 @admin.register(TaxLot)
 class TaxLotAdmin(admin.ModelAdmin):
     list_display = (
@@ -35,14 +42,20 @@ class TaxLotAdmin(admin.ModelAdmin):
     )
     search_fields = (
         'account__portfolio__name',
-        'transaction__portfolio_investment__investment__ticker_symbol',
+        'investment__ticker_symbol',
     )
     readonly_fields = ('adjusted_basis',)
 
+    def get_queryset(self, request):
+        # transaction is needed by TaxLot.__str__ for the action checkbox.
+        return super().get_queryset(request).select_related(
+            'account__portfolio', 'investment', 'transaction'
+        )
+
     def get_symbol(self, obj):
-        return obj.transaction.portfolio_investment.investment.ticker_symbol
+        return obj.investment.ticker_symbol
     get_symbol.short_description = 'Symbol'
-    get_symbol.admin_order_field = 'transaction__portfolio_investment__investment__ticker_symbol'
+    get_symbol.admin_order_field = 'investment__ticker_symbol'
 
     def get_portfolio(self, obj):
         return obj.account.portfolio.name
@@ -64,12 +77,17 @@ class TaxLotDispositionAdmin(admin.ModelAdmin):
         'tax_lot__account__portfolio__name',
     )
     search_fields = (
-        'tax_lot__transaction__portfolio_investment__investment__ticker_symbol',
+        'tax_lot__investment__ticker_symbol',
         'tax_lot__account__portfolio__name',
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'tax_lot__investment'
+        ).annotate(wash_sale_count=Count('wash_sales'))
+
     def get_symbol(self, obj):
-        return obj.tax_lot.transaction.portfolio_investment.investment.ticker_symbol
+        return obj.tax_lot.investment.ticker_symbol
     get_symbol.short_description = 'Symbol'
 
     def get_holding_period_status(self, obj):
@@ -77,13 +95,14 @@ class TaxLotDispositionAdmin(admin.ModelAdmin):
     get_holding_period_status.short_description = 'Holding Period'
 
     def view_wash_sales(self, obj):
-        count = obj.wash_sales.count()
+        count = obj.wash_sale_count
         if count:
             url = reverse('admin:tax_data_records_washsale_changelist') + f'?disposition__id={obj.id}'
             return format_html('<a href="{}">View {} Wash Sale{}</a>', 
                              url, count, 's' if count != 1 else '')
         return 'No wash sales'
     view_wash_sales.short_description = 'Wash Sales'
+    view_wash_sales.admin_order_field = 'wash_sale_count'
 
 @admin.register(WashSale)
 class WashSaleAdmin(admin.ModelAdmin):
@@ -98,11 +117,23 @@ class WashSaleAdmin(admin.ModelAdmin):
         'replacement_lot__acquisition_date',
     )
     search_fields = (
-        'disposition__tax_lot__transaction__portfolio_investment__investment__ticker_symbol',
+        'disposition__tax_lot__investment__ticker_symbol',
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'disposition__tax_lot__investment', 'replacement_lot',
+            'replacement_transaction'
+        ).annotate(
+            # Sort key matching WashSale.replacement_date
+            replacement_on=Coalesce(
+                'replacement_lot__acquisition_date',
+                'replacement_transaction__transaction_date'
+            )
+        )
+
     def get_symbol(self, obj):
-        return obj.disposition.tax_lot.transaction.portfolio_investment.investment.ticker_symbol
+        return obj.disposition.tax_lot.investment.ticker_symbol
     get_symbol.short_description = 'Symbol'
 
     def get_disposition_date(self, obj):
@@ -111,9 +142,9 @@ class WashSaleAdmin(admin.ModelAdmin):
     get_disposition_date.admin_order_field = 'disposition__date'
 
     def get_replacement_date(self, obj):
-        return obj.replacement_lot.acquisition_date
+        return obj.replacement_date
     get_replacement_date.short_description = 'Replacement Date'
-    get_replacement_date.admin_order_field = 'replacement_lot__acquisition_date'
+    get_replacement_date.admin_order_field = 'replacement_on'
 
 @admin.register(TaxableEvent)
 class TaxableEventAdmin(admin.ModelAdmin):
@@ -134,6 +165,11 @@ class TaxableEventAdmin(admin.ModelAdmin):
         'account__portfolio__name'
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'account__portfolio', 'transaction__portfolio_investment__investment'
+        )
+
     def get_symbol(self, obj):
         return obj.transaction.portfolio_investment.investment.ticker_symbol
     get_symbol.short_description = 'Symbol'
@@ -164,6 +200,25 @@ class Form1099BAdmin(admin.ModelAdmin):
         'wash_sale_adjustments'
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('account__portfolio')
+
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        obj.calculate_totals()  # Recalculate totals after saving
\ No newline at end of file
+        obj.calculate_totals()  # Recalculate totals after saving
+
+class TaxBracketInline(admin.TabularInline):
+    model = TaxBracket
+    extra = 0
+
+@admin.register(TaxBracketTable)
+class TaxBracketTableAdmin(admin.ModelAdmin):
+    list_display = (
+        'jurisdiction',
+        'tax_year',
+        'filing_status',
+        'income_type',
+        'standard_deduction'
+    )
+    list_filter = ('jurisdiction', 'tax_year', 'filing_status', 'income_type')
+    inlines = [TaxBracketInline]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TaxDataRecordsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tax_data_records"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_investment(apps, schema_editor):
+    TaxLot = apps.get_model("tax_data_records", "TaxLot")
+    Transaction = apps.get_model("personal_finance_portfolio", "Transaction")
+    TaxLot.objects.update(
+        investment_id=Subquery(
+            Transaction.objects.filter(pk=OuterRef("transaction_id")).values(
+                "portfolio_investment__investment_id"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "personal_finance_portfolio",
+            "0013_alter_transaction_options_transaction_fees_and_more",
+        ),
+        ("tax_data_records", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taxlot",
+            name="investment",
+            field=models.ForeignKey(
+                editable=False,
+                help_text="Denormalized from transaction for replacement-lot lookups",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tax_lots",
+                to="personal_finance_portfolio.investment",
+            ),
+        ),
+        migrations.RunPython(populate_investment, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="taxlot",
+            name="investment",
+            field=models.ForeignKey(
+                editable=False,
+                help_text="Denormalized from transaction for replacement-lot lookups",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tax_lots",
+                to="personal_finance_portfolio.investment",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taxlot",
+            index=models.Index(
+                fields=["account", "acquisition_date"],
+                name="tax_data_re_account_ce0cc2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taxlot",
+            index=models.Index(
+                fields=["account", "investment", "acquisition_date"],
+                name="tax_data_re_account_3160e8_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,171 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Federal schedules (IRS Rev. Proc. 2022-38 and 2023-34): filing status ->
+# (standard deduction, ordinary bracket lower bounds, LTCG 15%/20% starts).
+ORDINARY_RATES = (0.10, 0.12, 0.22, 0.24, 0.32, 0.35, 0.37)
+FEDERAL_SCHEDULES = {
+    2023: {
+        "single": (
+            13850,
+            (11000, 44725, 95375, 182100, 231250, 578125),
+            (44625, 492300),
+        ),
+        "married_joint": (
+            27700,
+            (22000, 89450, 190750, 364200, 462500, 693750),
+            (89250, 553850),
+        ),
+        "married_separate": (
+            13850,
+            (11000, 44725, 95375, 182100, 231250, 346875),
+            (44625, 276900),
+        ),
+        "head_of_household": (
+            20800,
+            (15700, 59850, 95350, 182100, 231250, 578100),
+            (59750, 523050),
+        ),
+    },
+    2024: {
+        "single": (
+            14600,
+            (11600, 47150, 100525, 191950, 243725, 609350),
+            (47025, 518900),
+        ),
+        "married_joint": (
+            29200,
+            (23200, 94300, 201050, 383900, 487450, 731200),
+            (94050, 583750),
+        ),
+        "married_separate": (
+            14600,
+            (11600, 47150, 100525, 191950, 243725, 365600),
+            (47025, 291850),
+        ),
+        "head_of_household": (
+            21900,
+            (16550, 63100, 100500, 191950, 243700, 609350),
+            (63000, 551350),
+        ),
+    },
+}
+
+
+def seed_federal_brackets(apps, schema_editor):
+    TaxBracketTable = apps.get_model("tax_data_records", "TaxBracketTable")
+    TaxBracket = apps.get_model("tax_data_records", "TaxBracket")
+    brackets = []
+    for tax_year, schedules in FEDERAL_SCHEDULES.items():
+        for filing_status, (deduction, ordinary, ltcg) in schedules.items():
+            for income_type, bounds, rates in (
+                ("ORDINARY", (0, *ordinary), ORDINARY_RATES),
+                ("LTCG", (0, *ltcg), (0, 0.15, 0.20)),
+            ):
+                table = TaxBracketTable.objects.create(
+                    jurisdiction="US",
+                    tax_year=tax_year,
+                    filing_status=filing_status,
+                    income_type=income_type,
+                    standard_deduction=deduction,
+                )
+                brackets += [
+                    TaxBracket(table=table, lower_bound=lower, rate=rate)
+                    for lower, rate in zip(bounds, rates)
+                ]
+    TaxBracket.objects.bulk_create(brackets)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tax_data_records", "0002_taxlot_investment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaxBracketTable",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "jurisdiction",
+                    models.CharField(
+                        default="US",
+                        help_text="'US' for federal, otherwise a state code",
+                        max_length=10,
+                    ),
+                ),
+                ("tax_year", models.IntegerField()),
+                (
+                    "filing_status",
+                    models.CharField(
+                        choices=[
+                            ("single", "Single"),
+                            ("married_joint", "Married Filing Jointly"),
+                            ("married_separate", "Married Filing Separately"),
+                            ("head_of_household", "Head of Household"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "income_type",
+                    models.CharField(
+                        choices=[
+                            ("ORDINARY", "Ordinary Income"),
+                            ("LTCG", "Long-Term Capital Gains and Qualified Dividends"),
+                        ],
+                        default="ORDINARY",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "standard_deduction",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+            ],
+            options={
+                "unique_together": {
+                    ("jurisdiction", "tax_year", "filing_status", "income_type")
+                },
+            },
+        ),
+        migrations.CreateModel(
+            name="TaxBracket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("lower_bound", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("rate", models.DecimalField(decimal_places=4, max_digits=5)),
+                (
+                    "table",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="brackets",
+                        to="tax_data_records.taxbrackettable",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["lower_bound"],
+                "unique_together": {("table", "lower_bound")},
+            },
+        ),
+        migrations.RunPython(seed_federal_brackets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("personal_finance_portfolio", "0015_positionsnapshot"),
+        ("tax_data_records", "0003_taxbrackettable"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="washsale",
+            name="replacement_transaction",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Replacement purchase in a portfolio without tax lots, such as an IRA",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="wash_sale_replacements",
+                to="personal_finance_portfolio.transaction",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="washsale",
+            name="replacement_lot",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="wash_sale_adjustments",
+                to="tax_data_records.taxlot",
+            ),
+        ),
+    ]
@@ -1,9 +1,12 @@
 from django.db import models
+from django.db.models import F, OuterRef, Q, Subquery, Sum
 from django.core.exceptions import ValidationError
 from datetime import timedelta
 from decimal import Decimal
 import uuid
 
+LONG_TERM_HOLDING_PERIOD = timedelta(days=365)
+
 class TaxableAccount(models.Model):
     """
     Links to portfolios that require tax tracking and defines their tax settings.
@@ -41,6 +44,13 @@ class TaxLot(models.Model):
         on_delete=models.CASCADE,
         related_name='tax_lot'
     )
+    investment = models.ForeignKey(
+        'personal_finance_portfolio.Investment',
+        on_delete=models.CASCADE,
+        related_name='tax_lots',
+        editable=False,
+        help_text="Denormalized from transaction for replacement-lot lookups"
+    )
     quantity = models.IntegerField()
     acquisition_date = models.DateTimeField()
     cost_basis = models.DecimalField(max_digits=10, decimal_places=2)
@@ -50,6 +60,17 @@ class TaxLot(models.Model):
         decimal_places=2,
         help_text="Cost basis adjusted for wash sales"
     )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['account', 'acquisition_date']),
+            models.Index(fields=['account', 'investment', 'acquisition_date'])
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.investment_id:
+            self.investment_id = self.transaction.portfolio_investment.investment_id
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return (f"Lot {self.transaction.reference_id}: "
@@ -82,7 +103,7 @@ class TaxLotDisposition(models.Model):
         super().save(*args, **kwargs)
 
     def is_long_term(self):
-        return self.holding_period >= timedelta(days=365)
+        return self.holding_period >= LONG_TERM_HOLDING_PERIOD
 
 class WashSale(models.Model):
     """
@@ -97,18 +118,39 @@ class WashSale(models.Model):
     replacement_lot = models.ForeignKey(
         TaxLot,
         on_delete=models.CASCADE,
-        related_name='wash_sale_adjustments'
+        related_name='wash_sale_adjustments',
+        null=True,
+        blank=True
+    )
+    replacement_transaction = models.ForeignKey(
+        'personal_finance_portfolio.Transaction',
+        on_delete=models.CASCADE,
+        related_name='wash_sale_replacements',
+        null=True,
+        blank=True,
+        help_text="Replacement purchase in a portfolio without tax lots, such as an IRA"
     )
     disallowed_loss = models.DecimalField(max_digits=10, decimal_places=2)
     wash_sale_window_start = models.DateTimeField()
     wash_sale_window_end = models.DateTimeField()
 
+    @property
+    def replacement_date(self):
+        if self.replacement_lot_id:
+            return self.replacement_lot.acquisition_date
+        return self.replacement_transaction.transaction_date
+
     def clean(self):
+        if not (self.replacement_lot_id or self.replacement_transaction_id):
+            raise ValidationError(
+                "A wash sale needs a replacement lot or replacement transaction"
+            )
+
         # Ensure replacement lot is within 30 days before or after disposition
         window_start = self.disposition.date - timedelta(days=30)
         window_end = self.disposition.date + timedelta(days=30)
         
-        if not (window_start <= self.replacement_lot.acquisition_date <= window_end):
+        if not (window_start <= self.replacement_date <= window_end):
             raise ValidationError(
                 "Replacement lot must be within 30 days of disposition"
             )
@@ -182,28 +224,98 @@ class Form1099B(models.Model):
         ]
 
     def calculate_totals(self):
-        """Recalculates all totals based on linked dispositions."""
-        st_proceeds = Decimal('0')
-        st_basis = Decimal('0')
-        lt_proceeds = Decimal('0')
-        lt_basis = Decimal('0')
-        wash_adjustments = Decimal('0')
-        
-        for disp in self.dispositions.all():
-            if disp.is_long_term():
-                lt_proceeds += disp.proceeds
-                lt_basis += (disp.quantity * disp.tax_lot.adjusted_basis)
-            else:
-                st_proceeds += disp.proceeds
-                st_basis += (disp.quantity * disp.tax_lot.adjusted_basis)
-            
-            wash_adjustments += sum(
-                ws.disallowed_loss for ws in disp.wash_sales.all()
-            )
+        """
+        Recalculates all totals based on linked dispositions.
+
+        Short and long term totals and wash sale adjustments come from a
+        single aggregate query, with the long term split on holding_period
+        done in SQL.
+        """
+        long_term = Q(holding_period__gte=LONG_TERM_HOLDING_PERIOD)
+        short_term = Q(holding_period__lt=LONG_TERM_HOLDING_PERIOD)
+        basis = F('quantity') * F('tax_lot__adjusted_basis')
+        disallowed_losses = WashSale.objects.filter(
+            disposition=OuterRef('pk')
+        ).values('disposition').annotate(
+            total=Sum('disallowed_loss')
+        ).values('total')
+
+        totals = self.dispositions.annotate(
+            disallowed_loss=Subquery(disallowed_losses)
+        ).aggregate(
+            lt_proceeds=Sum('proceeds', filter=long_term),
+            lt_basis=Sum(basis, filter=long_term),
+            st_proceeds=Sum('proceeds', filter=short_term),
+            st_basis=Sum(basis, filter=short_term),
+            wash_adjustments=Sum('disallowed_loss')
+        )
+        # SQLite sums decimals as floats; round back to the stored cents.
+        totals = {
+            name: Decimal(value or 0).quantize(Decimal('0.01'))
+            for name, value in totals.items()
+        }
         
-        self.lt_covered_proceeds = lt_proceeds
-        self.lt_covered_basis = lt_basis
-        self.st_covered_proceeds = st_proceeds
-        self.st_covered_basis = st_basis
-        self.wash_sale_adjustments = wash_adjustments
-        self.save()
\ No newline at end of file
+        self.lt_covered_proceeds = totals['lt_proceeds']
+        self.lt_covered_basis = totals['lt_basis']
+        self.st_covered_proceeds = totals['st_proceeds']
+        self.st_covered_basis = totals['st_basis']
+        self.wash_sale_adjustments = totals['wash_adjustments']
+        self.save()
+
+class TaxBracketTable(models.Model):
+    """
+    Tax rate schedule for one jurisdiction, tax year, filing status and
+    kind of income. Rates apply to taxable income, after the standard
+    deduction.
+    """
+    FILING_STATUSES = [
+        ('single', 'Single'),
+        ('married_joint', 'Married Filing Jointly'),
+        ('married_separate', 'Married Filing Separately'),
+        ('head_of_household', 'Head of Household'),
+    ]
+    INCOME_TYPES = [
+        ('ORDINARY', 'Ordinary Income'),
+        ('LTCG', 'Long-Term Capital Gains and Qualified Dividends'),
+    ]
+
+    jurisdiction = models.CharField(
+        max_length=10,
+        default='US',
+        help_text="'US' for federal, otherwise a state code"
+    )
+    tax_year = models.IntegerField()
+    filing_status = models.CharField(max_length=20, choices=FILING_STATUSES)
+    income_type = models.CharField(
+        max_length=10, choices=INCOME_TYPES, default='ORDINARY'
+    )
+    standard_deduction = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0
+    )
+
+    class Meta:
+        unique_together = ('jurisdiction', 'tax_year', 'filing_status', 'income_type')
+
+    def __str__(self):
+        return (f"{self.jurisdiction} {self.tax_year} "
+                f"{self.get_filing_status_display()} ({self.income_type})")
+
+class TaxBracket(models.Model):
+    """
+    One bracket of a TaxBracketTable: the rate applies to taxable income
+    from lower_bound up to the next bracket's lower bound.
+    """
+    table = models.ForeignKey(
+        TaxBracketTable,
+        on_delete=models.CASCADE,
+        related_name='brackets'
+    )
+    lower_bound = models.DecimalField(max_digits=12, decimal_places=2)
+    rate = models.DecimalField(max_digits=5, decimal_places=4)
+
+    class Meta:
+        ordering = ['lower_bound']
+        unique_together = ('table', 'lower_bound')
+
+    def __str__(self):
+        return f"{self.rate:.2%} from {self.lower_bound}"
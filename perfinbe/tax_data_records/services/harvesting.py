@@ -0,0 +1,166 @@
+# tax_data_records/services/harvesting.py
+
+import numpy as np
+from django.utils import timezone
+from personal_finance_portfolio.models import Transaction
+from ..models import LONG_TERM_HOLDING_PERIOD, TaxLot
+from .wash_sale import WASH_SALE_WINDOW
+
+def rank_harvest_candidates(quantity, basis, price, held_seconds, replacement_buys,
+                            short_term_rate=0.24, long_term_rate=0.15, min_loss=0):
+    """
+    Rank lots by the tax saved from selling them now, all lots at once.
+
+    Args:
+        quantity (array-like): Remaining quantity per lot
+        basis (array-like): Adjusted basis per share
+        price (array-like): Current price per share
+        held_seconds (array-like): Time each lot has been held
+        replacement_buys (array-like): Purchases of the same investment
+            within the wash sale window, not counting the lot itself
+        short_term_rate (float): Tax rate on short-term losses
+        long_term_rate (float): Tax rate on long-term losses
+        min_loss (float): Smallest loss worth harvesting
+
+    Returns:
+        dict: gain, long_term and tax_benefit per lot, wash_sale (loss
+            lots blocked by a replacement purchase) and order, the indices
+            of eligible lots by tax benefit, largest first
+    """
+    quantity = np.asarray(quantity, dtype=np.float64)
+    gain = quantity * (np.asarray(price, dtype=np.float64) - np.asarray(basis, dtype=np.float64))
+    long_term = np.asarray(held_seconds) >= LONG_TERM_HOLDING_PERIOD.total_seconds()
+    tax_benefit = np.maximum(-gain, 0) * np.where(long_term, long_term_rate, short_term_rate)
+
+    loss = (gain < 0) & (-gain >= min_loss)
+    wash_sale = loss & (np.asarray(replacement_buys) > 0)
+    eligible = np.flatnonzero(loss & ~wash_sale)
+    order = eligible[np.argsort(-tax_benefit[eligible], kind='stable')]
+    return {
+        'gain': gain,
+        'long_term': long_term,
+        'tax_benefit': tax_benefit,
+        'wash_sale': wash_sale,
+        'order': order,
+    }
+
+class HarvestScanner:
+    """
+    Service class that finds open tax lots worth selling for the loss.
+
+    Open lots in every non-retirement TaxableAccount are read with one
+    query and purchases in the wash sale window, from every portfolio
+    including IRAs, with another. Everything after that is array
+    arithmetic in rank_harvest_candidates.
+    """
+
+    def __init__(self, short_term_rate=0.24, long_term_rate=0.15, min_loss=0):
+        """
+        Args:
+            short_term_rate (float): Tax rate saved per dollar of
+                short-term loss, usually the ordinary marginal rate
+            long_term_rate (float): Tax rate saved per dollar of long-term
+                loss
+            min_loss (float): Smallest loss worth harvesting
+        """
+        self.short_term_rate = short_term_rate
+        self.long_term_rate = long_term_rate
+        self.min_loss = min_loss
+
+    def scan(self, as_of=None, limit=None):
+        """
+        Args:
+            as_of (datetime, optional): Sale date, now by default
+            limit (int, optional): Most candidates to return
+
+        Returns:
+            dict: candidates (dicts of tax_lot, account, ticker, quantity,
+                unrealized_loss, long_term and tax_benefit, best first),
+                total_benefit of all eligible lots, and wash_sale_blocked,
+                the number of loss lots skipped for a recent purchase
+        """
+        as_of = as_of or timezone.now()
+        rows = list(
+            TaxLot.objects.filter(
+                remaining_quantity__gt=0,
+                investment__price__isnull=False
+            ).exclude(
+                account__portfolio__brokerage_account_type__category='retirement'
+            ).values_list(
+                'pk', 'transaction_id', 'account_id', 'investment_id',
+                'investment__ticker_symbol', 'quantity', 'remaining_quantity',
+                'adjusted_basis', 'acquisition_date', 'investment__price'
+            )
+        )
+        if not rows:
+            return {'candidates': [], 'total_benefit': 0.0, 'wash_sale_blocked': 0}
+
+        (lot_ids, transaction_ids, account_ids, investment_ids, tickers,
+         lot_quantities, quantities, bases, acquired, prices) = zip(*rows)
+        investment_ids = np.array(investment_ids)
+        held_seconds = as_of.timestamp() - np.fromiter(
+            (date.timestamp() for date in acquired), dtype=np.float64, count=len(rows)
+        )
+        # adjusted_basis is the lot total; only the remaining shares are sold.
+        basis_per_share = (
+            np.array(bases, dtype=np.float64) / np.array(lot_quantities, dtype=np.float64)
+        )
+        ranked = rank_harvest_candidates(
+            quantities,
+            basis_per_share,
+            np.array(prices, dtype=np.float64),
+            held_seconds,
+            self.replacement_buys(investment_ids, np.array(transaction_ids), as_of),
+            self.short_term_rate,
+            self.long_term_rate,
+            self.min_loss
+        )
+
+        order = ranked['order'] if limit is None else ranked['order'][:limit]
+        candidates = [
+            {
+                'tax_lot': lot_ids[index],
+                'account': account_ids[index],
+                'ticker': tickers[index],
+                'quantity': quantities[index],
+                'unrealized_loss': float(-ranked['gain'][index]),
+                'long_term': bool(ranked['long_term'][index]),
+                'tax_benefit': float(ranked['tax_benefit'][index]),
+            }
+            for index in order.tolist()
+        ]
+        return {
+            'candidates': candidates,
+            'total_benefit': float(ranked['tax_benefit'][ranked['order']].sum()),
+            'wash_sale_blocked': int(ranked['wash_sale'].sum()),
+        }
+
+    @staticmethod
+    def replacement_buys(investment_ids, transaction_ids, as_of):
+        """
+        Count purchases that would make a sale on as_of a wash sale.
+
+        Args:
+            investment_ids (ndarray): Investment of each lot
+            transaction_ids (ndarray): Purchase transaction of each lot
+            as_of (datetime): Sale date
+
+        Returns:
+            ndarray: Per lot, BUY transactions of its investment in any
+                portfolio within the 30 days before as_of, other than the
+                lot's own purchase
+        """
+        buys = np.array(
+            Transaction.objects.filter(
+                transaction_type='BUY',
+                transaction_date__gte=as_of - WASH_SALE_WINDOW,
+                transaction_date__lte=as_of
+            ).values_list('pk', 'portfolio_investment__investment_id'),
+            dtype=np.int64
+        ).reshape(-1, 2)
+        if not len(buys):
+            return np.zeros(len(investment_ids), dtype=np.int64)
+        bought, counts = np.unique(buys[:, 1], return_counts=True)
+        position = np.minimum(np.searchsorted(bought, investment_ids), len(bought) - 1)
+        per_lot = np.where(bought[position] == investment_ids, counts[position], 0)
+        return per_lot - np.isin(transaction_ids, buys[:, 0])
@@ -0,0 +1,189 @@
+# tax_data_records/services/irmaa.py
+
+import hashlib
+from threading import Lock
+import numpy as np
+
+MEDICARE_AGE = 65
+LOOKBACK_YEARS = 2
+
+# Medicare Part B premiums and Part D surcharges (CMS fact sheets) by
+# premium year. A beneficiary is in tier n when MAGI from two years
+# earlier exceeds the nth threshold; married filing separately jumps from
+# the standard premium straight to the top two tiers, so its middle
+# thresholds repeat. Head of household uses the single thresholds.
+IRMAA_TABLES = {
+    2023: {
+        'thresholds': {
+            'single': (97_000, 123_000, 153_000, 183_000, 500_000),
+            'married_joint': (194_000, 246_000, 306_000, 366_000, 750_000),
+            'married_separate': (97_000, 97_000, 97_000, 97_000, 403_000),
+        },
+        'part_b': (164.90, 230.80, 329.70, 428.60, 527.50, 560.50),
+        'part_d': (0.00, 12.20, 31.50, 50.70, 70.00, 76.40),
+    },
+    2024: {
+        'thresholds': {
+            'single': (103_000, 129_000, 161_000, 193_000, 500_000),
+            'married_joint': (206_000, 258_000, 322_000, 386_000, 750_000),
+            'married_separate': (103_000, 103_000, 103_000, 103_000, 397_000),
+        },
+        'part_b': (174.70, 244.60, 349.40, 454.20, 559.00, 594.00),
+        'part_d': (0.00, 12.90, 33.30, 53.80, 74.20, 81.00),
+    },
+    2025: {
+        'thresholds': {
+            'single': (106_000, 133_000, 167_000, 200_000, 500_000),
+            'married_joint': (212_000, 266_000, 334_000, 400_000, 750_000),
+            'married_separate': (106_000, 106_000, 106_000, 106_000, 394_000),
+        },
+        'part_b': (185.00, 259.00, 370.00, 480.90, 591.90, 628.90),
+        'part_d': (0.00, 13.70, 35.30, 57.00, 78.60, 85.80),
+    },
+}
+
+FILING_STATUS_THRESHOLDS = {
+    'single': 'single',
+    'head_of_household': 'single',
+    'married_joint': 'married_joint',
+    'married_separate': 'married_separate',
+}
+
+def _compile_tables():
+    """
+    Stack the tables into arrays indexed by table row: the years, the
+    thresholds per filing status as (years, 5) and the premiums as
+    (years, 6).
+    """
+    years = sorted(IRMAA_TABLES)
+    tables = [IRMAA_TABLES[year] for year in years]
+    return {
+        'years': np.array(years),
+        'thresholds': {
+            status: np.array([table['thresholds'][status] for table in tables], dtype=np.float64)
+            for status in tables[0]['thresholds']
+        },
+        'part_b': np.array([table['part_b'] for table in tables]),
+        'part_d': np.array([table['part_d'] for table in tables]),
+    }
+
+COMPILED_TABLES = _compile_tables()
+
+def project_irmaa(magi, start_year, filing_status='single', birth_year=None):
+    """
+    IRMAA tiers and surcharges for whole MAGI trajectories at once.
+
+    MAGI for income year y sets the premiums for y + 2, so a series that
+    starts in start_year yields premiums for start_year + 2 onwards. Each
+    premium year has its own thresholds; the tier is the number of that
+    year's thresholds the MAGI exceeds, found with one broadcast
+    comparison for every path and year.
+
+    Args:
+        magi (array-like): MAGI per income year, shape (years,) or
+            (paths, years)
+        start_year (int): Income year of the first column
+        filing_status (str): TaxBracketTable filing status
+        birth_year (int, optional): Beneficiary's year of birth; premiums
+            before age 65 are zero. Without it every year is on Medicare.
+
+    Returns:
+        dict: premium years, tiers, monthly part_b premiums and part_d
+            surcharges, and annual_surcharge (twelve months of both above
+            the standard Part B premium), each the shape of magi except
+            years
+
+    Raises:
+        ValueError: A Medicare year precedes the first table
+    """
+    magi = np.asarray(magi, dtype=np.float64)
+    premium_years = start_year + LOOKBACK_YEARS + np.arange(magi.shape[-1])
+    enrolled = np.ones(len(premium_years), dtype=bool)
+    if birth_year is not None:
+        enrolled = premium_years - birth_year >= MEDICARE_AGE
+    # Years past the last table reuse it.
+    rows = np.searchsorted(COMPILED_TABLES['years'], premium_years, side='right') - 1
+    if np.any(enrolled & (rows < 0)):
+        raise ValueError(f"No IRMAA table before {COMPILED_TABLES['years'][0]}")
+    rows = np.maximum(rows, 0)
+    thresholds = COMPILED_TABLES['thresholds'][FILING_STATUS_THRESHOLDS[filing_status]][rows]
+
+    tiers = (magi[..., None] > thresholds).sum(axis=-1)
+    part_b = COMPILED_TABLES['part_b'][rows, tiers]
+    part_d = COMPILED_TABLES['part_d'][rows, tiers]
+    surcharge = 12 * (part_b - COMPILED_TABLES['part_b'][rows, 0] + part_d)
+    if birth_year is not None:
+        part_b = np.where(enrolled, part_b, 0.0)
+        part_d = np.where(enrolled, part_d, 0.0)
+        surcharge = np.where(enrolled, surcharge, 0.0)
+        tiers = np.where(enrolled, tiers, 0)
+    return {
+        'years': premium_years,
+        'tiers': tiers,
+        'part_b': part_b,
+        'part_d': part_d,
+        'annual_surcharge': surcharge,
+    }
+
+class IRMAAProjector:
+    """
+    project_irmaa with results cached by income trajectory.
+
+    The cache key is a digest of the MAGI values that can change a
+    premium (with a birth year, only income years whose premiums fall at
+    65 or later) plus the other inputs, so what-if runs that change
+    anything else, including earlier income, reuse the surcharges.
+    """
+
+    max_entries = 256
+
+    def __init__(self):
+        self._cache = {}
+        self._lock = Lock()
+
+    def project(self, magi, start_year, filing_status='single', birth_year=None):
+        """
+        Args and Returns as for project_irmaa; the returned arrays are
+        shared between callers and read-only.
+        """
+        magi = np.asarray(magi, dtype=np.float64)
+        key = (
+            self.trajectory_digest(magi, start_year, birth_year),
+            magi.shape, start_year, filing_status, birth_year,
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        projection = project_irmaa(magi, start_year, filing_status, birth_year)
+        for values in projection.values():
+            values.flags.writeable = False
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                self._cache.clear()
+            self._cache[key] = projection
+        return projection
+
+    @staticmethod
+    def trajectory_digest(magi, start_year, birth_year=None):
+        """
+        Args:
+            magi (ndarray): MAGI per income year, years last
+            start_year (int): Income year of the first column
+            birth_year (int, optional): Beneficiary's year of birth
+
+        Returns:
+            str: Digest of the columns that determine premiums
+        """
+        if birth_year is not None:
+            # Income before age 63 never reaches a Medicare premium.
+            first = max(birth_year + MEDICARE_AGE - LOOKBACK_YEARS - start_year, 0)
+            magi = magi[..., first:]
+        return hashlib.blake2b(np.ascontiguousarray(magi).tobytes(), digest_size=16).hexdigest()
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+irmaa_projector = IRMAAProjector()
@@ -0,0 +1,228 @@
+# tax_data_records/services/lot_relief.py
+
+import heapq
+from collections import deque
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from personal_finance_portfolio.models import Transaction
+from ..models import TaxLot, TaxLotDisposition
+
+class _LotQueue:
+    """
+    Open lots of one investment, released in cost basis method order.
+
+    FIFO and LIFO use a deque fed in acquisition order; HIFO uses a max-heap
+    on adjusted basis per share (adjusted_basis is the lot total), earliest
+    lot first on ties. Lots emptied elsewhere (e.g. by specific
+    identification) are dropped lazily when they reach the front.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self._lots = [] if method == 'HIFO' else deque()
+
+    def push(self, lot):
+        if self.method == 'HIFO':
+            heapq.heappush(
+                self._lots,
+                (-lot.adjusted_basis / lot.quantity, lot.acquisition_date, lot.pk, lot)
+            )
+        else:
+            self._lots.append(lot)
+
+    def peek(self):
+        while self._lots:
+            lot = self._front()
+            if lot.remaining_quantity > 0:
+                return lot
+            self.pop()
+        return None
+
+    def pop(self):
+        if self.method == 'HIFO':
+            heapq.heappop(self._lots)
+        elif self.method == 'LIFO':
+            self._lots.pop()
+        else:
+            self._lots.popleft()
+
+    def _front(self):
+        if self.method == 'HIFO':
+            return self._lots[0][-1]
+        if self.method == 'LIFO':
+            return self._lots[-1]
+        return self._lots[0]
+
+class LotReliefEngine:
+    """
+    Service class that relieves open tax lots for SELL transactions using the
+    account's cost basis method and records the resulting dispositions.
+    """
+
+    def __init__(self, taxable_account):
+        self.account = taxable_account
+
+    def relieve(self, sale_transactions, lot_selections=None):
+        """
+        Create dispositions for one or more SELL transactions.
+
+        Sales are processed in date order per investment. Open lots are
+        loaded in one query and fed into each investment's queue as the
+        sweep reaches their acquisition date, so a lot bought after a sale
+        is never relieved by it. Dispositions and remaining quantities are
+        written in bulk inside one transaction.
+
+        Args:
+            sale_transactions (iterable): SELL Transactions of this account
+            lot_selections (dict, optional): Sale transaction pk -> list of
+                (tax_lot_id, quantity) pairs. Required for every sale when the
+                account uses SPECIFIC; overrides the method for a sale
+                otherwise.
+
+        Returns:
+            list: The TaxLotDisposition records created
+
+        Raises:
+            ValidationError: If a sale does not belong to the account, has
+                already been relieved, a selection is invalid, or there are
+                not enough open shares
+        """
+        lot_selections = lot_selections or {}
+        sales = list(
+            Transaction.objects.filter(
+                pk__in=[sale.pk for sale in sale_transactions]
+            ).select_related('portfolio_investment').order_by(
+                'transaction_date', 'pk'
+            )
+        )
+        for sale in sales:
+            if sale.transaction_type != 'SELL':
+                raise ValidationError(f"Transaction {sale.pk} is not a sale")
+            if sale.portfolio_investment.portfolio_id != self.account.portfolio_id:
+                raise ValidationError(
+                    f"Transaction {sale.pk} does not belong to {self.account}"
+                )
+        relieved_sale = TaxLotDisposition.objects.filter(
+            sale_transaction__in=sales
+        ).values_list('sale_transaction_id', flat=True).first()
+        if relieved_sale is not None:
+            raise ValidationError(f"Sale {relieved_sale} already has dispositions")
+
+        investment_ids = {sale.portfolio_investment.investment_id for sale in sales}
+        pending = {investment_id: [] for investment_id in investment_ids}
+        open_lots = TaxLot.objects.filter(
+            account=self.account,
+            investment_id__in=investment_ids,
+            remaining_quantity__gt=0
+        ).order_by('acquisition_date', 'pk')
+        lots_by_id = {}
+        for lot in open_lots:
+            pending[lot.investment_id].append(lot)
+            lots_by_id[lot.pk] = lot
+
+        queues = {}
+        next_pending = dict.fromkeys(investment_ids, 0)
+        dispositions = []
+        for sale in sales:
+            investment_id = sale.portfolio_investment.investment_id
+            queue = queues.setdefault(
+                investment_id, _LotQueue(self.account.cost_basis_method)
+            )
+            lots = pending[investment_id]
+            position = next_pending[investment_id]
+            while (position < len(lots) and
+                   lots[position].acquisition_date <= sale.transaction_date):
+                queue.push(lots[position])
+                position += 1
+            next_pending[investment_id] = position
+
+            if sale.pk in lot_selections:
+                relieved = self._select_specific(
+                    sale, lot_selections[sale.pk], lots_by_id
+                )
+            elif self.account.cost_basis_method == 'SPECIFIC':
+                raise ValidationError(
+                    f"Sale {sale.pk} needs a lot selection for specific identification"
+                )
+            else:
+                relieved = self._select_from_queue(sale, queue)
+            dispositions.extend(self._build_dispositions(sale, relieved))
+
+        with transaction.atomic():
+            TaxLotDisposition.objects.bulk_create(dispositions)
+            TaxLot.objects.bulk_update(
+                {d.tax_lot_id: d.tax_lot for d in dispositions}.values(),
+                ['remaining_quantity']
+            )
+
+        return dispositions
+
+    @staticmethod
+    def _select_from_queue(sale, queue):
+        relieved = []
+        needed = sale.quantity
+        while needed > 0:
+            lot = queue.peek()
+            if lot is None:
+                raise ValidationError(
+                    f"Not enough open lots to relieve {sale.quantity} shares "
+                    f"for sale {sale.pk}"
+                )
+            quantity = min(needed, lot.remaining_quantity)
+            lot.remaining_quantity -= quantity
+            needed -= quantity
+            relieved.append((lot, quantity))
+        return relieved
+
+    def _select_specific(self, sale, selection, lots_by_id):
+        relieved = []
+        for tax_lot_id, quantity in selection:
+            lot = lots_by_id.get(tax_lot_id)
+            if (lot is None or
+                    lot.investment_id != sale.portfolio_investment.investment_id or
+                    lot.acquisition_date > sale.transaction_date):
+                raise ValidationError(
+                    f"Lot {tax_lot_id} is not an open lot for sale {sale.pk}"
+                )
+            if quantity <= 0 or quantity > lot.remaining_quantity:
+                raise ValidationError(
+                    f"Lot {tax_lot_id} has {lot.remaining_quantity} shares, "
+                    f"cannot relieve {quantity}"
+                )
+            lot.remaining_quantity -= quantity
+            relieved.append((lot, quantity))
+
+        if sum(quantity for _, quantity in relieved) != sale.quantity:
+            raise ValidationError(
+                f"Selected lots do not add up to {sale.quantity} shares "
+                f"for sale {sale.pk}"
+            )
+        return relieved
+
+    @staticmethod
+    def _build_dispositions(sale, relieved):
+        """
+        Split the sale's net proceeds across the relieved lots pro rata,
+        giving the rounding remainder to the last lot so the parts add up.
+        """
+        net_proceeds = sale.quantity * sale.price - sale.fees
+        allocated = Decimal('0')
+        dispositions = []
+        for index, (lot, quantity) in enumerate(relieved):
+            if index == len(relieved) - 1:
+                proceeds = net_proceeds - allocated
+            else:
+                proceeds = (net_proceeds * quantity / sale.quantity).quantize(
+                    Decimal('0.01')
+                )
+            allocated += proceeds
+            dispositions.append(TaxLotDisposition(
+                tax_lot=lot,
+                sale_transaction=sale,
+                quantity=quantity,
+                proceeds=proceeds,
+                date=sale.transaction_date,
+                holding_period=sale.transaction_date - lot.acquisition_date
+            ))
+        return dispositions
@@ -0,0 +1,161 @@
+# tax_data_records/services/rmd.py
+
+import numpy as np
+from django.db.models import F, Sum
+from django.utils import timezone
+from personal_finance_portfolio.models import Portfolio
+
+# IRS Uniform Lifetime Table (Pub. 590-B, Appendix B, Table III), in effect
+# for distribution years from 2022: age -> distribution period.
+UNIFORM_LIFETIME_TABLE = {
+    72: 27.4, 73: 26.5, 74: 25.5, 75: 24.6, 76: 23.7, 77: 22.9, 78: 22.0,
+    79: 21.1, 80: 20.2, 81: 19.4, 82: 18.5, 83: 17.7, 84: 16.8, 85: 16.0,
+    86: 15.2, 87: 14.4, 88: 13.7, 89: 12.9, 90: 12.2, 91: 11.5, 92: 10.8,
+    93: 10.1, 94: 9.5, 95: 8.9, 96: 8.4, 97: 7.8, 98: 7.3, 99: 6.8,
+    100: 6.4, 101: 6.0, 102: 5.6, 103: 5.2, 104: 4.9, 105: 4.6, 106: 4.3,
+    107: 4.1, 108: 3.9, 109: 3.7, 110: 3.5, 111: 3.4, 112: 3.3, 113: 3.1,
+    114: 3.0, 115: 2.9, 116: 2.8, 117: 2.7, 118: 2.5, 119: 2.3, 120: 2.0,
+}
+
+# Account types with lifetime RMDs; Roth accounts (including Roth 401(k)s
+# from 2024), HSAs and annuities are left out.
+RMD_ACCOUNT_TYPES = ('401K', '403b', 'Traditional IRA', 'SEP IRA', 'Defered Compensation')
+
+def _compile_table():
+    """
+    Distribution period per age as an array indexed by age. Ages before
+    the table get an infinite period (no distribution); ages past the end
+    reuse the last entry.
+    """
+    periods = np.full(max(UNIFORM_LIFETIME_TABLE) + 1, np.inf)
+    for age, period in UNIFORM_LIFETIME_TABLE.items():
+        periods[age] = period
+    return periods
+
+DISTRIBUTION_PERIODS = _compile_table()
+
+def rmd_start_age(birth_year):
+    """
+    First age with a required distribution under SECURE 2.0.
+
+    Args:
+        birth_year (int): Account owner's year of birth
+
+    Returns:
+        int: 72 for 1950 and earlier, 73 for 1951-1959, 75 from 1960
+    """
+    if birth_year <= 1950:
+        return 72
+    if birth_year <= 1959:
+        return 73
+    return 75
+
+def distribution_periods(ages):
+    """
+    Args:
+        ages (array-like): Ages at the end of each distribution year
+
+    Returns:
+        ndarray: Uniform Lifetime distribution period per age
+    """
+    ages = np.asarray(ages)
+    return DISTRIBUTION_PERIODS[np.clip(ages, 0, len(DISTRIBUTION_PERIODS) - 1)]
+
+def project_rmds(balances, birth_year, start_year, years=40, growth=0.05):
+    """
+    Project RMDs, and the balances they are based on, for many accounts
+    at once.
+
+    The RMD for a year is the prior year-end balance divided by the
+    distribution period for the owner's age that year. Because every
+    account shares the owner's ages, the share left after each year's
+    distribution and growth is the same for all of them: one cumulative
+    product gives the balance path, and an outer product scales it to
+    every account.
+
+    Args:
+        balances (array-like): Balance of each account at the end of the
+            year before start_year
+        birth_year (int): Account owner's year of birth
+        start_year (int): First distribution year to project
+        years (int): Number of years to project
+        growth (float or array-like): Annual growth, one rate or one per
+            account
+
+    Returns:
+        dict: years and ages (one per projected year), rmds and balances
+            ((accounts, years) arrays of each year's RMD and the balance
+            it is based on)
+    """
+    calendar_years = start_year + np.arange(years)
+    ages = calendar_years - birth_year
+    rates = np.where(
+        ages >= rmd_start_age(birth_year), 1 / distribution_periods(ages), 0.0
+    )
+    growth = np.broadcast_to(np.asarray(growth, dtype=np.float64), (len(balances),))
+
+    # Balance at the start of each year as a multiple of the first one.
+    kept = (1 - rates)[None, :-1] * (1 + growth)[:, None]
+    scale = np.concatenate(
+        [np.ones((len(balances), 1)), np.cumprod(kept, axis=1)], axis=1
+    )
+    projected = np.asarray(balances, dtype=np.float64)[:, None] * scale
+    return {
+        'years': calendar_years,
+        'ages': ages,
+        'rmds': projected * rates,
+        'balances': projected,
+    }
+
+class RMDEngine:
+    """
+    RMD projections for every retirement Portfolio.
+
+    Balances are read with one aggregate query per projection. They are
+    not cached: prices change through bulk_update, which sends no signal,
+    and the projection itself is a few array operations.
+    """
+
+    def retirement_balances(self):
+        """
+        Returns:
+            list: (portfolio pk, portfolio name, market value) for every
+                portfolio of an RMD account type, by pk
+        """
+        rows = Portfolio.objects.filter(
+            brokerage_account_type__in=RMD_ACCOUNT_TYPES
+        ).annotate(
+            value=Sum(
+                F('portfolioinvestment__quantity') *
+                F('portfolioinvestment__investment__price')
+            )
+        ).order_by('pk').values_list('pk', 'name', 'value')
+        return [(pk, name, float(value or 0)) for pk, name, value in rows]
+
+    def project(self, birth_year, start_year=None, years=40, growth=0.05):
+        """
+        Project RMDs for all retirement portfolios.
+
+        Args:
+            birth_year (int): Account owner's year of birth
+            start_year (int, optional): First distribution year, the
+                current year by default; current balances stand in for the
+                prior year-end balances
+            years (int): Number of years to project
+            growth (float): Annual growth of every account
+
+        Returns:
+            dict: project_rmds output plus portfolios, the (pk, name,
+                balance) rows in row order, and total_rmds per year
+        """
+        start_year = start_year or timezone.localdate().year
+        portfolios = self.retirement_balances()
+        projection = project_rmds(
+            [balance for _, _, balance in portfolios],
+            birth_year, start_year, years, growth
+        )
+        projection['portfolios'] = portfolios
+        projection['total_rmds'] = projection['rmds'].sum(axis=0)
+        return projection
+
+rmd_engine = RMDEngine()
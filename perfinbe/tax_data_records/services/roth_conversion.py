@@ -0,0 +1,151 @@
+# tax_data_records/services/roth_conversion.py
+
+import numpy as np
+from django.utils import timezone
+from .rmd import distribution_periods, rmd_engine, rmd_start_age
+from .tax_brackets import tax_tables
+
+def income_tax(taxable_incomes, filing_status='single', tax_year=None):
+    """
+    Federal income tax on an array of taxable incomes.
+
+    Args:
+        taxable_incomes (array-like): Taxable incomes; negatives owe nothing
+        filing_status (str): TaxBracketTable filing status
+        tax_year (int, optional): Bracket year, the current year by default
+
+    Returns:
+        ndarray: Tax per income, same shape
+    """
+    return tax_tables.tax(
+        taxable_incomes, tax_year or timezone.localdate().year, filing_status
+    )
+
+class RothConversionOptimizer:
+    """
+    Service class that chooses how much pre-tax money to convert to Roth
+    each year so that lifetime taxes are as low as possible.
+
+    Taxes are paid from outside the retirement accounts and discounted at
+    the growth rate, so minimizing their present value maximizes ending
+    wealth. Whatever pre-tax balance remains at the end is charged at
+    terminal_rate (e.g. the heirs' expected rate).
+
+    The pre-tax balance is the state of a dynamic program. At year t it is
+    discretized as a fraction of the balance it would have reached with
+    no withdrawals, so choosing the next state on the same grid pins the
+    conversion exactly and no interpolation is needed. Each year is one
+    (state, next state) matrix of taxes minimized along its rows.
+    """
+
+    def __init__(self, traditional_balance=None, other_income=0, years=30,
+                 start_year=None, birth_year=None, growth=0.05,
+                 filing_status='single', terminal_rate=0.24, grid_size=201):
+        """
+        Args:
+            traditional_balance (float, optional): Pre-tax balance to plan
+                for; all RMD-type retirement portfolios by default
+            other_income (float or array-like): Ordinary income each year
+                before conversions and RMDs
+            years (int): Years to plan
+            start_year (int, optional): First plan year, this year by default
+            birth_year (int, optional): Owner's year of birth, to include
+                RMDs; without it no RMDs are taken
+            growth (float): Annual growth and discount rate
+            filing_status (str): TaxBracketTable filing status
+            terminal_rate (float): Tax rate on the balance left at the end
+            grid_size (int): Balance grid points per year
+        """
+        if traditional_balance is None:
+            traditional_balance = sum(
+                balance for _, _, balance in rmd_engine.retirement_balances()
+            )
+        self.traditional_balance = float(traditional_balance)
+        self.years = years
+        self.start_year = start_year or timezone.localdate().year
+        self.other_income = np.broadcast_to(
+            np.asarray(other_income, dtype=np.float64), (years,)
+        )
+        self.growth = growth
+        self.filing_status = filing_status
+        self.terminal_rate = terminal_rate
+        self.grid = np.linspace(0, 1, grid_size)
+        self.brackets = [
+            tax_tables.get(self.start_year + year, filing_status)
+            for year in range(years)
+        ]
+
+        self.rmd_rates = np.zeros(years)
+        if birth_year is not None:
+            ages = self.start_year + np.arange(years) - birth_year
+            self.rmd_rates = np.where(
+                ages >= rmd_start_age(birth_year), 1 / distribution_periods(ages), 0.0
+            )
+
+    def optimize(self):
+        """
+        Returns:
+            dict: schedule (one dict per year with year, the starting
+                pre-tax balance, rmd, conversion and the year's total
+                federal tax), total_tax_pv for the schedule and
+                baseline_tax_pv without conversions, both including the
+                terminal charge
+        """
+        scale = self.traditional_balance * (1 + self.growth) ** np.arange(self.years + 1)
+        discount = (1 + self.growth) ** -np.arange(self.years + 1)
+        fractions = self.grid
+
+        value = discount[-1] * self.terminal_rate * scale[-1] * fractions
+        policy = np.empty((self.years, len(fractions)), dtype=np.int64)
+        for year in reversed(range(self.years)):
+            after_rmd = fractions * (1 - self.rmd_rates[year])
+            # conversion[i, j]: convert from state i down to next state j
+            conversion = scale[year] * (after_rmd[:, None] - fractions[None, :])
+            rmd = scale[year] * fractions * self.rmd_rates[year]
+            brackets = self.brackets[year]
+            income = (self.other_income[year] + rmd[:, None] + conversion
+                      - brackets.standard_deduction)
+            cost = discount[year] * brackets.tax(income) + value
+            cost[conversion < -1e-9] = np.inf
+            policy[year] = np.argmin(cost, axis=1)
+            value = cost[np.arange(len(fractions)), policy[year]]
+
+        schedule = []
+        state = len(fractions) - 1
+        for year in range(self.years):
+            balance = scale[year] * fractions[state]
+            rmd = balance * self.rmd_rates[year]
+            next_state = policy[year, state]
+            brackets = self.brackets[year]
+            conversion = max(balance - rmd - scale[year] * fractions[next_state], 0.0)
+            schedule.append({
+                'year': self.start_year + year,
+                'balance': balance,
+                'rmd': rmd,
+                'conversion': conversion,
+                'tax': float(brackets.tax(
+                    self.other_income[year] + rmd + conversion
+                    - brackets.standard_deduction
+                )),
+            })
+            state = next_state
+
+        return {
+            'schedule': schedule,
+            'total_tax_pv': float(value[-1]),
+            'baseline_tax_pv': self._baseline_tax_pv(discount),
+        }
+
+    def _baseline_tax_pv(self, discount):
+        balance = self.traditional_balance
+        taxes = []
+        for year, brackets in enumerate(self.brackets):
+            rmd = balance * self.rmd_rates[year]
+            taxes.append(float(brackets.tax(
+                self.other_income[year] + rmd - brackets.standard_deduction
+            )))
+            balance = (balance - rmd) * (1 + self.growth)
+        return float(
+            (discount[:-1] * np.array(taxes)).sum()
+            + discount[-1] * self.terminal_rate * balance
+        )
@@ -0,0 +1,146 @@
+# tax_data_records/services/tax_brackets.py
+
+from threading import Lock
+import numpy as np
+from ..models import TaxBracketTable
+
+FEDERAL = 'US'
+
+class CompiledBrackets:
+    """
+    One TaxBracketTable as sorted threshold, rate and base-tax arrays.
+
+    The bracket of every income is found with a single searchsorted, so
+    tax on any number of incomes is a handful of array operations with no
+    Python-level loop.
+    """
+
+    def __init__(self, thresholds, rates, standard_deduction=0.0, tax_year=None):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.rates = np.asarray(rates, dtype=np.float64)
+        if len(self.thresholds) == 0 or self.thresholds[0] != 0:
+            raise ValueError("The first bracket must start at 0")
+        if np.any(np.diff(self.thresholds) <= 0):
+            raise ValueError("Bracket lower bounds must be increasing")
+        self.standard_deduction = float(standard_deduction)
+        self.tax_year = tax_year
+        # Tax owed at the lower bound of each bracket
+        self.base_tax = np.concatenate(
+            [[0.0], np.cumsum(np.diff(self.thresholds) * self.rates[:-1])]
+        )
+        for array in (self.thresholds, self.rates, self.base_tax):
+            # Shared between callers through the registry cache.
+            array.flags.writeable = False
+
+    def bracket_index(self, taxable_incomes):
+        """
+        Args:
+            taxable_incomes (array-like): Taxable incomes, any shape
+
+        Returns:
+            ndarray: Index of the bracket each income falls in; negative
+                incomes fall in the first
+        """
+        incomes = np.asarray(taxable_incomes, dtype=np.float64)
+        return np.maximum(np.searchsorted(self.thresholds, incomes, side='right') - 1, 0)
+
+    def tax(self, taxable_incomes):
+        """
+        Args:
+            taxable_incomes (array-like): Taxable incomes, any shape;
+                negatives owe nothing
+
+        Returns:
+            ndarray: Tax per income, same shape
+        """
+        incomes = np.maximum(np.asarray(taxable_incomes, dtype=np.float64), 0)
+        index = self.bracket_index(incomes)
+        return self.base_tax[index] + (incomes - self.thresholds[index]) * self.rates[index]
+
+    def marginal_rate(self, taxable_incomes):
+        return self.rates[self.bracket_index(taxable_incomes)]
+
+    def stacked_tax(self, base_incomes, stacked_incomes):
+        """
+        Tax on income taxed on top of other income, such as long-term
+        gains stacked on ordinary taxable income under the LTCG schedule.
+
+        Args:
+            base_incomes (array-like): Income already filling the brackets
+            stacked_incomes (array-like): Income taxed under this schedule
+
+        Returns:
+            ndarray: Tax on the stacked income, broadcast shape
+        """
+        base = np.maximum(np.asarray(base_incomes, dtype=np.float64), 0)
+        return self.tax(base + np.asarray(stacked_incomes, dtype=np.float64)) - self.tax(base)
+
+class TaxBracketRegistry:
+    """
+    Compiled bracket tables, loaded on first use and cached.
+
+    A lookup for a year without its own table uses the latest earlier
+    year, so projections past the last published schedule keep today's
+    brackets. The cache is dropped whenever a table or bracket changes
+    (see tax_data_records.signals).
+    """
+
+    def __init__(self):
+        self._compiled = {}
+        self._lock = Lock()
+
+    def get(self, tax_year, filing_status='single', jurisdiction=FEDERAL,
+            income_type='ORDINARY'):
+        """
+        Args:
+            tax_year (int): Year to tax
+            filing_status (str): TaxBracketTable.FILING_STATUSES key
+            jurisdiction (str): 'US' or a state code
+            income_type (str): 'ORDINARY' or 'LTCG'
+
+        Returns:
+            CompiledBrackets: The table in effect for the year
+
+        Raises:
+            TaxBracketTable.DoesNotExist: No table for the year or earlier
+        """
+        key = (jurisdiction, tax_year, filing_status, income_type)
+        with self._lock:
+            compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+
+        table = TaxBracketTable.objects.filter(
+            jurisdiction=jurisdiction,
+            filing_status=filing_status,
+            income_type=income_type,
+            tax_year__lte=tax_year
+        ).order_by('-tax_year').prefetch_related('brackets').first()
+        if table is None:
+            raise TaxBracketTable.DoesNotExist(
+                f"No {jurisdiction} {income_type} brackets for {filing_status} "
+                f"in {tax_year} or earlier"
+            )
+        brackets = list(table.brackets.all())
+        compiled = CompiledBrackets(
+            [bracket.lower_bound for bracket in brackets],
+            [bracket.rate for bracket in brackets],
+            table.standard_deduction,
+            table.tax_year
+        )
+        with self._lock:
+            self._compiled[key] = compiled
+        return compiled
+
+    def tax(self, taxable_incomes, tax_year, filing_status='single',
+            jurisdiction=FEDERAL, income_type='ORDINARY'):
+        """Tax on an array of taxable incomes under one table."""
+        return self.get(tax_year, filing_status, jurisdiction, income_type).tax(
+            taxable_incomes
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._compiled.clear()
+
+tax_tables = TaxBracketRegistry()
@@ -1,15 +1,24 @@
 # tax_data_records/services/wash_sale.py
 
+from collections import defaultdict
 from datetime import timedelta
-from decimal import Decimal
-from django.db.models import Q
+from decimal import Decimal, getcontext
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
-from ..models import TaxLot, WashSale
+from personal_finance_portfolio.models import Transaction
+from ..models import TaxLot, TaxLotDisposition, WashSale
+
+WASH_SALE_WINDOW = timedelta(days=30)
 
 class WashSaleDetector:
     """
     Service class to detect and record wash sales when dispositions occur at a loss
     and replacement securities are purchased within the wash sale window.
+
+    Only replacement lots in the same account are considered; see
+    HouseholdWashSaleDetector for purchases in other portfolios.
     """
     
     def __init__(self, taxable_account):
@@ -25,29 +34,25 @@ class WashSaleDetector:
         if not self.account.wash_sale_tracking:
             return
             
-        # Calculate realized loss
-        cost_basis_per_share = disposition.tax_lot.cost_basis / disposition.tax_lot.quantity
-        sale_price_per_share = disposition.proceeds / disposition.quantity
-        realized_loss = (cost_basis_per_share - sale_price_per_share) * disposition.quantity
+        realized_loss = self.realized_loss(disposition)
         
         # Only process if there's a loss
         if realized_loss <= 0:
             return
             
         # Define wash sale window
-        window_start = disposition.date - timedelta(days=30)
-        window_end = disposition.date + timedelta(days=30)
+        window_start = disposition.date - WASH_SALE_WINDOW
+        window_end = disposition.date + WASH_SALE_WINDOW
         
-        # Find potential replacement lots
+        # Find potential replacement lots; served by the (account,
+        # investment, acquisition_date) index.
+        investment_id = disposition.sale_transaction.portfolio_investment.investment_id
         replacement_lots = TaxLot.objects.filter(
             account=self.account,
-            transaction__portfolio_investment__investment=
-                disposition.sale_transaction.portfolio_investment.investment,
+            investment_id=investment_id,
             acquisition_date__gte=window_start,
             acquisition_date__lte=window_end
-        ).exclude(
-            transaction=disposition.tax_lot.transaction
-        )
+        ).exclude(pk=disposition.tax_lot_id)
         
         # Process each potential replacement lot
         for replacement_lot in replacement_lots:
@@ -70,19 +75,152 @@ class WashSaleDetector:
     def detect_wash_sales_for_period(self, start_date, end_date):
         """
         Retroactively check for wash sales in a given period.
+
+        Set-based counterpart to calling process_disposition on every
+        disposition: dispositions and candidate lots are loaded in two
+        queries, matched in memory with a sweep over acquisition dates per
+        investment, and written back in bulk inside one transaction. The
+        WashSale rows and adjusted bases are identical to the per-row path.
         
         Args:
             start_date (datetime): Start of period to check
             end_date (datetime): End of period to check
+
+        Returns:
+            list: The WashSale records created
         """
-        dispositions = TaxLotDisposition.objects.filter(
-            tax_lot__account=self.account,
-            date__gte=start_date,
-            date__lte=end_date
+        if not self.account.wash_sale_tracking:
+            return []
+
+        dispositions = list(
+            TaxLotDisposition.objects.filter(
+                tax_lot__account=self.account,
+                date__gte=start_date,
+                date__lte=end_date
+            ).select_related('tax_lot').annotate(
+                investment_key=F(
+                    'sale_transaction__portfolio_investment__investment'
+                )
+            ).order_by('pk')
         )
-        
+
+        losses = {}
         for disposition in dispositions:
-            self.process_disposition(disposition)
+            realized_loss = self.realized_loss(disposition)
+            if realized_loss > 0:
+                losses[disposition.pk] = realized_loss
+        if not losses:
+            return []
+
+        lots_by_investment = self._load_candidate_lots(
+            start_date - WASH_SALE_WINDOW,
+            end_date + WASH_SALE_WINDOW
+        )
+        matches = self._match_replacement_lots(
+            [d for d in dispositions if d.pk in losses],
+            lots_by_investment
+        )
+
+        # Apply in disposition order so a lot hit by several dispositions
+        # accumulates its basis exactly as repeated save() calls would.
+        wash_sales = []
+        adjusted_lots = {}
+        for disposition in dispositions:
+            realized_loss = losses.get(disposition.pk)
+            if realized_loss is None:
+                continue
+            window_start = disposition.date - WASH_SALE_WINDOW
+            window_end = disposition.date + WASH_SALE_WINDOW
+            for replacement_lot in matches.get(disposition.pk, ()):
+                wash_sales.append(WashSale(
+                    disposition=disposition,
+                    replacement_lot=replacement_lot,
+                    disallowed_loss=realized_loss,
+                    wash_sale_window_start=window_start,
+                    wash_sale_window_end=window_end
+                ))
+                replacement_lot.adjusted_basis = self._as_stored_basis(
+                    replacement_lot.adjusted_basis +
+                    (realized_loss / replacement_lot.quantity)
+                )
+                adjusted_lots[replacement_lot.pk] = replacement_lot
+
+        with transaction.atomic():
+            WashSale.objects.bulk_create(wash_sales)
+            TaxLot.objects.bulk_update(
+                adjusted_lots.values(), ['adjusted_basis']
+            )
+
+        return wash_sales
+
+    @staticmethod
+    def realized_loss(disposition):
+        """
+        Loss realized by a disposition against its lot's original cost basis.
+
+        Args:
+            disposition (TaxLotDisposition): The disposition to evaluate
+
+        Returns:
+            Decimal: Positive for a loss, zero or negative for a gain
+        """
+        cost_basis_per_share = disposition.tax_lot.cost_basis / disposition.tax_lot.quantity
+        sale_price_per_share = disposition.proceeds / disposition.quantity
+        return (cost_basis_per_share - sale_price_per_share) * disposition.quantity
+
+    def _load_candidate_lots(self, window_start, window_end):
+        """
+        Load every lot of the account acquired within the outer window,
+        grouped by investment and sorted by acquisition date.
+        """
+        lots = TaxLot.objects.filter(
+            account=self.account,
+            acquisition_date__gte=window_start,
+            acquisition_date__lte=window_end
+        ).order_by('acquisition_date', 'pk')
+
+        lots_by_investment = defaultdict(list)
+        for lot in lots:
+            lots_by_investment[lot.investment_id].append(lot)
+        return lots_by_investment
+
+    @staticmethod
+    def _match_replacement_lots(dispositions, lots_by_investment):
+        """
+        Sweep each investment's date-sorted lots against its date-sorted
+        dispositions, keeping a sliding [date - 30d, date + 30d] window.
+
+        Returns:
+            dict: disposition pk -> list of replacement TaxLots
+        """
+        dispositions_by_investment = defaultdict(list)
+        for disposition in dispositions:
+            dispositions_by_investment[disposition.investment_key].append(disposition)
+
+        matches = {}
+        for investment_key, group in dispositions_by_investment.items():
+            lots = lots_by_investment.get(investment_key, [])
+            low = high = 0
+            for disposition in sorted(group, key=lambda d: d.date):
+                window_start = disposition.date - WASH_SALE_WINDOW
+                window_end = disposition.date + WASH_SALE_WINDOW
+                while low < len(lots) and lots[low].acquisition_date < window_start:
+                    low += 1
+                while high < len(lots) and lots[high].acquisition_date <= window_end:
+                    high += 1
+                matches[disposition.pk] = [
+                    lot for lot in lots[low:high]
+                    if lot.pk != disposition.tax_lot_id
+                ]
+        return matches
+
+    @staticmethod
+    def _as_stored_basis(value):
+        """Round a basis the way the adjusted_basis column stores it."""
+        field = TaxLot._meta.get_field('adjusted_basis')
+        context = getcontext().copy()
+        context.prec = field.max_digits
+        return value.quantize(Decimal(1).scaleb(-field.decimal_places), context=context)
     
     def get_wash_sale_summary(self, tax_year):
         """
@@ -109,4 +247,132 @@ class WashSaleDetector:
             'average_disallowed_loss': (
                 total_disallowed / count if count > 0 else Decimal('0')
             )
-        }
\ No newline at end of file
+        }
+
+class HouseholdWashSaleDetector:
+    """
+    Service class that detects wash sales against purchases in every
+    Portfolio, taxable or retirement.
+
+    Loss dispositions from every account with wash sale tracking, and BUY
+    transactions of the same investments in the surrounding window from
+    every portfolio, are each read with one query sorted by investment and
+    date. A single two-pointer sweep over both lists then finds each
+    disposition's window of purchases, so the pass is linear in the number
+    of transactions however many accounts there are.
+
+    A replacement with a TaxLot gets its basis adjusted as in
+    WashSaleDetector. A replacement in a portfolio without lots, such as an
+    IRA, is recorded through replacement_transaction and its loss stays
+    disallowed. Pairs that are already recorded are skipped, so the pass
+    can be rerun.
+    """
+
+    def detect(self, start_date, end_date):
+        """
+        Args:
+            start_date (datetime): Start of the disposition period
+            end_date (datetime): End of the disposition period
+
+        Returns:
+            list: The WashSale records created
+        """
+        dispositions = []
+        losses = {}
+        for disposition in TaxLotDisposition.objects.filter(
+            tax_lot__account__wash_sale_tracking=True,
+            date__gte=start_date,
+            date__lte=end_date
+        ).select_related('tax_lot').annotate(
+            investment_key=F('sale_transaction__portfolio_investment__investment')
+        ).order_by('investment_key', 'date', 'pk'):
+            realized_loss = WashSaleDetector.realized_loss(disposition)
+            if realized_loss > 0:
+                dispositions.append(disposition)
+                losses[disposition.pk] = realized_loss
+        if not dispositions:
+            return []
+
+        purchases = list(
+            Transaction.objects.filter(
+                transaction_type='BUY',
+                portfolio_investment__investment__in={
+                    disposition.investment_key for disposition in dispositions
+                },
+                transaction_date__gte=start_date - WASH_SALE_WINDOW,
+                transaction_date__lte=end_date + WASH_SALE_WINDOW
+            ).select_related('tax_lot').annotate(
+                investment_key=F('portfolio_investment__investment')
+            ).order_by('investment_key', 'transaction_date', 'pk')
+        )
+        recorded = set()
+        for disposition_id, lot_transaction_id, transaction_id in WashSale.objects.filter(
+            disposition__in=list(losses)
+        ).values_list(
+            'disposition_id', 'replacement_lot__transaction_id', 'replacement_transaction_id'
+        ):
+            recorded.add((disposition_id, lot_transaction_id or transaction_id))
+
+        wash_sales = []
+        adjusted_lots = {}
+        for disposition, replacements in self._sweep(dispositions, purchases):
+            realized_loss = losses[disposition.pk]
+            window_start = disposition.date - WASH_SALE_WINDOW
+            window_end = disposition.date + WASH_SALE_WINDOW
+            for purchase in replacements:
+                if (purchase.pk == disposition.tax_lot.transaction_id
+                        or (disposition.pk, purchase.pk) in recorded):
+                    continue
+                replacement_lot = self._tax_lot(purchase)
+                wash_sales.append(WashSale(
+                    disposition=disposition,
+                    replacement_lot=replacement_lot,
+                    replacement_transaction=None if replacement_lot else purchase,
+                    disallowed_loss=realized_loss,
+                    wash_sale_window_start=window_start,
+                    wash_sale_window_end=window_end
+                ))
+                if replacement_lot is not None:
+                    replacement_lot.adjusted_basis = WashSaleDetector._as_stored_basis(
+                        replacement_lot.adjusted_basis +
+                        (realized_loss / replacement_lot.quantity)
+                    )
+                    adjusted_lots[replacement_lot.pk] = replacement_lot
+
+        with transaction.atomic():
+            WashSale.objects.bulk_create(wash_sales)
+            TaxLot.objects.bulk_update(adjusted_lots.values(), ['adjusted_basis'])
+        return wash_sales
+
+    @staticmethod
+    def _sweep(dispositions, purchases):
+        """
+        Pair each disposition with the purchases of its investment inside
+        its window. Both lists are sorted by (investment, date), so the
+        window bounds only ever move forward.
+
+        Yields:
+            tuple: (disposition, list of purchase Transactions)
+        """
+        low = high = 0
+        for disposition in dispositions:
+            key = disposition.investment_key
+            window_start = (key, disposition.date - WASH_SALE_WINDOW)
+            window_end = (key, disposition.date + WASH_SALE_WINDOW)
+            while low < len(purchases) and (
+                purchases[low].investment_key, purchases[low].transaction_date
+            ) < window_start:
+                low += 1
+            high = max(high, low)
+            while high < len(purchases) and (
+                purchases[high].investment_key, purchases[high].transaction_date
+            ) <= window_end:
+                high += 1
+            yield disposition, purchases[low:high]
+
+    @staticmethod
+    def _tax_lot(purchase):
+        try:
+            return purchase.tax_lot
+        except ObjectDoesNotExist:
+            return None
@@ -0,0 +1,13 @@
+# tax_data_records/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import TaxBracket, TaxBracketTable
+from .services.tax_brackets import tax_tables
+
+@receiver(post_save, sender=TaxBracketTable)
+@receiver(post_delete, sender=TaxBracketTable)
+@receiver(post_save, sender=TaxBracket)
+@receiver(post_delete, sender=TaxBracket)
+def invalidate_tax_tables(sender, **kwargs):
+    tax_tables.invalidate()
@@ -0,0 +1,132 @@
+# tax_data_records/tests/test_admin.py
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from personal_finance_portfolio.models import (
+    Portfolio, Investment, PortfolioInvestment, Transaction,
+    InvestmentPlatform, BrokerageAccountType
+)
+from tax_data_records.models import (
+    TaxableAccount, TaxLot, TaxLotDisposition,
+    WashSale, TaxableEvent, Form1099B
+)
+
+CHANGELISTS = [
+    'taxableaccount', 'taxlot', 'taxlotdisposition',
+    'washsale', 'taxableevent', 'form1099b',
+]
+
+class ChangelistQueryCountTests(TestCase):
+    def setUp(self):
+        self.platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.account_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.now = timezone.now()
+        self.rows = 0
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(user)
+
+    def add_rows(self, count):
+        """Add one row to every tax model per iteration, each in its own account."""
+        for _ in range(count):
+            self.rows += 1
+            portfolio = Portfolio.objects.create(
+                name=f'Portfolio {self.rows}',
+                investment_platform=self.platform,
+                brokerage_account_type=self.account_type
+            )
+            account = TaxableAccount.objects.create(portfolio=portfolio)
+            portfolio_investment = PortfolioInvestment.objects.create(
+                portfolio=portfolio,
+                investment=Investment.objects.create(
+                    ticker_symbol=f'T{self.rows}',
+                    name=f'Investment {self.rows}',
+                    price=Decimal('10.00')
+                ),
+                quantity=10
+            )
+            purchase, sale, dividend = [
+                Transaction.objects.create(
+                    portfolio_investment=portfolio_investment,
+                    transaction_type=transaction_type,
+                    quantity=10,
+                    price=Decimal('10.00'),
+                    transaction_date=self.now
+                )
+                for transaction_type in ('BUY', 'SELL', 'OTHER')
+            ]
+            lot = TaxLot.objects.create(
+                account=account,
+                transaction=purchase,
+                quantity=10,
+                acquisition_date=self.now - timedelta(days=10),
+                cost_basis=Decimal('100.00'),
+                remaining_quantity=0,
+                adjusted_basis=Decimal('10.00')
+            )
+            disposition = TaxLotDisposition.objects.create(
+                tax_lot=lot,
+                sale_transaction=sale,
+                quantity=10,
+                proceeds=Decimal('90.00'),
+                date=self.now
+            )
+            WashSale.objects.create(
+                disposition=disposition,
+                replacement_lot=lot,
+                disallowed_loss=Decimal('10.00'),
+                wash_sale_window_start=self.now - timedelta(days=30),
+                wash_sale_window_end=self.now + timedelta(days=30)
+            )
+            TaxableEvent.objects.create(
+                account=account,
+                transaction=dividend,
+                event_type='DIV_ORDINARY',
+                amount=Decimal('5.00'),
+                date=self.now
+            )
+            Form1099B.objects.create(account=account, tax_year=2024)
+
+    def changelist_queries(self, model_name):
+        url = reverse(f'admin:tax_data_records_{model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_count_is_fixed_per_page(self):
+        self.add_rows(1)
+        baseline = {name: self.changelist_queries(name) for name in CHANGELISTS}
+
+        self.add_rows(24)
+
+        for name in CHANGELISTS:
+            with self.subTest(changelist=name):
+                self.assertEqual(self.changelist_queries(name), baseline[name])
+
+    def test_wash_sales_sort_by_replacement_date(self):
+        self.add_rows(2)
+        first, second = WashSale.objects.order_by('pk')
+        # An IRA purchase replaces the second sale, five days after the
+        # first sale's replacement lot.
+        second.replacement_lot = None
+        second.replacement_transaction = Transaction.objects.create(
+            portfolio_investment=second.disposition.sale_transaction.portfolio_investment,
+            transaction_type='BUY',
+            quantity=10,
+            price=Decimal('9.00'),
+            transaction_date=self.now - timedelta(days=5)
+        )
+        second.save()
+        url = reverse('admin:tax_data_records_washsale_changelist')
+
+        ascending = self.client.get(url, {'o': '3'}).context['cl'].result_list
+        descending = self.client.get(url, {'o': '-3'}).context['cl'].result_list
+
+        self.assertEqual([row.pk for row in ascending], [first.pk, second.pk])
+        self.assertEqual([row.pk for row in descending], [second.pk, first.pk])
@@ -0,0 +1,107 @@
+# tax_data_records/tests/test_api.py
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from personal_finance_portfolio.models import (
+    Portfolio, Investment, PortfolioInvestment, Transaction,
+    InvestmentPlatform, BrokerageAccountType
+)
+from tax_data_records.models import (
+    TaxableAccount, TaxableEvent, TaxLot, TaxLotDisposition, WashSale
+)
+
+class TaxSummaryApiTests(TestCase):
+    def setUp(self):
+        self.portfolio = Portfolio.objects.create(
+            name='Brokerage',
+            investment_platform=InvestmentPlatform.objects.create(name='Schwab'),
+            brokerage_account_type=BrokerageAccountType.objects.create(name='Taxable')
+        )
+        self.account = TaxableAccount.objects.create(portfolio=self.portfolio)
+        self.holding = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=Investment.objects.create(
+                ticker_symbol='VTI', name='Total Market', price=Decimal('200.00')
+            ),
+            quantity=20
+        )
+        self.sale_date = timezone.make_aware(datetime(2024, 6, 1))
+
+        old_lot = self.create_lot(10, Decimal('100.00'), self.sale_date - timedelta(days=800))
+        new_lot = self.create_lot(10, Decimal('250.00'), self.sale_date - timedelta(days=100))
+        self.sell(old_lot, 5, Decimal('1000.00'))   # long-term gain of 500
+        loss = self.sell(new_lot, 4, Decimal('800.00'))  # short-term loss of 200
+        WashSale.objects.create(
+            disposition=loss,
+            replacement_lot=new_lot,
+            disallowed_loss=Decimal('200.00'),
+            wash_sale_window_start=self.sale_date - timedelta(days=30),
+            wash_sale_window_end=self.sale_date + timedelta(days=30)
+        )
+        dividend = Transaction.objects.create(
+            portfolio_investment=self.holding,
+            transaction_type='DIVIDEND',
+            quantity=0,
+            price=Decimal('42.50'),
+            transaction_date=self.sale_date
+        )
+        TaxableEvent.objects.create(
+            account=self.account,
+            transaction=dividend,
+            event_type='DIV_QUALIFIED',
+            amount=Decimal('42.50'),
+            date=self.sale_date
+        )
+        self.client.force_login(User.objects.create_user('owner'))
+
+    def create_lot(self, quantity, price, date):
+        purchase = Transaction.objects.create(
+            portfolio_investment=self.holding,
+            transaction_type='BUY',
+            quantity=quantity,
+            price=price,
+            transaction_date=date
+        )
+        return TaxLot.objects.create(
+            account=self.account,
+            transaction=purchase,
+            quantity=quantity,
+            acquisition_date=date,
+            cost_basis=price * quantity,
+            remaining_quantity=quantity,
+            adjusted_basis=price
+        )
+
+    def sell(self, tax_lot, quantity, proceeds):
+        sale = Transaction.objects.create(
+            portfolio_investment=self.holding,
+            transaction_type='SELL',
+            quantity=quantity,
+            price=proceeds / quantity,
+            transaction_date=self.sale_date
+        )
+        return TaxLotDisposition.objects.create(
+            tax_lot=tax_lot,
+            sale_transaction=sale,
+            quantity=quantity,
+            proceeds=proceeds,
+            date=self.sale_date
+        )
+
+    def test_summary_per_account(self):
+        with self.assertNumQueries(6):  # session, user and four aggregates
+            response = self.client.get(reverse('tax_api:tax-summary', args=[2024]))
+
+        summary, = response.json()['accounts']
+        self.assertEqual(summary['portfolio'], 'Brokerage')
+        self.assertEqual(summary['lt_gain'], '500.00')
+        self.assertEqual(summary['st_gain'], '-200.00')
+        self.assertEqual(summary['wash_sale_disallowed'], '200.00')
+        self.assertEqual(summary['events'], {'DIV_QUALIFIED': '42.50'})
+
+        empty = self.client.get(reverse('tax_api:tax-summary', args=[2020])).json()
+        self.assertEqual(empty['accounts'][0]['st_proceeds'], '0.00')
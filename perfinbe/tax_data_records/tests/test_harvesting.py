@@ -0,0 +1,118 @@
+# tax_data_records/tests/test_harvesting.py
+
+import time
+import numpy as np
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from personal_finance_portfolio.models import (
+    Portfolio, Investment, PortfolioInvestment, Transaction,
+    InvestmentPlatform, BrokerageAccountType
+)
+from tax_data_records.models import TaxableAccount, TaxLot
+from tax_data_records.services.harvesting import HarvestScanner, rank_harvest_candidates
+
+class HarvestScannerTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.brokerage = self.create_portfolio('Brokerage', platform, 'Taxable')
+        self.ira = self.create_portfolio('IRA', platform, 'Roth IRA')
+        self.account = TaxableAccount.objects.create(portfolio=self.brokerage)
+
+        self.vti = Investment.objects.create(
+            ticker_symbol='VTI', name='Total Market', price=Decimal('200.00')
+        )
+        self.vxus = Investment.objects.create(
+            ticker_symbol='VXUS', name='International', price=Decimal('50.00')
+        )
+        self.bnd = Investment.objects.create(
+            ticker_symbol='BND', name='Bonds', price=Decimal('70.00')
+        )
+
+    def create_portfolio(self, name, platform, account_type):
+        return Portfolio.objects.create(
+            name=name,
+            investment_platform=platform,
+            brokerage_account_type=BrokerageAccountType.objects.create(name=account_type)
+        )
+
+    def buy(self, portfolio, investment, quantity, price, days_ago):
+        holding, _ = PortfolioInvestment.objects.get_or_create(
+            portfolio=portfolio, investment=investment, defaults={'quantity': 0}
+        )
+        return Transaction.objects.create(
+            portfolio_investment=holding,
+            transaction_type='BUY',
+            quantity=quantity,
+            price=Decimal(price),
+            transaction_date=self.now - timedelta(days=days_ago)
+        )
+
+    def create_lot(self, investment, quantity, price, days_ago, remaining=None):
+        purchase = self.buy(self.brokerage, investment, quantity, price, days_ago)
+        return TaxLot.objects.create(
+            account=self.account,
+            transaction=purchase,
+            quantity=quantity,
+            acquisition_date=purchase.transaction_date,
+            cost_basis=Decimal(price) * quantity,
+            remaining_quantity=quantity if remaining is None else remaining,
+            adjusted_basis=Decimal(price) * quantity
+        )
+
+    def test_ranks_losses_and_skips_wash_sales(self):
+        short_term = self.create_lot(self.vti, 10, '250.00', 100)    # 500 loss
+        long_term = self.create_lot(self.vti, 10, '240.00', 800)     # 400 loss
+        self.create_lot(self.bnd, 10, '60.00', 100)                  # gain
+        self.create_lot(self.vxus, 100, '60.00', 200)                # 1,000 loss
+        # The VXUS loss is blocked by a purchase in the IRA last week.
+        self.buy(self.ira, self.vxus, 5, '51.00', 7)
+
+        result = HarvestScanner(short_term_rate=0.32, long_term_rate=0.15).scan(self.now)
+
+        self.assertEqual(
+            [(c['tax_lot'], c['long_term']) for c in result['candidates']],
+            [(short_term.pk, False), (long_term.pk, True)]
+        )
+        self.assertAlmostEqual(result['candidates'][0]['tax_benefit'], 160)
+        self.assertAlmostEqual(result['total_benefit'], 160 + 60)
+        self.assertEqual(result['wash_sale_blocked'], 1)
+
+    def test_partly_sold_lot_counts_remaining_shares(self):
+        lot = self.create_lot(self.vti, 10, '250.00', 100, remaining=4)
+
+        [candidate] = HarvestScanner(short_term_rate=0.25).scan(self.now)['candidates']
+
+        self.assertEqual(candidate['tax_lot'], lot.pk)
+        self.assertEqual(candidate['quantity'], 4)
+        self.assertAlmostEqual(candidate['unrealized_loss'], 200)
+        self.assertAlmostEqual(candidate['tax_benefit'], 50)
+
+    def test_recent_lot_does_not_wash_itself(self):
+        lot = self.create_lot(self.vti, 10, '210.00', 5)
+
+        with self.assertNumQueries(2):
+            result = HarvestScanner().scan(self.now)
+
+        self.assertEqual([c['tax_lot'] for c in result['candidates']], [lot.pk])
+
+    def test_ranking_is_vectorized(self):
+        rng = np.random.default_rng(0)
+        lots = 100_000
+
+        started = time.perf_counter()
+        ranked = rank_harvest_candidates(
+            rng.integers(1, 100, lots),
+            rng.uniform(10, 200, lots),
+            rng.uniform(10, 200, lots),
+            rng.uniform(0, 3 * 365 * 86_400, lots),
+            rng.integers(0, 20, lots) == 0
+        )
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1)
+        benefits = ranked['tax_benefit'][ranked['order']]
+        self.assertTrue(np.all(np.diff(benefits) <= 0))
+        self.assertFalse(ranked['wash_sale'][ranked['order']].any())
@@ -0,0 +1,54 @@
+# tax_data_records/tests/test_irmaa.py
+
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase
+from tax_data_records.services import irmaa
+from tax_data_records.services.irmaa import IRMAAProjector, project_irmaa
+
+class IRMAAProjectionTests(SimpleTestCase):
+    def test_two_year_lookback_and_tiers(self):
+        # Income years 2022-2024 set the 2024-2026 premiums.
+        projection = project_irmaa([103_000, 103_001, 600_000], 2022)
+
+        np.testing.assert_array_equal(projection['years'], [2024, 2025, 2026])
+        np.testing.assert_array_equal(projection['tiers'], [0, 0, 5])
+        np.testing.assert_allclose(projection['part_b'], [174.70, 185.00, 628.90])
+        np.testing.assert_allclose(
+            projection['annual_surcharge'], [0, 0, 12 * (628.90 - 185.00 + 85.80)]
+        )
+
+    def test_married_filing_separately_skips_middle_tiers(self):
+        projection = project_irmaa([100_000, 110_000, 400_000], 2022, 'married_separate')
+
+        np.testing.assert_array_equal(projection['tiers'], [0, 4, 5])
+
+    def test_paths_and_medicare_age(self):
+        magi = np.array([[250_000] * 4, [90_000] * 4])
+
+        projection = project_irmaa(magi, 2022, 'married_joint', birth_year=1960)
+
+        # Premiums start in 2025, the year of turning 65.
+        self.assertEqual(projection['tiers'].shape, (2, 4))
+        np.testing.assert_array_equal(projection['tiers'][0], [0, 1, 1, 1])
+        self.assertEqual(projection['annual_surcharge'][1].sum(), 0)
+
+class IRMAAProjectorTests(SimpleTestCase):
+    def test_cached_by_income_trajectory(self):
+        projector = IRMAAProjector()
+        magi = np.full((1000, 30), 150_000.0)
+        with mock.patch.object(irmaa, 'project_irmaa', wraps=project_irmaa) as compute:
+            first = projector.project(magi, 2020, birth_year=1960)
+            # Income before 63 cannot reach a premium.
+            earlier = magi.copy()
+            earlier[:, :3] = 1_000_000
+            self.assertIs(projector.project(earlier, 2020, birth_year=1960), first)
+            self.assertEqual(compute.call_count, 1)
+
+            later = magi.copy()
+            later[:, 3] = 1_000_000
+            changed = projector.project(later, 2020, birth_year=1960)
+
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(changed['tiers'][0, 3], 5)
+        self.assertFalse(first['annual_surcharge'].flags.writeable)
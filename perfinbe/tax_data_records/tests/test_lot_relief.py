@@ -0,0 +1,176 @@
+# tax_data_records/tests/test_lot_relief.py
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from personal_finance_portfolio.models import (
+    Portfolio, Investment, PortfolioInvestment, Transaction,
+    InvestmentPlatform, BrokerageAccountType
+)
+from tax_data_records.models import TaxableAccount, TaxLot, TaxLotDisposition
+from tax_data_records.services.lot_relief import LotReliefEngine
+
+class LotReliefEngineTests(TestCase):
+    def setUp(self):
+        self.platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.account_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.portfolio = Portfolio.objects.create(
+            name='Test Portfolio',
+            investment_platform=self.platform,
+            brokerage_account_type=self.account_type
+        )
+        self.taxable_account = TaxableAccount.objects.create(
+            portfolio=self.portfolio
+        )
+        self.investment = Investment.objects.create(
+            ticker_symbol='AAPL',
+            name='Apple Inc.',
+            price=Decimal('150.00')
+        )
+        self.portfolio_investment = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=self.investment,
+            quantity=100
+        )
+        self.now = timezone.now()
+
+        # Oldest lot is cheapest, middle lot has the highest basis.
+        self.first = self.create_lot(10, Decimal('100.00'), -400)
+        self.highest = self.create_lot(10, Decimal('180.00'), -200)
+        self.last = self.create_lot(10, Decimal('150.00'), -100)
+
+    def create_lot(self, quantity, basis_per_share, offset_days):
+        purchase = Transaction.objects.create(
+            portfolio_investment=self.portfolio_investment,
+            transaction_type='BUY',
+            quantity=quantity,
+            price=basis_per_share,
+            transaction_date=self.now + timedelta(days=offset_days)
+        )
+        return TaxLot.objects.create(
+            account=self.taxable_account,
+            transaction=purchase,
+            quantity=quantity,
+            acquisition_date=purchase.transaction_date,
+            cost_basis=basis_per_share * quantity,
+            remaining_quantity=quantity,
+            adjusted_basis=basis_per_share * quantity
+        )
+
+    def create_sale(self, quantity, price=Decimal('160.00'), fees=Decimal('0')):
+        return Transaction.objects.create(
+            portfolio_investment=self.portfolio_investment,
+            transaction_type='SELL',
+            quantity=quantity,
+            price=price,
+            fees=fees,
+            transaction_date=self.now
+        )
+
+    def relieve(self, method, sale, lot_selections=None):
+        self.taxable_account.cost_basis_method = method
+        self.taxable_account.save()
+        engine = LotReliefEngine(self.taxable_account)
+        return engine.relieve([sale], lot_selections)
+
+    def relieved(self, dispositions):
+        return [(d.tax_lot_id, d.quantity) for d in dispositions]
+
+    def test_fifo_relieves_oldest_lots_first(self):
+        dispositions = self.relieve('FIFO', self.create_sale(15))
+
+        self.assertEqual(
+            self.relieved(dispositions),
+            [(self.first.pk, 10), (self.highest.pk, 5)]
+        )
+        self.highest.refresh_from_db()
+        self.assertEqual(self.highest.remaining_quantity, 5)
+        self.assertTrue(dispositions[0].is_long_term())
+
+    def test_lifo_relieves_newest_lots_first(self):
+        dispositions = self.relieve('LIFO', self.create_sale(15))
+
+        self.assertEqual(
+            self.relieved(dispositions),
+            [(self.last.pk, 10), (self.highest.pk, 5)]
+        )
+
+    def test_hifo_relieves_highest_basis_first(self):
+        dispositions = self.relieve('HIFO', self.create_sale(25))
+
+        self.assertEqual(
+            self.relieved(dispositions),
+            [(self.highest.pk, 10), (self.last.pk, 10), (self.first.pk, 5)]
+        )
+
+    def test_hifo_compares_basis_per_share(self):
+        # Largest total basis, lowest basis per share
+        large = self.create_lot(100, Decimal('120.00'), -50)
+
+        dispositions = self.relieve('HIFO', self.create_sale(15))
+
+        self.assertEqual(
+            self.relieved(dispositions), [(self.highest.pk, 10), (self.last.pk, 5)]
+        )
+        large.refresh_from_db()
+        self.assertEqual(large.remaining_quantity, 100)
+
+    def test_specific_identification_uses_selection(self):
+        sale = self.create_sale(4)
+        dispositions = self.relieve(
+            'SPECIFIC', sale, {sale.pk: [(self.last.pk, 3), (self.first.pk, 1)]}
+        )
+
+        self.assertEqual(
+            self.relieved(dispositions), [(self.last.pk, 3), (self.first.pk, 1)]
+        )
+        with self.assertRaises(ValidationError):
+            self.relieve('SPECIFIC', self.create_sale(2))
+
+    def test_proceeds_split_net_of_fees(self):
+        dispositions = self.relieve(
+            'FIFO', self.create_sale(15, Decimal('100.00'), Decimal('10.00'))
+        )
+
+        self.assertEqual(
+            [d.proceeds for d in dispositions],
+            [Decimal('993.33'), Decimal('496.67')]
+        )
+
+    def test_sale_spanning_many_lots_uses_fixed_queries(self):
+        for offset in range(200):
+            self.create_lot(1, Decimal('120.00'), -50 + offset // 10)
+        sale = self.create_sale(230)
+        engine = LotReliefEngine(self.taxable_account)
+
+        # Two reads, then batched writes; nothing per lot.
+        with CaptureQueriesContext(connection) as queries:
+            dispositions = engine.relieve([sale])
+
+        self.assertLess(len(queries), 10)
+        self.assertEqual(len(dispositions), 203)
+        self.assertEqual(TaxLotDisposition.objects.count(), 203)
+        self.assertFalse(
+            TaxLot.objects.filter(remaining_quantity__gt=0).exists()
+        )
+
+    def test_sale_relieved_once(self):
+        sale = self.create_sale(5)
+        self.relieve('FIFO', sale)
+
+        with self.assertRaises(ValidationError):
+            self.relieve('FIFO', sale)
+
+        self.assertEqual(TaxLotDisposition.objects.count(), 1)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.remaining_quantity, 5)
+
+    def test_insufficient_shares_writes_nothing(self):
+        with self.assertRaises(ValidationError):
+            self.relieve('FIFO', self.create_sale(31))
+
+        self.assertFalse(TaxLotDisposition.objects.exists())
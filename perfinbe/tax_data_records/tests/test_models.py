@@ -324,6 +324,39 @@ class Form1099BTests(TestCase):
         self.assertEqual(form.st_covered_proceeds, Decimal('500.00'))
         self.assertEqual(form.st_covered_basis, Decimal('600.00'))
 
+    def test_form_calculation_single_query(self):
+        form = Form1099B.objects.create(
+            account=self.taxable_account,
+            tax_year=2024
+        )
+        loss = self.create_test_disposition(
+            is_long_term=False,
+            proceeds=Decimal('450.10'),
+            cost_basis=Decimal('600.00')
+        )
+        form.dispositions.add(loss, self.create_test_disposition(
+            is_long_term=False,
+            proceeds=Decimal('333.33'),
+            cost_basis=Decimal('300.00')
+        ))
+        for disallowed_loss in (Decimal('149.90'), Decimal('0.05')):
+            WashSale.objects.create(
+                disposition=loss,
+                replacement_lot=loss.tax_lot,
+                disallowed_loss=disallowed_loss,
+                wash_sale_window_start=loss.date - timedelta(days=30),
+                wash_sale_window_end=loss.date + timedelta(days=30)
+            )
+
+        # One aggregate query plus the save.
+        with self.assertNumQueries(2):
+            form.calculate_totals()
+
+        self.assertEqual(form.st_covered_proceeds, Decimal('783.43'))
+        self.assertEqual(form.st_covered_basis, Decimal('900.00'))
+        self.assertEqual(form.lt_covered_proceeds, Decimal('0.00'))
+        self.assertEqual(form.wash_sale_adjustments, Decimal('149.95'))
+
     def create_test_disposition(self, is_long_term, proceeds, cost_basis):
         # Helper method to create test dispositions
         acquisition_date = timezone.now() - timedelta(
@@ -0,0 +1,89 @@
+# tax_data_records/tests/test_rmd.py
+
+import numpy as np
+from django.test import TestCase
+from decimal import Decimal
+from personal_finance_portfolio.models import (
+    Portfolio, Investment, PortfolioInvestment,
+    InvestmentPlatform, BrokerageAccountType
+)
+from tax_data_records.services.rmd import (
+    RMDEngine, distribution_periods, project_rmds, rmd_start_age, rmd_engine
+)
+
+class RMDProjectionTests(TestCase):
+    def test_table_lookup_by_age(self):
+        np.testing.assert_array_equal(
+            distribution_periods([70, 72, 73, 100, 130]),
+            [np.inf, 27.4, 26.5, 6.4, 2.0]
+        )
+        self.assertEqual(
+            [rmd_start_age(year) for year in (1950, 1951, 1959, 1960)],
+            [72, 73, 73, 75]
+        )
+
+    def test_projection_matches_year_by_year_calculation(self):
+        balances = [100_000.0, 250_000.0]
+        growth = [0.05, 0.03]
+
+        projection = project_rmds(balances, 1951, 2023, years=40, growth=growth)
+
+        for row, (balance, rate) in enumerate(zip(balances, growth)):
+            for index, age in enumerate(range(72, 112)):
+                period = distribution_periods(age) if age >= 73 else np.inf
+                rmd = balance / period
+                self.assertAlmostEqual(projection['balances'][row, index], balance)
+                self.assertAlmostEqual(projection['rmds'][row, index], rmd)
+                balance = (balance - rmd) * (1 + rate)
+        self.assertEqual(projection['rmds'][0, 0], 0)
+        self.assertAlmostEqual(projection['rmds'][0, 1], 105_000 / 26.5)
+
+    def test_rmds_start_at_75_for_later_births(self):
+        projection = project_rmds([1000.0], 1960, 2032, years=4, growth=0)
+
+        self.assertEqual(list(projection['ages']), [72, 73, 74, 75])
+        self.assertEqual(list(projection['rmds'][0, :3]), [0, 0, 0])
+        self.assertAlmostEqual(projection['rmds'][0, 3], 1000 / 24.6)
+
+class RMDEngineTests(TestCase):
+    def setUp(self):
+        platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.investment = Investment.objects.create(
+            ticker_symbol='VTI', name='VTI', price=Decimal('100.00')
+        )
+        self.positions = {}
+        for name, quantity in [('401K', 1000), ('Traditional IRA', 500), ('Roth IRA', 700)]:
+            self.positions[name] = PortfolioInvestment.objects.create(
+                portfolio=Portfolio.objects.create(
+                    name=name,
+                    investment_platform=platform,
+                    brokerage_account_type=BrokerageAccountType.objects.create(name=name)
+                ),
+                investment=self.investment,
+                quantity=quantity
+            )
+
+    def test_projects_every_rmd_portfolio(self):
+        projection = RMDEngine().project(1951, start_year=2024)
+
+        self.assertEqual(
+            [name for _, name, _ in projection['portfolios']],
+            ['401K', 'Traditional IRA']
+        )
+        self.assertEqual(projection['rmds'].shape, (2, 40))
+        self.assertAlmostEqual(projection['total_rmds'][0], 150_000 / 26.5)
+
+    def test_balances_are_read_on_every_projection(self):
+        with self.assertNumQueries(1):
+            first = rmd_engine.project(1951, start_year=2024)
+
+        Investment.objects.bulk_update(
+            [Investment(pk=self.investment.pk, price=Decimal('200.00'))], ['price']
+        )
+        second = rmd_engine.project(1951, start_year=2024)
+        self.assertAlmostEqual(second['total_rmds'][0], 2 * first['total_rmds'][0])
+
+        self.positions['401K'].quantity = 2000
+        self.positions['401K'].save()
+        third = rmd_engine.project(1951, start_year=2024)
+        self.assertAlmostEqual(third['total_rmds'][0], 500_000 / 26.5)
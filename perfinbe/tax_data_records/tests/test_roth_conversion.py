@@ -0,0 +1,49 @@
+# tax_data_records/tests/test_roth_conversion.py
+
+import time
+import numpy as np
+from django.test import TestCase
+from tax_data_records.services.roth_conversion import RothConversionOptimizer, income_tax
+from tax_data_records.services.tax_brackets import tax_tables
+
+class IncomeTaxTests(TestCase):
+    def test_brackets(self):
+        np.testing.assert_allclose(
+            income_tax([-5, 0, 11_600, 50_000, 1_000_000], tax_year=2024),
+            [0, 0, 1_160, 6_053, 1_160 + 4_266 + 11_742.5 + 21_942 + 16_568
+             + 127_968.75 + (1_000_000 - 609_350) * 0.37]
+        )
+        self.assertEqual(
+            tax_tables.get(2024, 'married_joint').marginal_rate(100_000), 0.22
+        )
+
+class RothConversionOptimizerTests(TestCase):
+    def test_conversions_fill_low_brackets_before_rmds(self):
+        optimizer = RothConversionOptimizer(
+            1_000_000,
+            other_income=[120_000] * 5 + [30_000] * 25,
+            years=30, start_year=2025, birth_year=1960
+        )
+
+        started = time.perf_counter()
+        plan = optimizer.optimize()
+        elapsed = time.perf_counter() - started
+
+        schedule = plan['schedule']
+        self.assertEqual(len(schedule), 30)
+        self.assertLess(elapsed, 5)
+        self.assertLess(plan['total_tax_pv'], plan['baseline_tax_pv'])
+        # High-income working years are left alone; the gap years between
+        # retirement and RMDs at 75 are used for conversions.
+        self.assertTrue(all(year['conversion'] == 0 for year in schedule[:5]))
+        self.assertTrue(all(year['conversion'] > 0 for year in schedule[5:10]))
+        self.assertEqual(schedule[9]['rmd'], 0)
+        self.assertGreater(schedule[10]['rmd'], 0)
+
+    def test_no_conversions_when_nothing_is_saved(self):
+        plan = RothConversionOptimizer(
+            500_000, other_income=50_000, years=10, terminal_rate=0
+        ).optimize()
+
+        self.assertEqual(sum(year['conversion'] for year in plan['schedule']), 0)
+        self.assertAlmostEqual(plan['total_tax_pv'], plan['baseline_tax_pv'])
@@ -0,0 +1,78 @@
+# tax_data_records/tests/test_tax_brackets.py
+
+import time
+import numpy as np
+from django.test import TestCase
+from tax_data_records.models import TaxBracket, TaxBracketTable
+from tax_data_records.services.tax_brackets import CompiledBrackets, tax_tables
+
+class CompiledBracketsTests(TestCase):
+    def setUp(self):
+        self.brackets = CompiledBrackets([0, 10_000, 50_000], [0.1, 0.2, 0.3], 5_000)
+
+    def test_tax_matches_bracket_by_bracket_calculation(self):
+        incomes = np.array([[-100, 0, 10_000], [25_000, 50_000, 80_000]])
+
+        np.testing.assert_allclose(
+            self.brackets.tax(incomes),
+            [[0, 0, 1_000], [4_000, 9_000, 18_000]]
+        )
+        np.testing.assert_array_equal(
+            self.brackets.marginal_rate([5_000, 10_000, 1e9]), [0.1, 0.2, 0.3]
+        )
+
+    def test_stacked_tax(self):
+        # 20,000 of gains on top of 40,000: 10,000 at 20% and 10,000 at 30%
+        self.assertAlmostEqual(float(self.brackets.stacked_tax(40_000, 20_000)), 5_000)
+
+    def test_rejects_unsorted_brackets(self):
+        with self.assertRaises(ValueError):
+            CompiledBrackets([0, 50_000, 10_000], [0.1, 0.2, 0.3])
+
+    def test_million_incomes_in_one_call(self):
+        incomes = np.random.default_rng(0).uniform(-10_000, 1_000_000, 1_000_000)
+
+        started = time.perf_counter()
+        taxes = self.brackets.tax(incomes)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(taxes.shape, incomes.shape)
+        self.assertLess(elapsed, 1)
+        np.testing.assert_allclose(
+            taxes[:5], [float(self.brackets.tax(income)) for income in incomes[:5]]
+        )
+
+class TaxBracketRegistryTests(TestCase):
+    def setUp(self):
+        tax_tables.invalidate()
+
+    def test_seeded_federal_tables(self):
+        single = tax_tables.get(2024, 'single')
+        self.assertEqual(single.standard_deduction, 14_600)
+        self.assertAlmostEqual(float(single.tax(100_525)), 17_168.5)
+        self.assertAlmostEqual(float(tax_tables.get(2023, 'single').tax(100_525)), 17_526)
+
+        gains = tax_tables.get(2024, 'married_joint', income_type='LTCG')
+        # 50,000 of gains on 80,000 of ordinary income: 14,050 at 0%
+        self.assertAlmostEqual(float(gains.stacked_tax(80_000, 50_000)), 35_950 * 0.15)
+
+    def test_later_years_use_latest_table(self):
+        self.assertEqual(tax_tables.get(2040, 'head_of_household').tax_year, 2024)
+        with self.assertRaises(TaxBracketTable.DoesNotExist):
+            tax_tables.get(2010, 'single')
+
+    def test_tables_are_compiled_once(self):
+        tax_tables.get(2024, 'single')
+        with self.assertNumQueries(0):
+            tax_tables.get(2024, 'single')
+
+    def test_editing_a_table_invalidates_the_cache(self):
+        table = TaxBracketTable.objects.create(
+            jurisdiction='CA', tax_year=2024, filing_status='single'
+        )
+        TaxBracket.objects.create(table=table, lower_bound=0, rate='0.01')
+        self.assertAlmostEqual(float(tax_tables.tax(20_000, 2030, jurisdiction='CA')), 200)
+
+        TaxBracket.objects.create(table=table, lower_bound=10_000, rate='0.02')
+
+        self.assertAlmostEqual(float(tax_tables.tax(20_000, 2030, jurisdiction='CA')), 300)
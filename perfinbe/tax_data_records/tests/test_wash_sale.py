@@ -0,0 +1,263 @@
+# tax_data_records/tests/test_wash_sale.py
+
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from personal_finance_portfolio.models import (
+    Portfolio, Investment, PortfolioInvestment, Transaction,
+    InvestmentPlatform, BrokerageAccountType
+)
+from tax_data_records.models import (
+    TaxableAccount, TaxLot, TaxLotDisposition, WashSale
+)
+from tax_data_records.services.wash_sale import (
+    HouseholdWashSaleDetector, WashSaleDetector
+)
+
+class _Rollback(Exception):
+    pass
+
+class BatchWashSaleDetectionTests(TestCase):
+    def setUp(self):
+        self.platform = InvestmentPlatform.objects.create(name='Fidelity')
+        self.account_type = BrokerageAccountType.objects.create(name='Taxable')
+        self.portfolio = Portfolio.objects.create(
+            name='Test Portfolio',
+            investment_platform=self.platform,
+            brokerage_account_type=self.account_type
+        )
+        self.taxable_account = TaxableAccount.objects.create(
+            portfolio=self.portfolio
+        )
+        self.now = timezone.now()
+
+        self.apple = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=Investment.objects.create(
+                ticker_symbol='AAPL', name='Apple Inc.', price=Decimal('150.00')
+            ),
+            quantity=100
+        )
+        self.msft = PortfolioInvestment.objects.create(
+            portfolio=self.portfolio,
+            investment=Investment.objects.create(
+                ticker_symbol='MSFT', name='Microsoft', price=Decimal('300.00')
+            ),
+            quantity=100
+        )
+
+        # Two loss sales of AAPL a week apart share the same replacement
+        # lots, so each basis is adjusted twice with inexact division.
+        old_lot = self.create_lot(self.apple, 30, Decimal('4500.00'), -400)
+        self.create_disposition(old_lot, 10, Decimal('1400.00'), -10)
+        self.create_disposition(old_lot, 10, Decimal('1389.00'), -3)
+        self.create_disposition(old_lot, 5, Decimal('800.00'), -1)  # gain
+        self.create_lot(self.apple, 3, Decimal('430.00'), 5)
+        self.create_lot(self.apple, 7, Decimal('1000.00'), -20)
+        self.create_lot(self.apple, 4, Decimal('600.00'), 60)  # outside window
+
+        # MSFT loss with a replacement purchase; AAPL lots must not match.
+        msft_lot = self.create_lot(self.msft, 10, Decimal('3000.00'), -200)
+        self.create_disposition(msft_lot, 10, Decimal('2800.00'), -2)
+        self.create_lot(self.msft, 2, Decimal('570.00'), 1)
+
+    def create_lot(self, portfolio_investment, quantity, cost_basis, offset_days):
+        purchase = Transaction.objects.create(
+            portfolio_investment=portfolio_investment,
+            transaction_type='BUY',
+            quantity=quantity,
+            price=cost_basis / quantity,
+            transaction_date=self.now + timedelta(days=offset_days)
+        )
+        return TaxLot.objects.create(
+            account=self.taxable_account,
+            transaction=purchase,
+            quantity=quantity,
+            acquisition_date=purchase.transaction_date,
+            cost_basis=cost_basis,
+            remaining_quantity=quantity,
+            adjusted_basis=cost_basis
+        )
+
+    def create_disposition(self, tax_lot, quantity, proceeds, offset_days):
+        sale = Transaction.objects.create(
+            portfolio_investment=tax_lot.transaction.portfolio_investment,
+            transaction_type='SELL',
+            quantity=quantity,
+            price=proceeds / quantity,
+            transaction_date=self.now + timedelta(days=offset_days)
+        )
+        return TaxLotDisposition.objects.create(
+            tax_lot=tax_lot,
+            sale_transaction=sale,
+            quantity=quantity,
+            proceeds=proceeds,
+            date=sale.transaction_date
+        )
+
+    def snapshot(self):
+        wash_sales = sorted(
+            WashSale.objects.values_list(
+                'disposition_id', 'replacement_lot_id', 'disallowed_loss',
+                'wash_sale_window_start', 'wash_sale_window_end'
+            )
+        )
+        bases = dict(TaxLot.objects.values_list('pk', 'adjusted_basis'))
+        return wash_sales, bases
+
+    def test_batch_matches_per_disposition_path(self):
+        detector = WashSaleDetector(self.taxable_account)
+        start = self.now - timedelta(days=30)
+        end = self.now
+
+        try:
+            with transaction.atomic():
+                for disposition in TaxLotDisposition.objects.order_by('pk'):
+                    detector.process_disposition(disposition)
+                expected = self.snapshot()
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.assertFalse(WashSale.objects.exists())
+
+        created = detector.detect_wash_sales_for_period(start, end)
+
+        self.assertEqual(len(created), 5)
+        self.assertEqual(self.snapshot(), expected)
+
+    def test_batch_respects_wash_sale_tracking(self):
+        self.taxable_account.wash_sale_tracking = False
+        self.taxable_account.save()
+        detector = WashSaleDetector(self.taxable_account)
+
+        created = detector.detect_wash_sales_for_period(
+            self.now - timedelta(days=30), self.now
+        )
+
+        self.assertEqual(created, [])
+        self.assertFalse(WashSale.objects.exists())
+
+    def test_replacements_created_with_and_without_signals(self):
+        msft_lot = TaxLot.objects.get(investment=self.msft.investment, quantity=10)
+        saved = TaxLot.objects.get(investment=self.msft.investment, quantity=2)
+        purchase = Transaction.objects.create(
+            portfolio_investment=self.msft,
+            transaction_type='BUY',
+            quantity=3,
+            price=Decimal('285.00'),
+            transaction_date=self.now + timedelta(days=3)
+        )
+        # bulk_create skips TaxLot.save and post_save
+        [bulk] = TaxLot.objects.bulk_create([TaxLot(
+            account=self.taxable_account,
+            transaction=purchase,
+            investment=self.msft.investment,
+            quantity=3,
+            acquisition_date=purchase.transaction_date,
+            cost_basis=Decimal('855.00'),
+            remaining_quantity=3,
+            adjusted_basis=Decimal('855.00')
+        )])
+        disposition = TaxLotDisposition.objects.get(tax_lot=msft_lot)
+
+        WashSaleDetector(self.taxable_account).process_disposition(disposition)
+
+        self.assertEqual(
+            sorted(WashSale.objects.values_list('replacement_lot_id', flat=True)),
+            [saved.pk, bulk.pk]
+        )
+
+    def test_investment_denormalized_from_transaction(self):
+        lot = TaxLot.objects.filter(investment=self.apple.investment).first()
+        self.assertEqual(lot.investment_id, lot.transaction.portfolio_investment.investment_id)
+
+class HouseholdWashSaleDetectionTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        platform = InvestmentPlatform.objects.create(name='Vanguard')
+        self.vti = Investment.objects.create(
+            ticker_symbol='VTI', name='Total Market', price=Decimal('200.00')
+        )
+        self.brokerage = self.create_portfolio('Brokerage', platform, 'Taxable')
+        self.joint = self.create_portfolio('Joint', platform, 'Trust')
+        self.ira = self.create_portfolio('IRA', platform, 'Roth IRA')
+        self.brokerage_account = TaxableAccount.objects.create(portfolio=self.brokerage)
+        self.joint_account = TaxableAccount.objects.create(portfolio=self.joint)
+
+        lot = self.create_lot(self.brokerage_account, 10, Decimal('2500.00'), -200)
+        sale = self.buy(self.brokerage, 10, Decimal('2000.00'), 0, 'SELL')
+        self.disposition = TaxLotDisposition.objects.create(
+            tax_lot=lot,
+            sale_transaction=sale,
+            quantity=10,
+            proceeds=Decimal('2000.00'),
+            date=sale.transaction_date
+        )
+
+    def create_portfolio(self, name, platform, account_type):
+        return Portfolio.objects.create(
+            name=name,
+            investment_platform=platform,
+            brokerage_account_type=BrokerageAccountType.objects.create(name=account_type)
+        )
+
+    def buy(self, portfolio, quantity, amount, offset_days, transaction_type='BUY'):
+        holding, _ = PortfolioInvestment.objects.get_or_create(
+            portfolio=portfolio, investment=self.vti, defaults={'quantity': 0}
+        )
+        return Transaction.objects.create(
+            portfolio_investment=holding,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            price=amount / quantity,
+            transaction_date=self.now + timedelta(days=offset_days)
+        )
+
+    def create_lot(self, account, quantity, cost_basis, offset_days):
+        purchase = self.buy(account.portfolio, quantity, cost_basis, offset_days)
+        return TaxLot.objects.create(
+            account=account,
+            transaction=purchase,
+            quantity=quantity,
+            acquisition_date=purchase.transaction_date,
+            cost_basis=cost_basis,
+            remaining_quantity=quantity,
+            adjusted_basis=cost_basis
+        )
+
+    def test_replacements_in_other_portfolios(self):
+        joint_lot = self.create_lot(self.joint_account, 5, Decimal('1000.00'), 10)
+        ira_purchase = self.buy(self.ira, 5, Decimal('1000.00'), -20)
+        self.buy(self.ira, 5, Decimal('1000.00'), 45)  # outside the window
+
+        # The per-account detector cannot see either purchase.
+        self.assertEqual(
+            WashSaleDetector(self.brokerage_account).detect_wash_sales_for_period(
+                self.now - timedelta(days=1), self.now
+            ),
+            []
+        )
+
+        created = HouseholdWashSaleDetector().detect(
+            self.now - timedelta(days=1), self.now
+        )
+
+        self.assertEqual(
+            {(ws.replacement_lot_id, ws.replacement_transaction_id) for ws in created},
+            {(joint_lot.pk, None), (None, ira_purchase.pk)}
+        )
+        joint_lot.refresh_from_db()
+        self.assertEqual(joint_lot.adjusted_basis, Decimal('1100.00'))
+        for wash_sale in WashSale.objects.all():
+            wash_sale.full_clean()
+
+    def test_rerun_records_nothing_new(self):
+        self.buy(self.ira, 5, Decimal('1000.00'), 3)
+        detector = HouseholdWashSaleDetector()
+        start, end = self.now - timedelta(days=1), self.now
+
+        self.assertEqual(len(detector.detect(start, end)), 1)
+        self.assertEqual(detector.detect(start, end), [])
+        self.assertEqual(WashSale.objects.count(), 1)
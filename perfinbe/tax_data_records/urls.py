@@ -0,0 +1,10 @@
+# tax_data_records/urls.py
+
+from django.urls import path
+from . import views
+
+app_name = 'tax_api'
+
+urlpatterns = [
+    path('summary/<int:tax_year>/', views.tax_summary, name='tax-summary'),
+]
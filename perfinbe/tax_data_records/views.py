@@ -1,3 +1,65 @@
-from django.shortcuts import render
+# tax_data_records/views.py
 
-# Create your views here.
+from decimal import Decimal
+from django.db.models import F, Q, Sum
+from django.http import JsonResponse
+from personal_finance_portfolio.views import api_view
+from .models import (
+    LONG_TERM_HOLDING_PERIOD, TaxableAccount, TaxableEvent, TaxLotDisposition, WashSale
+)
+
+def _cents(value):
+    # SQLite sums decimals as floats; round back to the stored cents.
+    return Decimal(value or 0).quantize(Decimal('0.01'))
+
+@api_view
+async def tax_summary(request, tax_year):
+    """
+    Realized gains, wash sale adjustments and taxable events per
+    TaxableAccount for one tax year: the account list plus three grouped
+    aggregate queries, however many dispositions there are.
+    """
+    accounts = {
+        account['pk']: {
+            'account_id': account['pk'],
+            'portfolio': account['portfolio__name'],
+            'st_proceeds': _cents(0),
+            'st_basis': _cents(0),
+            'lt_proceeds': _cents(0),
+            'lt_basis': _cents(0),
+            'wash_sale_disallowed': _cents(0),
+            'events': {},
+        }
+        async for account in TaxableAccount.objects.order_by('pk').values(
+            'pk', 'portfolio__name'
+        )
+    }
+
+    long_term = Q(holding_period__gte=LONG_TERM_HOLDING_PERIOD)
+    short_term = Q(holding_period__lt=LONG_TERM_HOLDING_PERIOD)
+    basis = F('quantity') * F('tax_lot__adjusted_basis')
+    async for row in TaxLotDisposition.objects.filter(date__year=tax_year).values(
+        account=F('tax_lot__account')
+    ).annotate(
+        st_proceeds=Sum('proceeds', filter=short_term),
+        st_basis=Sum(basis, filter=short_term),
+        lt_proceeds=Sum('proceeds', filter=long_term),
+        lt_basis=Sum(basis, filter=long_term)
+    ).order_by():
+        summary = accounts[row.pop('account')]
+        summary.update({name: _cents(value) for name, value in row.items()})
+
+    async for row in WashSale.objects.filter(disposition__date__year=tax_year).values(
+        account=F('disposition__tax_lot__account')
+    ).annotate(disallowed=Sum('disallowed_loss')).order_by():
+        accounts[row['account']]['wash_sale_disallowed'] = _cents(row['disallowed'])
+
+    async for row in TaxableEvent.objects.filter(date__year=tax_year).values(
+        'account', 'event_type'
+    ).annotate(total=Sum('amount')).order_by():
+        accounts[row['account']]['events'][row['event_type']] = _cents(row['total'])
+
+    for summary in accounts.values():
+        summary['st_gain'] = summary['st_proceeds'] - summary['st_basis']
+        summary['lt_gain'] = summary['lt_proceeds'] - summary['lt_basis']
+    return JsonResponse({'tax_year': tax_year, 'accounts': list(accounts.values())})